@@ -16,29 +16,22 @@ import sys
 import json
 from pathlib import Path
 
-# Add parent directory to path for qwen_client import
+# Add server directory to path for qwen_daemon/media imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "servers" / "qwen-vl"))
 
-from qwen_client import QwenClient
+from cli import build_parser
 
 
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: python ask.py <video_path> \"<question>\" [--model MODEL]", file=sys.stderr)
-        print("\nModels:", file=sys.stderr)
-        print("  qwen3-vl-235b-a22b-thinking  (default, local video files)", file=sys.stderr)
-        print("  qwen3-omni-flash             (requires http/https URL)", file=sys.stderr)
-        sys.exit(1)
+    args = build_parser("ask").parse_args()
 
-    video_path = sys.argv[1]
-    question = sys.argv[2]
+    # Imported after argument parsing so --help and usage errors stay fast
+    from qwen_daemon import get_client
+    from media import prepare_for_upload
 
-    # Parse optional model argument
-    model = "qwen3-vl-235b-a22b-thinking"
-    if "--model" in sys.argv:
-        idx = sys.argv.index("--model")
-        if idx + 1 < len(sys.argv):
-            model = sys.argv[idx + 1]
+    video_path = args.video_path
+    question = args.question
+    model = args.model
 
     # Validate video exists for local files
     if not video_path.startswith(('http://', 'https://')):
@@ -48,7 +41,10 @@ def main():
 
     try:
         print(f"[Analyzing] {Path(video_path).name}...", file=sys.stderr, flush=True)
-        client = QwenClient()
+        client = get_client()
+        # Omni models need the audio track
+        omni = model.startswith(("qwen3-omni", "qwen-omni"))
+        video_path = prepare_for_upload(video_path, keep_audio=omni)
         print(f"[Sending to API] This may take 30-60s for video processing...", file=sys.stderr, flush=True)
         response = client.analyze_video(video_path, question, model)
         print("[Done]", file=sys.stderr, flush=True)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Combined Reference Video Analysis (single request)
+
+Runs the narrative, style and audio-visual analyses in ONE model call:
+the video is uploaded and encoded once and the model returns a single
+JSON object with "narrative", "style" and "audio_visual" sections.
+
+- http/https URLs use qwen3-omni-flash (all three sections, audio-aware)
+- Local files use qwen3-vl-235b-a22b-thinking (narrative + style only,
+  the VL model cannot hear audio and Omni requires a remote URL)
+
+Each section has the same shape as the output of the matching
+single-analysis script. Those scripts send this same combined request
+and keep their own section; the answer is cached, so running all three
+on one video costs one request.
+
+Usage:
+    python analyze_all.py <video_path_or_url_or_txt_file> [output_path]
+
+Example:
+    python analyze_all.py inputs/reference.mp4 outputs/reference-analysis.json
+    python analyze_all.py inputs/reference-url.txt outputs/reference-analysis.json
+"""
+
+import sys
+import json
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from qwen_daemon import get_client
+from jsonio import write_json
+from timeutil import now_iso, request_scope
+from cli import build_parser
+from media import prepare_for_upload
+from analyze_narrative import NARRATIVE_ANALYSIS_PROMPT, build_narrative_analysis
+from analyze_style import STYLE_ANALYSIS_PROMPT, build_style_blueprint
+from analyze_audio_visual import AUDIO_VISUAL_PROMPT, build_audio_visual_blueprint
+
+
+VL_MODEL = "qwen3-vl-235b-a22b-thinking"
+OMNI_MODEL = "qwen3-omni-flash"
+
+
+def section_prompts(is_url: bool) -> Dict[str, str]:
+    """
+    Get the sections of the combined request, in request order.
+
+    Args:
+        is_url: Whether the video is an http/https URL (adds audio_visual)
+
+    Returns:
+        Section name -> prompt
+    """
+    sections = {
+        "narrative": NARRATIVE_ANALYSIS_PROMPT,
+        "style": STYLE_ANALYSIS_PROMPT
+    }
+    if is_url:
+        sections["audio_visual"] = AUDIO_VISUAL_PROMPT
+    return sections
+
+
+def analyze_sections(video_path: str, model: Optional[str] = None) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Run the combined request and return every section's raw JSON.
+
+    The single-analysis CLIs call this too and keep only their section:
+    the combined answer is cached (same upload, prompt and model), so
+    running analyze_narrative, analyze_style and analyze_audio_visual on
+    one video costs a single model request between them.
+
+    Args:
+        video_path: Local video path or http/https URL
+        model: Optional model override
+
+    Returns:
+        (absolute path or URL, model used, section name -> parsed JSON)
+
+    Raises:
+        Exception: If analysis fails
+    """
+    is_url = video_path.startswith(('http://', 'https://'))
+    sections = section_prompts(is_url)
+
+    if is_url:
+        model = model or OMNI_MODEL
+    else:
+        video_file = Path(video_path)
+        if not video_file.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        video_path = str(video_file.absolute())
+        model = model or VL_MODEL
+        print(
+            "Note: local file - skipping audio-visual section (requires http/https URL)",
+            file=sys.stderr
+        )
+
+    print(f"Analyzing {', '.join(sections)} for: {video_path}", file=sys.stderr)
+
+    # Initialize client (daemon if available; retry logic handled internally)
+    client = get_client()
+
+    # One request for every section
+    print(f"Sending combined request to {model}...", file=sys.stderr)
+    results = client.analyze_video_sections(
+        # Full frame rate for the style section's cut timing
+        video_path=prepare_for_upload(video_path, keep_fps=True),
+        sections=sections,
+        model=model
+    )
+    return video_path, model, results
+
+
+def analyze_all(video_path: str, model: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Analyze narrative, style and (for URLs) audio-visual sync in one call.
+
+    Args:
+        video_path: Local video path or http/https URL
+        model: Optional model override
+
+    Returns:
+        Dict with "narrative", "style" and optionally "audio_visual" sections
+
+    Raises:
+        Exception: If analysis fails
+    """
+    video_path, model, results = analyze_sections(video_path, model)
+
+    # All sections share one analyzed_at timestamp
+    with request_scope():
+        analysis = {
+            "video_path": video_path,
+            "analyzed_at": now_iso(),
+            "model_used": model,
+            "narrative": build_narrative_analysis(video_path, results.pop("narrative")),
+            "style": build_style_blueprint(video_path, results.pop("style"))
+        }
+
+        if "audio_visual" in results:
+            analysis["audio_visual"] = build_audio_visual_blueprint(
+                video_path, results.pop("audio_visual"), model
+            )
+
+    return analysis
+
+
+def main():
+    """CLI entry point."""
+    args = build_parser("analyze_all").parse_args()
+    video_input = args.video_input
+    output_path = args.output_path
+
+    try:
+        # Read video URL from txt file if needed
+        if video_input.endswith('.txt'):
+            txt_file = Path(video_input)
+            if not txt_file.exists():
+                raise FileNotFoundError(f"Text file not found: {video_input}")
+            video_path = txt_file.read_text().strip()
+            print(f"Read video URL from {video_input}: {video_path}", file=sys.stderr)
+        else:
+            video_path = video_input
+
+        # Analyze video
+        analysis = analyze_all(video_path)
+
+        # Output results (file, or stdout for agent consumption)
+        write_json(analysis, output_path)
+
+        if output_path:
+            print(f"Combined analysis saved to: {output_path}", file=sys.stderr)
+
+        sys.exit(0)
+
+    except Exception as e:
+        error_output = {
+            "error": str(e),
+            "video_input": video_input
+        }
+        print(json.dumps(error_output), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -29,11 +29,11 @@ Example:
 import sys
 import json
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any
-import subprocess
+from typing import Dict, Any, List, Optional
 
-from qwen_client import QwenClient
+from jsonio import write_json, JsonObjectWriter
+from timeutil import now_iso
+from cli import build_parser
 
 
 # Audio-visual analysis prompt template
@@ -88,12 +88,61 @@ IMPORTANT:
 Be specific and objective. Use measurements where possible."""
 
 
-def analyze_audio_visual_style(video_url: str) -> Dict[str, Any]:
+# Sections every analysis must contain
+REQUIRED_AUDIO_VISUAL_KEYS = frozenset({"speech_sync", "music_sync", "audio_visual_correlation", "pacing"})
+
+
+def build_audio_visual_blueprint(
+    video_url: str,
+    audio_visual_data: Dict[str, Any],
+    model: str = "qwen3-omni-flash"
+) -> Dict[str, Any]:
+    """
+    Wrap raw audio-visual JSON from the model into the final blueprint.
+
+    Args:
+        video_url: Analyzed video URL
+        audio_visual_data: Parsed audio-visual JSON from the model
+        model: Model that produced the analysis
+
+    Returns:
+        Audio-visual blueprint dict
+    """
+    # Construct final blueprint
+    blueprint = {
+        "video_url": video_url,
+        "analyzed_at": now_iso(),
+        "model_used": model,
+        **audio_visual_data
+    }
+
+    # Validate structure (missing sections default to empty)
+    blueprint.update({key: {} for key in _missing_sections(blueprint)})
+
+    return blueprint
+
+
+def _missing_sections(blueprint: Dict[str, Any]) -> List[str]:
+    """Warn about and return required sections the model left out."""
+    missing = sorted(REQUIRED_AUDIO_VISUAL_KEYS - blueprint.keys())
+    for key in missing:
+        print(
+            f"Warning: Missing '{key}' in model response. Using defaults.",
+            file=sys.stderr
+        )
+    return missing
+
+
+def analyze_audio_visual_style(video_url: str, output_path: Optional[str] = None) -> Dict[str, Any]:
     """
     Analyze reference video audio-visual correlation using Qwen3-Omni.
 
+    With output_path, the response is streamed and each section is written
+    to the file as soon as the model completes it.
+
     Args:
         video_url: Video URL (http/https)
+        output_path: Optional file to stream the blueprint to
 
     Returns:
         Audio-visual blueprint dict
@@ -110,53 +159,70 @@ def analyze_audio_visual_style(video_url: str) -> Dict[str, Any]:
 
     print(f"Analyzing audio-visual style for: {video_url}", file=sys.stderr)
 
-    # Initialize client (retry logic handled internally)
-    client = QwenClient()
+    if output_path:
+        return _stream_audio_visual_style(video_url, output_path)
 
-    # Analyze video (audio automatically analyzed by model)
-    print("Sending request to Qwen3-Omni (audio-visual model)...", file=sys.stderr)
+    # Shares analyze_all's combined request (cached), so the other
+    # analyses of this video cost no further requests
+    from analyze_all import analyze_sections
 
-    audio_visual_data = client.analyze_video_structured(
-        video_path=video_url,
-        prompt=AUDIO_VISUAL_PROMPT,
-        model="qwen3-omni-flash"
-    )
+    video_url, model, sections = analyze_sections(video_url)
+    return build_audio_visual_blueprint(video_url, sections.pop("audio_visual"), model)
+
+
+def _stream_audio_visual_style(video_url: str, output_path: str, model: str = "qwen3-omni-flash") -> Dict[str, Any]:
+    """
+    Stream the analysis straight into output_path.
+
+    Sends analyze_all's combined request, so its cached answer serves the
+    narrative and style CLIs too; the audio-visual keys are written as soon
+    as the model completes that section. Runs in-process: the daemon
+    protocol returns whole responses only. The file has the same layout as
+    build_audio_visual_blueprint's output.
+    """
+    from analyze_all import section_prompts
+    from qwen_client import build_sections_prompt, get_shared_client
+
+    client = get_shared_client()
+    prompt = build_sections_prompt(section_prompts(is_url=True))
 
-    # Construct final blueprint
     blueprint = {
         "video_url": video_url,
-        "analyzed_at": datetime.utcnow().isoformat() + "Z",
-        "model_used": "qwen3-omni-flash",
-        **audio_visual_data
+        "analyzed_at": now_iso(),
+        "model_used": model
     }
 
-    # Validate structure
-    required_keys = ["speech_sync", "music_sync", "audio_visual_correlation", "pacing"]
-    for key in required_keys:
-        if key not in blueprint:
-            print(
-                f"Warning: Missing '{key}' in model response. Using defaults.",
-                file=sys.stderr
-            )
+    print("Streaming request to Qwen3-Omni (audio-visual model)...", file=sys.stderr)
+    with JsonObjectWriter(output_path) as writer:
+        for key, value in blueprint.items():
+            writer.write(key, value)
+
+        for section, data in client.stream_analyze_video_structured(video_url, prompt, model):
+            if section != "audio_visual":
+                continue  # Other CLIs' sections, cached with the response
+            if not isinstance(data, dict):
+                print("Warning: Invalid 'audio_visual' section in model response. Using defaults.", file=sys.stderr)
+                continue
+
+            for key, value in data.items():
+                if key in blueprint:
+                    continue  # Keep our metadata, never write a key twice
+                blueprint[key] = value
+                writer.write(key, value)
+                print(f"  Received section: {key}", file=sys.stderr)
+
+        for key in _missing_sections(blueprint):
             blueprint[key] = {}
+            writer.write(key, {})
 
     return blueprint
 
 
 def main():
     """CLI entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: python analyze_audio_visual.py <video_url_or_txt_file> [output_path]", file=sys.stderr)
-        print("\nExamples:", file=sys.stderr)
-        print("  # Using txt file with video URL", file=sys.stderr)
-        print("  echo 'https://cdn.example.com/video.mp4' > inputs/reference-url.txt", file=sys.stderr)
-        print("  python analyze_audio_visual.py inputs/reference-url.txt outputs/audio-visual-blueprint.json", file=sys.stderr)
-        print("\n  # Using URL directly", file=sys.stderr)
-        print('  python analyze_audio_visual.py "https://cdn.example.com/video.mp4" outputs/audio-visual-blueprint.json', file=sys.stderr)
-        sys.exit(1)
-
-    video_input = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    args = build_parser("analyze_audio_visual").parse_args()
+    video_input = args.video_input
+    output_path = args.output_path
 
     try:
         # Read video URL from txt file if needed
@@ -169,21 +235,14 @@ def main():
         else:
             video_url = video_input
 
-        # Analyze video
-        blueprint = analyze_audio_visual_style(video_url)
-
-        # Output results
-        json_output = json.dumps(blueprint, indent=2)
+        # Analyze video (streamed to output_path when given)
+        blueprint = analyze_audio_visual_style(video_url, output_path)
 
         if output_path:
-            # Save to file
-            output_file = Path(output_path)
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            output_file.write_text(json_output)
             print(f"Audio-visual blueprint saved to: {output_path}", file=sys.stderr)
         else:
             # Print to stdout for agent consumption
-            print(json_output)
+            write_json(blueprint)
 
         sys.exit(0)
 
@@ -18,10 +18,11 @@ Usage:
 import sys
 import json
 from pathlib import Path
-from datetime import datetime
 from typing import Dict, Any
 
-from qwen_client import QwenVLClient
+from jsonio import write_json
+from timeutil import now_iso
+from cli import build_parser
 
 
 # Narrative analysis prompt template
@@ -82,6 +83,47 @@ Focus on:
 Be specific. Quote exact phrases. Identify timestamps where possible."""
 
 
+# Sections every analysis must contain
+REQUIRED_NARRATIVE_KEYS = frozenset({
+    "opening_hook",
+    "storyline_structure",
+    "retention_techniques",
+    "value_delivery",
+    "call_to_action",
+    "script_rhythm"
+})
+
+
+def build_narrative_analysis(video_path: str, narrative_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Wrap raw narrative JSON from the model into the final analysis.
+
+    Args:
+        video_path: Absolute path of the analyzed video
+        narrative_data: Parsed narrative JSON from the model
+
+    Returns:
+        Narrative analysis dict
+    """
+    # Construct final analysis
+    analysis = {
+        "video_path": video_path,
+        "analyzed_at": now_iso(),
+        **narrative_data
+    }
+
+    # Validate structure (missing sections default to empty)
+    missing = REQUIRED_NARRATIVE_KEYS - analysis.keys()
+    for key in sorted(missing):
+        print(
+            f"Warning: Missing '{key}' in model response. Using defaults.",
+            file=sys.stderr
+        )
+    analysis.update({key: {} for key in missing})
+
+    return analysis
+
+
 def analyze_narrative(video_path: str) -> Dict[str, Any]:
     """
     Analyze reference video narrative using Qwen VL.
@@ -100,70 +142,29 @@ def analyze_narrative(video_path: str) -> Dict[str, Any]:
     if not video_file.exists():
         raise FileNotFoundError(f"Video file not found: {video_path}")
 
-    print(f"Analyzing narrative for: {video_path}", file=sys.stderr)
-
-    # Initialize client (retry logic handled internally)
-    client = QwenVLClient()
-
-    # Analyze video (returns parsed JSON)
-    print("Sending request to Qwen VL...", file=sys.stderr)
-    narrative_data = client.analyze_video_structured(
-        video_path=str(video_file.absolute()),
-        prompt=NARRATIVE_ANALYSIS_PROMPT
-    )
-
-    # Construct final analysis
-    analysis = {
-        "video_path": str(video_file.absolute()),
-        "analyzed_at": datetime.utcnow().isoformat() + "Z",
-        **narrative_data
-    }
-
-    # Validate structure
-    required_keys = [
-        "opening_hook",
-        "storyline_structure",
-        "retention_techniques",
-        "value_delivery",
-        "call_to_action",
-        "script_rhythm"
-    ]
-    for key in required_keys:
-        if key not in analysis:
-            print(
-                f"Warning: Missing '{key}' in model response. Using defaults.",
-                file=sys.stderr
-            )
-            analysis[key] = {}
+    # Shares analyze_all's combined request (cached), so the other
+    # analyses of this video cost no further requests
+    from analyze_all import analyze_sections
 
-    return analysis
+    video_path, _, sections = analyze_sections(video_path)
+    return build_narrative_analysis(video_path, sections.pop("narrative"))
 
 
 def main():
     """CLI entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: python analyze_narrative.py <video_path> [output_path]", file=sys.stderr)
-        sys.exit(1)
-
-    video_path = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    args = build_parser("analyze_narrative").parse_args()
+    video_path = args.video_path
+    output_path = args.output_path
 
     try:
         # Analyze video
         analysis = analyze_narrative(video_path)
 
-        # Output results
-        json_output = json.dumps(analysis, indent=2)
+        # Output results (file, or stdout for agent consumption)
+        write_json(analysis, output_path)
 
         if output_path:
-            # Save to file
-            output_file = Path(output_path)
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            output_file.write_text(json_output)
             print(f"Narrative analysis saved to: {output_path}", file=sys.stderr)
-        else:
-            # Print to stdout for agent consumption
-            print(json_output)
 
         sys.exit(0)
 
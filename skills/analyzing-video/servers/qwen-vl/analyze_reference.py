@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Reference Video Analysis (concurrent)
+
+Runs the narrative, style and audio-visual analyses of a reference video
+concurrently instead of back to back. Each analysis is a separate,
+network-bound request, so wall time is the slowest request rather than
+the sum of all three.
+
+- Narrative + style always run (qwen3-vl-235b-a22b-thinking)
+- Audio-visual runs when the video is an http/https URL (qwen3-omni-flash)
+
+Each section has the same shape as the output of the matching
+single-analysis script.
+
+Usage:
+    python analyze_reference.py <video_path_or_url_or_txt_file> [output_path]
+
+Example:
+    python analyze_reference.py inputs/reference.mp4 outputs/reference-analysis.json
+    python analyze_reference.py inputs/reference-url.txt outputs/reference-analysis.json
+"""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+from typing import Dict, Any
+
+from qwen_client import get_shared_client
+from jsonio import write_json
+from cli import build_parser
+from media import prepare_for_upload
+from timeutil import request_scope
+from analyze_narrative import NARRATIVE_ANALYSIS_PROMPT, build_narrative_analysis
+from analyze_style import STYLE_ANALYSIS_PROMPT, build_style_blueprint
+from analyze_audio_visual import AUDIO_VISUAL_PROMPT, build_audio_visual_blueprint
+
+
+OMNI_MODEL = "qwen3-omni-flash"
+
+
+async def analyze_reference(video_path: str) -> Dict[str, Any]:
+    """
+    Run all applicable reference analyses concurrently.
+
+    Args:
+        video_path: Local video path or http/https URL
+
+    Returns:
+        Dict with "narrative", "style" and optionally "audio_visual" sections
+
+    Raises:
+        Exception: If any analysis fails
+    """
+    is_url = video_path.startswith(('http://', 'https://'))
+
+    if not is_url:
+        video_file = Path(video_path)
+        if not video_file.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        video_path = str(video_file.absolute())
+        print(
+            "Note: local file - skipping audio-visual analysis (requires http/https URL)",
+            file=sys.stderr
+        )
+
+    # Initialize client (retry logic handled internally)
+    client = get_shared_client()
+
+    # Style times cuts and shots, so its proxy keeps the source frame rate
+    tasks = {
+        "narrative": client.analyze_video_structured_async(
+            prepare_for_upload(video_path), NARRATIVE_ANALYSIS_PROMPT
+        ),
+        "style": client.analyze_video_structured_async(
+            prepare_for_upload(video_path, keep_fps=True), STYLE_ANALYSIS_PROMPT
+        )
+    }
+    if is_url:
+        tasks["audio_visual"] = client.analyze_video_structured_async(
+            video_path, AUDIO_VISUAL_PROMPT, model=OMNI_MODEL
+        )
+
+    print(f"Running {', '.join(tasks)} concurrently for: {video_path}", file=sys.stderr)
+    results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+
+    # All sections share one analyzed_at timestamp
+    with request_scope():
+        analysis = {
+            "narrative": build_narrative_analysis(video_path, results["narrative"]),
+            "style": build_style_blueprint(video_path, results["style"])
+        }
+        if "audio_visual" in results:
+            analysis["audio_visual"] = build_audio_visual_blueprint(
+                video_path, results["audio_visual"], OMNI_MODEL
+            )
+
+    return analysis
+
+
+def main():
+    """CLI entry point."""
+    args = build_parser("analyze_reference").parse_args()
+    video_input = args.video_input
+    output_path = args.output_path
+
+    try:
+        # Read video URL from txt file if needed
+        if video_input.endswith('.txt'):
+            txt_file = Path(video_input)
+            if not txt_file.exists():
+                raise FileNotFoundError(f"Text file not found: {video_input}")
+            video_path = txt_file.read_text().strip()
+            print(f"Read video URL from {video_input}: {video_path}", file=sys.stderr)
+        else:
+            video_path = video_input
+
+        # Analyze video
+        analysis = asyncio.run(analyze_reference(video_path))
+
+        # Output results (file, or stdout for agent consumption)
+        write_json(analysis, output_path)
+
+        if output_path:
+            print(f"Reference analysis saved to: {output_path}", file=sys.stderr)
+
+        sys.exit(0)
+
+    except Exception as e:
+        error_output = {
+            "error": str(e),
+            "video_input": video_input
+        }
+        print(json.dumps(error_output), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
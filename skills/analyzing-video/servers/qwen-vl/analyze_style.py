@@ -19,10 +19,12 @@ Usage:
 import sys
 import json
 from pathlib import Path
-from datetime import datetime
 from typing import Dict, Any
 
-from qwen_client import QwenVLClient
+from jsonio import write_json
+from timeutil import now_iso
+from cli import build_parser
+from media import get_video_duration
 
 
 # Style analysis prompt template
@@ -64,38 +66,42 @@ Focus on:
 Be specific and objective. Use measurements where possible."""
 
 
-def get_video_duration(video_path: str) -> float:
+# Sections every analysis must contain
+REQUIRED_STYLE_KEYS = frozenset({"pacing", "visual_style", "text_overlays", "audio_sync"})
+
+
+def build_style_blueprint(video_path: str, style_data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Get video duration using ffprobe if available.
-    Falls back to 0.0 if ffprobe not found.
+    Wrap raw style JSON from the model into the final blueprint.
 
     Args:
-        video_path: Path to video file
+        video_path: Absolute path of the analyzed video
+        style_data: Parsed style JSON from the model
 
     Returns:
-        Duration in seconds
+        Style blueprint dict
     """
-    import subprocess
+    # Get video duration
+    duration = get_video_duration(video_path)
 
-    try:
-        result = subprocess.run(
-            [
-                'ffprobe',
-                '-v', 'error',
-                '-show_entries', 'format=duration',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                video_path
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10
+    # Construct final blueprint
+    blueprint = {
+        "video_path": video_path,
+        "duration": duration,
+        "analyzed_at": now_iso(),
+        **style_data
+    }
+
+    # Validate structure (missing sections default to empty)
+    missing = REQUIRED_STYLE_KEYS - blueprint.keys()
+    for key in sorted(missing):
+        print(
+            f"Warning: Missing '{key}' in model response. Using defaults.",
+            file=sys.stderr
         )
-        if result.returncode == 0:
-            return float(result.stdout.strip())
-    except (subprocess.TimeoutExpired, FileNotFoundError, ValueError):
-        pass
+    blueprint.update({key: {} for key in missing})
 
-    return 0.0
+    return blueprint
 
 
 def analyze_style(video_path: str) -> Dict[str, Any]:
@@ -116,67 +122,29 @@ def analyze_style(video_path: str) -> Dict[str, Any]:
     if not video_file.exists():
         raise FileNotFoundError(f"Video file not found: {video_path}")
 
-    print(f"Analyzing style for: {video_path}", file=sys.stderr)
-
-    # Initialize client (retry logic handled internally)
-    client = QwenVLClient()
+    # Shares analyze_all's combined request (cached), so the other
+    # analyses of this video cost no further requests
+    from analyze_all import analyze_sections
 
-    # Analyze video (returns parsed JSON)
-    print("Sending request to Qwen VL...", file=sys.stderr)
-    style_data = client.analyze_video_structured(
-        video_path=str(video_file.absolute()),
-        prompt=STYLE_ANALYSIS_PROMPT
-    )
-
-    # Get video duration
-    duration = get_video_duration(str(video_file.absolute()))
-
-    # Construct final blueprint
-    blueprint = {
-        "video_path": str(video_file.absolute()),
-        "duration": duration,
-        "analyzed_at": datetime.utcnow().isoformat() + "Z",
-        **style_data
-    }
-
-    # Validate structure
-    required_keys = ["pacing", "visual_style", "text_overlays", "audio_sync"]
-    for key in required_keys:
-        if key not in blueprint:
-            print(
-                f"Warning: Missing '{key}' in model response. Using defaults.",
-                file=sys.stderr
-            )
-            blueprint[key] = {}
-
-    return blueprint
+    video_path, _, sections = analyze_sections(video_path)
+    return build_style_blueprint(video_path, sections.pop("style"))
 
 
 def main():
     """CLI entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: python analyze_style.py <video_path> [output_path]", file=sys.stderr)
-        sys.exit(1)
-
-    video_path = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    args = build_parser("analyze_style").parse_args()
+    video_path = args.video_path
+    output_path = args.output_path
 
     try:
         # Analyze video
         blueprint = analyze_style(video_path)
 
-        # Output results
-        json_output = json.dumps(blueprint, indent=2)
+        # Output results (file, or stdout for agent consumption)
+        write_json(blueprint, output_path)
 
         if output_path:
-            # Save to file
-            output_file = Path(output_path)
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            output_file.write_text(json_output)
             print(f"Style blueprint saved to: {output_path}", file=sys.stderr)
-        else:
-            # Print to stdout for agent consumption
-            print(json_output)
 
         sys.exit(0)
 
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Bulk Reference Video Analysis (Batch API)
+
+Runs narrative, style and audio-visual analyses for many reference videos
+through the DashScope Batch API (OpenAI-compatible). Batch jobs are
+cheaper and have higher rate limits than interactive calls, but may take
+a while to complete - use this for offline pipelines, not interactive work.
+
+Videos must be http/https URLs. The input is a .txt file with one URL per
+line, or a directory of such .txt files.
+
+Each video produces one JSON file with "narrative", "style" and
+"audio_visual" sections, matching the single-analysis scripts' output.
+
+Usage:
+    python batch_analyze.py <videos_dir_or_txt_file> [output_dir]
+
+Example:
+    python batch_analyze.py inputs/reference-urls/ outputs/reference-analyses/
+"""
+
+import sys
+import json
+from pathlib import Path
+from typing import Dict, Any, List
+
+from qwen_client import get_shared_client
+from jsonio import write_json
+from timeutil import request_scope
+from cli import build_parser
+from analyze_narrative import NARRATIVE_ANALYSIS_PROMPT, build_narrative_analysis
+from analyze_style import STYLE_ANALYSIS_PROMPT, build_style_blueprint
+from analyze_audio_visual import AUDIO_VISUAL_PROMPT, build_audio_visual_blueprint
+
+
+VL_MODEL = "qwen3-vl-235b-a22b-thinking"
+OMNI_MODEL = "qwen3-omni-flash"
+
+# Section name -> (prompt, model)
+ANALYSES = {
+    "narrative": (NARRATIVE_ANALYSIS_PROMPT, VL_MODEL),
+    "style": (STYLE_ANALYSIS_PROMPT, VL_MODEL),
+    "audio_visual": (AUDIO_VISUAL_PROMPT, OMNI_MODEL)
+}
+
+
+def read_video_urls(source: str) -> List[str]:
+    """
+    Collect video URLs from a .txt file or a directory of .txt files.
+
+    Args:
+        source: Path to .txt file or directory
+
+    Returns:
+        List of http/https URLs (one per non-empty line)
+    """
+    source_path = Path(source)
+    if not source_path.exists():
+        raise FileNotFoundError(f"Input not found: {source}")
+
+    txt_files = sorted(source_path.glob("*.txt")) if source_path.is_dir() else [source_path]
+
+    urls = []
+    for txt_file in txt_files:
+        for line in txt_file.read_text().splitlines():
+            line = line.strip()
+            if line and not line.startswith('#'):
+                urls.append(line)
+
+    if not urls:
+        raise ValueError(f"No video URLs found in: {source}")
+
+    return urls
+
+
+def batch_analyze(video_urls: List[str]) -> List[Dict[str, Any]]:
+    """
+    Analyze many videos with one Batch API submission per model.
+
+    Args:
+        video_urls: http/https video URLs
+
+    Returns:
+        One combined analysis dict per video, in input order
+    """
+    jobs = [
+        (url, prompt, model)
+        for url in video_urls
+        for prompt, model in ANALYSES.values()
+    ]
+    print(f"Submitting {len(jobs)} jobs for {len(video_urls)} video(s)", file=sys.stderr)
+
+    client = get_shared_client()
+    results = iter(client.submit_batch(jobs))
+
+    analyses = []
+    # One analyzed_at timestamp for the whole batch
+    with request_scope():
+        for url in video_urls:
+            sections = {name: next(results) for name in ANALYSES}
+            analysis = {"video_url": url}
+
+            for name, data in sections.items():
+                if "error" in data:
+                    analysis[name] = data
+                elif name == "narrative":
+                    analysis[name] = build_narrative_analysis(url, data)
+                elif name == "style":
+                    analysis[name] = build_style_blueprint(url, data)
+                else:
+                    analysis[name] = build_audio_visual_blueprint(url, data, OMNI_MODEL)
+
+            analyses.append(analysis)
+
+    return analyses
+
+
+def main():
+    """CLI entry point."""
+    args = build_parser("batch_analyze").parse_args()
+    source = args.source
+    output_dir = args.output_dir
+
+    try:
+        video_urls = read_video_urls(source)
+        analyses = batch_analyze(video_urls)
+
+        if output_dir:
+            # One file per video, named after the URL's file name
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
+            for index, analysis in enumerate(analyses):
+                stem = Path(analysis["video_url"].split('?', 1)[0]).stem or "video"
+                write_json(analysis, str(output_path / f"{index:03d}-{stem}.json"))
+            print(f"{len(analyses)} analyses saved to: {output_dir}", file=sys.stderr)
+        else:
+            # Print to stdout for agent consumption
+            write_json(analyses)
+
+        sys.exit(0)
+
+    except Exception as e:
+        error_output = {
+            "error": str(e),
+            "source": source
+        }
+        print(json.dumps(error_output), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Shared argument parsing for the analysis CLIs.
+
+Every script builds its parser with build_parser(cmd), so positional
+arguments, --model and usage/help text are defined in one place.
+Invalid arguments print usage to stderr and exit with status 2.
+"""
+
+import argparse
+from typing import Callable, Dict, Tuple
+
+
+VL_MODEL = "qwen3-vl-235b-a22b-thinking"
+
+MODELS_HELP = """models:
+  qwen3-vl-235b-a22b-thinking  (default, local video files)
+  qwen3-omni-flash             (audio-aware; local files are uploaded)"""
+
+
+def _add_output(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("output_path", nargs="?", help="Output JSON file (default: stdout)")
+
+
+def _ask(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("video_path", help="Local video file or http/https URL")
+    parser.add_argument("question", help="Question about the video")
+    parser.add_argument("--model", default=VL_MODEL, help=f"Model to use (default: {VL_MODEL})")
+
+
+def _video_file(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("video_path", help="Local video file")
+    _add_output(parser)
+
+
+def _video_input(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("video_input", help="Video path, http/https URL, or .txt file containing the URL")
+    _add_output(parser)
+
+
+def _video_url(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("video_input", help="Video URL (http/https) or .txt file containing the URL")
+    _add_output(parser)
+
+
+def _batch(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("source", help=".txt file with one video URL per line, or a directory of them")
+    parser.add_argument("output_dir", nargs="?", help="Directory for per-video JSON files (default: stdout)")
+
+
+def _human_refine(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("window_clip", help="Path to extracted window clip")
+    parser.add_argument("window_start", type=float, help="When the window starts in original video (seconds)")
+    parser.add_argument("model_start", type=float, help="Model's suggested start time (relative to window)")
+    parser.add_argument("model_end", type=float, help="Model's suggested end time (relative to window)")
+    parser.add_argument("description", help="What the clip should show")
+
+
+def _refine_broll(parser: argparse.ArgumentParser) -> None:
+    # Positionals are optional so --batch can stand alone; main() checks them
+    parser.add_argument("source_video", nargs="?", help="Path to source video file")
+    parser.add_argument("start_time", nargs="?", type=float, help="Approximate start time in seconds (from Tier 1)")
+    parser.add_argument("end_time", nargs="?", type=float, help="Approximate end time in seconds (from Tier 1)")
+    parser.add_argument("description", nargs="?", help="What the clip should show")
+    parser.add_argument("feedback", nargs="?", help="Human feedback about what's wrong with the clip")
+    parser.add_argument("window_padding", nargs="?", type=int, default=20,
+                        help="Seconds to extract around the clip (default: 20)")
+    parser.add_argument("--batch", metavar="CLIPS_JSON",
+                        help="Refine every clip in a JSON list of {source_video, start, end, description, "
+                             "feedback?, window_padding?} objects")
+    parser.add_argument("--reencode", action="store_true",
+                        help="Re-encode windows at 10 FPS instead of stream-copying them")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-extract windows even if they were extracted before")
+
+
+# Command -> (description, example usage, argument builder)
+COMMANDS: Dict[str, Tuple[str, str, Callable[[argparse.ArgumentParser], None]]] = {
+    "ask": (
+        "Ask any question about a video using Qwen VL.",
+        'python ask.py video.mp4 "What happens in this video?"\n'
+        '  python ask.py "https://cdn.example.com/video.mp4" "Describe the music" --model qwen3-omni-flash',
+        _ask
+    ),
+    "analyze_narrative": (
+        "Extract the narrative structure of a reference video.",
+        "python analyze_narrative.py inputs/reference.mp4 outputs/narrative.json",
+        _video_file
+    ),
+    "analyze_style": (
+        "Extract the visual style blueprint of a reference video.",
+        "python analyze_style.py inputs/reference.mp4 outputs/style-blueprint.json",
+        _video_file
+    ),
+    "analyze_audio_visual": (
+        "Analyze audio-visual synchronization with qwen3-omni-flash.",
+        "python analyze_audio_visual.py inputs/reference-url.txt outputs/audio-visual-blueprint.json\n"
+        '  python analyze_audio_visual.py "https://cdn.example.com/video.mp4"',
+        _video_url
+    ),
+    "analyze_all": (
+        "Run narrative, style and (for URLs) audio-visual analysis in one request.",
+        "python analyze_all.py inputs/reference.mp4 outputs/reference-analysis.json\n"
+        '  python analyze_all.py "https://cdn.example.com/video.mp4"',
+        _video_input
+    ),
+    "analyze_reference": (
+        "Run narrative, style and (for URLs) audio-visual analysis concurrently.",
+        "python analyze_reference.py inputs/reference.mp4 outputs/reference-analysis.json\n"
+        '  python analyze_reference.py "https://cdn.example.com/video.mp4"',
+        _video_input
+    ),
+    "batch_analyze": (
+        "Analyze many reference videos through the Batch API.",
+        "python batch_analyze.py inputs/reference-urls/ outputs/reference-analyses/",
+        _batch
+    ),
+    "human_refine_broll": (
+        "Interactively correct B-roll clip boundaries.",
+        'python human_refine_broll.py outputs/clip_window.mp4 63 5.2 10.7 "AI interface animation"',
+        _human_refine
+    ),
+    "refine_broll_clip": (
+        "Refine B-roll clip timestamps to frame accuracy.",
+        'python refine_broll_clip.py inputs/source.mp4 83 88 "AI tool interface"\n'
+        '  python refine_broll_clip.py inputs/source.mp4 83 88 "AI tool interface" "starts too late"\n'
+        '  python refine_broll_clip.py inputs/source.mp4 83 88 "AI tool interface" "" 15\n'
+        "  python refine_broll_clip.py --batch outputs/clips-to-refine.json --reencode",
+        _refine_broll
+    ),
+}
+
+
+def build_parser(cmd: str) -> argparse.ArgumentParser:
+    """
+    Build the argument parser for one CLI.
+
+    Args:
+        cmd: Command name (script name without .py), a key of COMMANDS
+
+    Returns:
+        Configured ArgumentParser
+
+    Raises:
+        KeyError: If cmd is not a known command
+    """
+    description, example, add_arguments = COMMANDS[cmd]
+
+    epilog = f"example:\n  {example}"
+    if cmd == "ask":
+        epilog = f"{MODELS_HELP}\n\n{epilog}"
+
+    parser = argparse.ArgumentParser(
+        prog=f"python {cmd}.py",
+        description=description,
+        epilog=epilog,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_arguments(parser)
+    return parser
@@ -22,30 +22,53 @@ Example:
 import sys
 import json
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
 
+from jsonio import write_json
+from timeutil import now_iso
+from cli import build_parser
 
-def display_clip_info(
-    window_clip: str,
-    window_start: float,
-    model_start: float,
-    model_end: float,
-    description: str
-) -> None:
+
+@dataclass(frozen=True, slots=True)
+class Window:
+    """
+    Extracted window and the model's suggestion inside it.
+
+    model_start/model_end are relative to the window clip (which starts at
+    0:00); the properties convert them to original-video time.
+    """
+    window_start: float
+    model_start: float
+    model_end: float
+
+    @property
+    def absolute_start(self) -> float:
+        return self.window_start + self.model_start
+
+    @property
+    def absolute_end(self) -> float:
+        return self.window_start + self.model_end
+
+    @property
+    def duration(self) -> float:
+        return self.model_end - self.model_start
+
+    def to_absolute(self, seconds: float) -> float:
+        """Convert a window-relative time to original-video time."""
+        return self.window_start + seconds
+
+
+def display_clip_info(window_clip: str, window: Window, description: str) -> None:
     """
     Display clip information for human review.
 
     Args:
         window_clip: Path to extracted window clip
-        window_start: When window starts in original video
-        model_start: Model's start (relative to window)
-        model_end: Model's end (relative to window)
+        window: Window position and model suggestion
         description: What clip should show
     """
-    absolute_start = window_start + model_start
-    absolute_end = window_start + model_end
-    duration = model_end - model_start
+    window_start = window.window_start
 
     print(f"\n{'='*70}", file=sys.stderr)
     print(f"B-ROLL CLIP NEEDS HUMAN REFINEMENT", file=sys.stderr)
@@ -55,151 +78,296 @@ def display_clip_info(
     print(f"  📁 {window_clip}", file=sys.stderr)
     print(f"  ⏱️  Window covers: {window_start:.1f}s - {window_start + 40:.1f}s (±20s)", file=sys.stderr)
     print(f"\nModel's best guess:", file=sys.stderr)
-    print(f"  In original video: {absolute_start:.2f}s - {absolute_end:.2f}s", file=sys.stderr)
-    print(f"  Duration: {duration:.2f}s", file=sys.stderr)
+    print(f"  In original video: {window.absolute_start:.2f}s - {window.absolute_end:.2f}s", file=sys.stderr)
+    print(f"  Duration: {window.duration:.2f}s", file=sys.stderr)
     print(f"\n{'='*70}", file=sys.stderr)
     print(f"\n⚠️  WATCH THE CLIP FIRST: {window_clip}", file=sys.stderr)
     print(f"    Use a video player to review the extracted window", file=sys.stderr)
     print(f"{'='*70}\n", file=sys.stderr)
 
 
-def get_human_feedback() -> Dict[str, Any]:
+# Menu choices: key -> label
+USABLE_CHOICES = [
+    ("y", "Yes, with corrections"),
+    ("n", "No, completely wrong clip"),
+    ("s", "Skip this clip for now")
+]
+
+ISSUE_CHOICES = [
+    ("s", "Starts too late (missing beginning)"),
+    ("e", "Ends too late (includes extra content)"),
+    ("b", "Both start and end need correction"),
+    ("o", "Other issue"),
+    ("g", "Actually looks good, accept it")
+]
+
+
+def _build_feedback(
+    usable: str,
+    issue_type: str,
+    new_start: float,
+    new_end: float,
+    feedback: str
+) -> Dict[str, Any]:
+    """Turn the answers into the human_response dict."""
+    if usable == 'n':
+        return {
+            "action": "reject",
+            "reason": feedback,
+            "corrected_timestamp": None
+        }
+
+    if usable == 's':
+        return {
+            "action": "skip",
+            "reason": "User chose to skip",
+            "corrected_timestamp": None
+        }
+
+    if issue_type == 'g':
+        return {
+            "action": "accept",
+            "reason": "Human approved model's timestamps",
+            "corrected_timestamp": None
+        }
+
+    return {
+        "action": "refine",
+        "issue_type": issue_type,
+        "corrected_timestamp": {
+            "start_seconds": new_start,
+            "end_seconds": new_end
+        },
+        "feedback": feedback or None
+    }
+
+
+def _timestamp_error(start: float, end: float) -> Optional[str]:
+    """Return why corrected window timestamps are invalid, or None if they're fine."""
+    if start < 0 or end < 0:
+        return "Start/end can't be negative"
+    if end <= start:
+        return "End must be after start"
+    return None
+
+
+def _feedback_form(window: Window) -> Dict[str, Any]:
     """
-    Interactive Q&A to get human corrections.
+    Collect all answers on one prompt_toolkit form (rendered to stderr).
 
-    Returns:
-        Dict with human's corrections and feedback
+    Start/end are validated before the form can be submitted, so nothing
+    is sent back to the orchestrator until every answer is valid.
+
+    Raises:
+        KeyboardInterrupt: If the form is cancelled (Ctrl-C)
     """
+    from prompt_toolkit.application import Application
+    from prompt_toolkit.key_binding import KeyBindings
+    from prompt_toolkit.key_binding.bindings.focus import focus_next, focus_previous
+    from prompt_toolkit.layout import HSplit, Layout
+    from prompt_toolkit.output import create_output
+    from prompt_toolkit.widgets import Button, Frame, Label, RadioList, TextArea
+
+    model_start, model_end = window.model_start, window.model_end
+
+    usable = RadioList(USABLE_CHOICES)
+    issue = RadioList(ISSUE_CHOICES)
+    start_field = TextArea(text=f"{model_start:.2f}", multiline=False)
+    end_field = TextArea(text=f"{model_end:.2f}", multiline=False)
+    feedback_field = TextArea(multiline=False)
+    error = Label("")
+
+    def submit() -> None:
+        new_start, new_end = model_start, model_end
+        if usable.current_value == 'y':
+            try:
+                if issue.current_value in ('s', 'b'):
+                    new_start = float(start_field.text)
+                if issue.current_value in ('e', 'b'):
+                    new_end = float(end_field.text)
+            except ValueError:
+                error.text = "Start/end must be numbers (seconds)"
+                return
+            problem = _timestamp_error(new_start, new_end)
+            if problem:
+                error.text = problem
+                return
+
+        app.exit(result=_build_feedback(
+            usable.current_value, issue.current_value,
+            new_start, new_end, feedback_field.text.strip()
+        ))
+
+    kb = KeyBindings()
+    kb.add("tab")(focus_next)
+    kb.add("s-tab")(focus_previous)
+
+    @kb.add("c-c")
+    def _cancel(event) -> None:
+        event.app.exit(exception=KeyboardInterrupt())
+
+    app = Application(
+        layout=Layout(HSplit([
+            Label("Tab/Shift-Tab to move, Enter/Space to select"),
+            Frame(usable, title="1. Is this clip usable?"),
+            Frame(issue, title="2. What's wrong with the model's timestamps? (if usable)"),
+            Frame(
+                HSplit([
+                    Label(f"Model suggested: {model_start:.2f}s - {model_end:.2f}s (window clip starts at 0:00)"),
+                    Label("Start (seconds):"), start_field,
+                    Label("End (seconds):"), end_field
+                ]),
+                title="3. Corrected timestamps (used for s/e/b)"
+            ),
+            Frame(feedback_field, title="4. Feedback / reason if wrong (optional, for learning)"),
+            error,
+            Button("Submit", handler=submit)
+        ])),
+        key_bindings=kb,
+        output=create_output(stdout=sys.stderr),
+        full_screen=False
+    )
+    return app.run()
+
+
+def _prompt_feedback(window: Window) -> Dict[str, Any]:
+    """Line-by-line Q&A via input() (no TTY or prompt_toolkit missing)."""
+    model_start, model_end = window.model_start, window.model_end
     print("Please answer the following questions:\n")
 
     # Question 1: Is the clip usable at all?
     print("1. Is this clip usable?")
-    print("   [y] Yes, with corrections")
-    print("   [n] No, completely wrong clip")
-    print("   [s] Skip this clip for now")
+    for key, label in USABLE_CHOICES:
+        print(f"   [{key}] {label}")
 
     usable = input("\nYour choice: ").lower().strip()
 
     if usable == 'n':
         reason = input("\nWhy is it wrong? (for learning): ")
-        return {
-            "action": "reject",
-            "reason": reason,
-            "corrected_timestamp": None
-        }
+        return _build_feedback(usable, "", model_start, model_end, reason)
 
     if usable == 's':
-        return {
-            "action": "skip",
-            "reason": "User chose to skip",
-            "corrected_timestamp": None
-        }
+        return _build_feedback(usable, "", model_start, model_end, "")
 
     # Question 2: What's wrong with current timestamps?
     print("\n2. What's wrong with the model's timestamps?")
-    print("   [s] Starts too late (missing beginning)")
-    print("   [e] Ends too late (includes extra content)")
-    print("   [b] Both start and end need correction")
-    print("   [o] Other issue")
-    print("   [g] Actually looks good, accept it")
+    for key, label in ISSUE_CHOICES:
+        print(f"   [{key}] {label}")
 
     issue_type = input("\nYour choice: ").lower().strip()
 
     if issue_type == 'g':
-        return {
-            "action": "accept",
-            "reason": "Human approved model's timestamps",
-            "corrected_timestamp": None
-        }
+        return _build_feedback(usable, issue_type, model_start, model_end, "")
 
     # Question 3: Provide specific timestamps
     print("\n3. Provide corrected timestamps (in seconds, relative to the WINDOW CLIP)")
     print(f"   Window clip starts at 0:00")
     print(f"   Model suggested: {model_start:.2f}s - {model_end:.2f}s")
 
-    if issue_type in ['s', 'b']:
-        new_start = input(f"\nCorrect start time (seconds): ").strip()
+    # Ask again until the pair is valid, as the form does
+    while True:
+        new_start, new_end = model_start, model_end
         try:
-            new_start = float(new_start)
+            if issue_type in ['s', 'b']:
+                new_start = float(input(f"\nCorrect start time (seconds): ").strip())
+            if issue_type in ['e', 'b']:
+                new_end = float(input(f"Correct end time (seconds): ").strip())
         except ValueError:
-            print("Invalid input, using model's start time")
-            new_start = model_start
-    else:
-        new_start = model_start
+            print("Start/end must be numbers (seconds), try again")
+            continue
 
-    if issue_type in ['e', 'b']:
-        new_end = input(f"Correct end time (seconds): ").strip()
-        try:
-            new_end = float(new_end)
-        except ValueError:
-            print("Invalid input, using model's end time")
-            new_end = model_end
-    else:
-        new_end = model_end
+        problem = _timestamp_error(new_start, new_end)
+        if problem is None:
+            break
+        print(f"{problem}, try again")
 
     # Question 4: Additional feedback
     feedback = input("\nAdditional feedback (optional, for learning): ").strip()
 
-    return {
-        "action": "refine",
-        "issue_type": issue_type,
-        "corrected_timestamp": {
-            "start_seconds": new_start,
-            "end_seconds": new_end
-        },
-        "feedback": feedback or None
-    }
+    return _build_feedback(usable, issue_type, new_start, new_end, feedback)
+
+
+def get_human_feedback(window: Window) -> Dict[str, Any]:
+    """
+    Interactive Q&A to get human corrections.
+
+    Uses a single prompt_toolkit form on a terminal, falling back to
+    line-by-line input() prompts when stdin isn't a TTY (e.g. scripted
+    answers piped in) or prompt_toolkit isn't installed.
+
+    Args:
+        window: Window position and model suggestion
+
+    Returns:
+        Dict with human's corrections and feedback
+    """
+    if sys.stdin.isatty() and sys.stderr.isatty():
+        try:
+            import prompt_toolkit  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            return _feedback_form(window)
+
+    return _prompt_feedback(window)
 
 
 def apply_human_corrections(
-    window_start: float,
+    window: Window,
     human_response: Dict[str, Any]
 ) -> Dict[str, Any]:
     """
     Apply human corrections to build final result.
 
     Args:
-        window_start: When window starts in original video
+        window: Window position and model suggestion
         human_response: Human's corrections from interactive session
 
     Returns:
         Final refined result with absolute timestamps
-    """
-    if human_response["action"] in ["reject", "skip"]:
-        return {
-            "final_status": human_response["action"],
-            "reason": human_response["reason"],
-            "corrected_timestamp": None,
-            "usable_by_orchestrator": False
-        }
-
-    if human_response["action"] == "accept":
-        # Model's timestamps were good
-        return {
-            "final_status": "accepted_as_is",
-            "reason": human_response["reason"],
-            "corrected_timestamp": None,
-            "usable_by_orchestrator": True
-        }
 
-    # Action is "refine" - apply corrections
-    corrected = human_response["corrected_timestamp"]
-
-    # Convert from window-relative to absolute timestamps
-    absolute_start = window_start + corrected["start_seconds"]
-    absolute_end = window_start + corrected["end_seconds"]
-
-    return {
-        "final_status": "refined_by_human",
-        "corrected_timestamp": {
-            "start": absolute_start,
-            "end": absolute_end,
-            "duration": absolute_end - absolute_start
-        },
-        "human_feedback": human_response.get("feedback"),
-        "issue_type": human_response.get("issue_type"),
-        "usable_by_orchestrator": True
-    }
+    Raises:
+        ValueError: If the response has an unknown action
+    """
+    match human_response["action"]:
+        case "reject" | "skip" as action:
+            return {
+                "final_status": action,
+                "reason": human_response["reason"],
+                "corrected_timestamp": None,
+                "usable_by_orchestrator": False
+            }
+
+        case "accept":
+            # Model's timestamps were good
+            return {
+                "final_status": "accepted_as_is",
+                "reason": human_response["reason"],
+                "corrected_timestamp": None,
+                "usable_by_orchestrator": True
+            }
+
+        case "refine":
+            corrected = human_response["corrected_timestamp"]
+
+            # Convert from window-relative to absolute timestamps
+            absolute_start = window.to_absolute(corrected["start_seconds"])
+            absolute_end = window.to_absolute(corrected["end_seconds"])
+
+            return {
+                "final_status": "refined_by_human",
+                "corrected_timestamp": {
+                    "start": absolute_start,
+                    "end": absolute_end,
+                    "duration": absolute_end - absolute_start
+                },
+                "human_feedback": human_response.get("feedback"),
+                "issue_type": human_response.get("issue_type"),
+                "usable_by_orchestrator": True
+            }
+
+        case action:
+            raise ValueError(f"Unknown human response action: {action}")
 
 
 def interactive_refinement(
@@ -222,24 +390,26 @@ def interactive_refinement(
     Returns:
         Complete refinement result with human corrections
     """
+    window = Window(window_start, model_start, model_end)
+
     # Display info
-    display_clip_info(window_clip, window_start, model_start, model_end, description)
+    display_clip_info(window_clip, window, description)
 
     # Get human feedback
-    human_response = get_human_feedback()
+    human_response = get_human_feedback(window)
 
     # Apply corrections
-    result = apply_human_corrections(window_start, human_response)
+    result = apply_human_corrections(window, human_response)
 
     # Add metadata
     result["window_clip"] = window_clip
     result["window_start"] = window_start
     result["model_suggestion"] = {
-        "start": window_start + model_start,
-        "end": window_start + model_end
+        "start": window.absolute_start,
+        "end": window.absolute_end
     }
     result["description"] = description
-    result["refined_at"] = datetime.utcnow().isoformat() + "Z"
+    result["refined_at"] = now_iso()
     result["refinement_tier"] = "tier3_human"
 
     return result
@@ -247,17 +417,12 @@ def interactive_refinement(
 
 def main():
     """CLI entry point."""
-    if len(sys.argv) < 6:
-        print("Usage: python human_refine_broll.py <window_clip_path> <window_start> <model_start> <model_end> <description>", file=sys.stderr)
-        print("\nExample:", file=sys.stderr)
-        print('  python human_refine_broll.py outputs/clip_window.mp4 63 5.2 10.7 "AI interface animation"', file=sys.stderr)
-        sys.exit(1)
-
-    window_clip = sys.argv[1]
-    window_start = float(sys.argv[2])
-    model_start = float(sys.argv[3])
-    model_end = float(sys.argv[4])
-    description = sys.argv[5]
+    args = build_parser("human_refine_broll").parse_args()
+    window_clip = args.window_clip
+    window_start = args.window_start
+    model_start = args.model_start
+    model_end = args.model_end
+    description = args.description
 
     # Validate window clip exists
     if not Path(window_clip).exists():
@@ -276,7 +441,7 @@ def main():
         )
 
         # Output JSON to stdout for agent consumption
-        print(json.dumps(result, indent=2))
+        write_json(result)
 
         # Exit code based on final status
         if result.get("usable_by_orchestrator"):
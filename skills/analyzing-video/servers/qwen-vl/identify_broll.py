@@ -13,27 +13,60 @@ Usage:
     script_keywords: Comma-separated keywords for relevance scoring
     output_path: Optional file path for output (defaults to stdout)
 
+Environment:
+    QWEN_BATCH: Source videos per model request (default: 4)
+    BROLL_TOPK: Output only the N most relevant clips (default: 0 = all)
+
 Example:
     python identify_broll.py inputs/source-videos/ "ai,automation,productivity" outputs/broll-clips.json
 """
 
+import os
 import sys
 import json
+import heapq
+import operator
+import functools
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any, List
-import glob
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from qwen_client import QwenVLClient, get_shared_client
+from timeutil import now_iso
+from jsonio import write_json, error_message
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None  # Falls back to per-keyword substring tests
+
+
+# Videos packed into one multi-video request
+BROLL_BATCH = max(int(os.getenv("QWEN_BATCH", "4")), 1)
 
-from qwen_client import QwenVLClient
+# Keep only the N most relevant clips in the output (0 = keep all)
+BROLL_TOPK = max(int(os.getenv("BROLL_TOPK", "0")), 0)
+
+_relevance_key = operator.itemgetter("relevance_score")
+
+# Visual quality -> weighted (0.2) score; unknown values score as medium
+QUALITY_SCORES = {"high": 1.0 * 0.2, "medium": 0.6 * 0.2, "low": 0.3 * 0.2}
+MEDIUM_QUALITY_SCORE = QUALITY_SCORES["medium"]
+
+# Source video file types (matched case-insensitively)
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.mkv', '.webm'})
 
 
 # B-roll identification prompt template
-def create_broll_prompt(keywords: List[str]) -> str:
+@functools.lru_cache(maxsize=32)
+def create_broll_prompt(keywords: Tuple[str, ...]) -> str:
     """
     Create B-roll identification prompt with script keywords.
 
+    Memoized: every video in a run shares one prompt string.
+
     Args:
-        keywords: List of relevant keywords from script
+        keywords: Relevant keywords from script (a tuple, so it can be cached)
 
     Returns:
         Formatted prompt string
@@ -77,7 +110,100 @@ For each clip, include:
 Be selective - only include clips that would actually work well as B-roll."""
 
 
-def calculate_relevance_score(clip: Dict[str, Any], keywords: List[str]) -> float:
+def normalize_keywords(keywords: List[Any]) -> List[str]:
+    """
+    Flatten nested keyword lists and lowercase/strip every keyword.
+
+    Args:
+        keywords: Script keywords (strings, or lists of strings)
+
+    Returns:
+        Normalized keywords, in order (duplicates kept)
+    """
+    keywords_flat = []
+    for k in keywords:
+        if isinstance(k, list):
+            keywords_flat.extend([str(item).lower().strip() for item in k])
+        else:
+            keywords_flat.append(str(k).lower().strip())
+    return keywords_flat
+
+
+class KeywordMatcher:
+    """
+    Find which keywords occur as substrings of a text in one pass.
+
+    Uses a pyahocorasick automaton (a single scan of the text for all
+    keywords) when installed, and a substring test per keyword otherwise.
+    Also carries the normalized keywords and their precomputed reciprocal
+    count, so per-clip scoring does no keyword preparation.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Args:
+            keywords: Normalized (lowercase) keywords, see normalize_keywords()
+        """
+        self.keywords = tuple(keywords)
+        self.inv_count = 1.0 / max(len(self.keywords), 1)
+
+        words = set(self.keywords)
+        # "" is a substring of every text but can't go in the automaton
+        self._empty = "" in words
+        self._words = words - {""}
+        self._automaton = None
+
+        if ahocorasick is not None and self._words:
+            self._automaton = ahocorasick.Automaton()
+            for word in self._words:
+                self._automaton.add_word(word, word)
+            self._automaton.make_automaton()
+
+    def _scan(self, text: str) -> Set[str]:
+        """Get the non-empty keywords occurring in text."""
+        if self._automaton is not None:
+            return {word for _, word in self._automaton.iter(text)}
+        return {word for word in self._words if word in text}
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Get the keywords occurring in text.
+
+        Args:
+            text: Lowercase text to search
+
+        Returns:
+            Set of matched keywords
+        """
+        matched = self._scan(text)
+        if self._empty:
+            matched.add("")
+        return matched
+
+    def find_any(self, texts: Iterable[str]) -> Set[str]:
+        """
+        Get the keywords occurring in at least one of texts.
+
+        Tags mostly equal keywords exactly, so those are found with one set
+        intersection first; the substring scan then covers distinct texts
+        only until every keyword has matched.
+        """
+        texts = set(texts)
+        matched = self._words & texts
+        for text in texts:
+            if len(matched) == len(self._words):
+                break
+            matched |= self._scan(text)
+        if self._empty and texts:
+            matched.add("")
+        return matched
+
+    def count(self, matched: Set[str]) -> int:
+        """Count keywords (duplicates included) that are in matched."""
+        return sum(1 for kw in self.keywords if kw in matched)
+
+
+def calculate_relevance_score(clip: Dict[str, Any], matcher: KeywordMatcher) -> float:
     """
     Calculate relevance score for a clip based on keywords.
 
@@ -88,37 +214,31 @@ def calculate_relevance_score(clip: Dict[str, Any], keywords: List[str]) -> floa
 
     Args:
         clip: Clip dict with tags, description, visual_quality
-        keywords: List of script keywords
+        matcher: KeywordMatcher built once from the normalized script keywords
 
     Returns:
         Relevance score (0.0 to 1.0)
     """
+    # Visual quality (0.2 weight)
+    quality_score = QUALITY_SCORES.get(clip.get("visual_quality", "medium"), MEDIUM_QUALITY_SCORE)
+
+    # No keywords: nothing to match, quality is the whole score
+    if not matcher.keywords:
+        return round(quality_score, 2)
+
     score = 0.0
-    # Ensure keywords are strings (handle if they're nested lists)
-    keywords_flat = []
-    for k in keywords:
-        if isinstance(k, list):
-            keywords_flat.extend([str(item).lower().strip() for item in k])
-        else:
-            keywords_flat.append(str(k).lower().strip())
-    keywords_lower = keywords_flat
 
     # Check tags (0.5 weight)
     tags = clip.get("tags", [])
     # Ensure tags are strings
     tags_lower = [str(t).lower() if not isinstance(t, str) else t.lower() for t in tags]
-    tag_matches = sum(1 for kw in keywords_lower if any(kw in tag for tag in tags_lower))
-    tag_score = min(tag_matches / max(len(keywords_lower), 1), 1.0) * 0.5
+    tag_matches = matcher.count(matcher.find_any(tags_lower))
+    tag_score = min(tag_matches * matcher.inv_count, 1.0) * 0.5
 
     # Check description (0.3 weight)
     description = clip.get("description", "").lower()
-    desc_matches = sum(1 for kw in keywords_lower if kw in description)
-    desc_score = min(desc_matches / max(len(keywords_lower), 1), 1.0) * 0.3
-
-    # Visual quality (0.2 weight)
-    quality_map = {"high": 1.0, "medium": 0.6, "low": 0.3}
-    quality = clip.get("visual_quality", "medium")
-    quality_score = quality_map.get(quality, 0.6) * 0.2
+    desc_matches = matcher.count(matcher.find(description))
+    desc_score = min(desc_matches * matcher.inv_count, 1.0) * 0.3
 
     score = tag_score + desc_score + quality_score
 
@@ -128,7 +248,8 @@ def calculate_relevance_score(clip: Dict[str, Any], keywords: List[str]) -> floa
 def identify_broll_clips(
     video_path: str,
     keywords: List[str],
-    client: QwenVLClient
+    client: QwenVLClient,
+    matcher: Optional[KeywordMatcher] = None
 ) -> List[Dict[str, Any]]:
     """
     Identify B-roll clips in a single video.
@@ -137,14 +258,18 @@ def identify_broll_clips(
         video_path: Path to source video
         keywords: Script keywords for relevance
         client: QwenVLClient instance
+        matcher: Optional prebuilt KeywordMatcher for the keywords
 
     Returns:
         List of clip dicts with relevance scores
     """
     print(f"Analyzing: {video_path}", file=sys.stderr)
 
+    if matcher is None:
+        matcher = KeywordMatcher(normalize_keywords(keywords))
+
     # Create prompt
-    prompt = create_broll_prompt(keywords)
+    prompt = create_broll_prompt(tuple(keywords))
 
     # Analyze video
     try:
@@ -154,23 +279,91 @@ def identify_broll_clips(
         )
     except Exception as e:
         import traceback
-        print(f"Error analyzing {video_path}: {str(e)}", file=sys.stderr)
+        print(f"Error analyzing {video_path}: {error_message(e)}", file=sys.stderr)
         traceback.print_exc(file=sys.stderr)
         return []
 
-    # Extract clips
-    clips = response.get("clips", [])
+    return annotate_clips(video_path, response, matcher)
+
+
+def annotate_clips(
+    video_path: str,
+    response: Dict[str, Any],
+    matcher: KeywordMatcher
+) -> List[Dict[str, Any]]:
+    """
+    Extract clips from a model response and add metadata and scores.
+
+    Args:
+        video_path: Source video the response describes
+        response: Parsed model response with a "clips" list
+        matcher: KeywordMatcher for the script keywords
+
+    Returns:
+        List of clip dicts with relevance scores
+    """
+    clips = response.get("clips") if isinstance(response, dict) else None
+    if not isinstance(clips, list):
+        print(f"Warning: No \"clips\" list in response for {video_path}", file=sys.stderr)
+        return []
+    clips = [clip for clip in clips if isinstance(clip, dict)]
 
     # Add metadata and calculate relevance scores
     for clip in clips:
         clip["source_video"] = video_path
         clip["duration"] = clip.get("end_time", 0) - clip.get("start_time", 0)
-        clip["relevance_score"] = calculate_relevance_score(clip, keywords)
+        clip["relevance_score"] = calculate_relevance_score(clip, matcher)
         clip["recommended"] = clip["relevance_score"] >= 0.7
 
     return clips
 
 
+def identify_broll_clips_batch(
+    video_paths: List[str],
+    keywords: List[str],
+    client: QwenVLClient,
+    matcher: Optional[KeywordMatcher] = None
+) -> List[Dict[str, Any]]:
+    """
+    Identify B-roll clips in several videos with one multi-video request.
+
+    Falls back to one request per video if the batched request fails, so
+    a bad batch doesn't lose every video in it.
+
+    Args:
+        video_paths: Paths to source videos
+        keywords: Script keywords for relevance
+        client: QwenVLClient instance
+        matcher: Optional prebuilt KeywordMatcher for the keywords
+
+    Returns:
+        List of clip dicts with relevance scores (all videos, input order)
+    """
+    if matcher is None:
+        matcher = KeywordMatcher(normalize_keywords(keywords))
+
+    if len(video_paths) == 1:
+        return identify_broll_clips(video_paths[0], keywords, client, matcher)
+
+    print(f"Analyzing batch: {', '.join(video_paths)}", file=sys.stderr)
+
+    try:
+        responses = client.analyze_videos_batch(video_paths, create_broll_prompt(tuple(keywords)))
+    except Exception as e:
+        print(f"Batch request failed ({error_message(e)}), analyzing videos separately", file=sys.stderr)
+        return [
+            clip
+            for video_path in video_paths
+            for clip in identify_broll_clips(video_path, keywords, client, matcher)
+        ]
+
+    return [
+        clip
+        for video_path, response in zip(video_paths, responses)
+        for clip in annotate_clips(video_path, response, matcher)
+    ]
+
+
 def analyze_source_videos(
     source_dir: str,
     keywords: List[str]
@@ -189,40 +382,66 @@ def analyze_source_videos(
     if not source_path.exists():
         raise FileNotFoundError(f"Source directory not found: {source_dir}")
 
-    # Find all video files
-    video_extensions = ['*.mp4', '*.mov', '*.avi', '*.mkv', '*.webm']
-    video_files = []
-    for ext in video_extensions:
-        video_files.extend(glob.glob(str(source_path / ext)))
+    # Find all video files (one directory read; hidden files skipped like glob)
+    with os.scandir(source_path) as entries:
+        video_files = [
+            entry.path
+            for entry in entries
+            if not entry.name.startswith('.')
+            and os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS
+            and entry.is_file()
+        ]
 
     if not video_files:
         raise ValueError(f"No video files found in: {source_dir}")
 
     print(f"Found {len(video_files)} video(s) to analyze", file=sys.stderr)
 
-    # Initialize client
-    client = QwenVLClient()
+    # Initialize client (shared by all worker threads)
+    client = get_shared_client()
 
-    # Analyze each video
-    all_clips = []
-    for video_file in video_files:
-        clips = identify_broll_clips(video_file, keywords, client)
-        all_clips.extend(clips)
+    # Normalize keywords and build the matcher once for every clip of every video
+    matcher = KeywordMatcher(normalize_keywords(keywords))
 
-    # Sort by relevance score (descending)
-    all_clips.sort(key=lambda c: c["relevance_score"], reverse=True)
-
-    # Calculate statistics
-    high_quality_clips = sum(1 for c in all_clips if c["recommended"])
-    avg_relevance = sum(c["relevance_score"] for c in all_clips) / max(len(all_clips), 1)
+    # Pack videos BROLL_BATCH to a request and run the batches concurrently -
+    # each is a network-bound API round-trip. Results are merged in input
+    # order so ties stay stable.
+    batches = [
+        video_files[start:start + BROLL_BATCH]
+        for start in range(0, len(video_files), BROLL_BATCH)
+    ]
+    all_clips = []
+    max_workers = min(len(batches), client.MAX_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda batch: identify_broll_clips_batch(batch, keywords, client, matcher),
+            batches
+        )
+        for clips in results:
+            all_clips.extend(clips)
+
+    # Calculate statistics (one pass, over every identified clip)
+    total_clips = len(all_clips)
+    high_quality_clips = 0
+    relevance_sum = 0.0
+    for clip in all_clips:
+        relevance_sum += clip["relevance_score"]
+        high_quality_clips += clip["recommended"]
+    avg_relevance = relevance_sum / max(total_clips, 1)
+
+    # Sort by relevance score (descending), keeping only the top BROLL_TOPK if set
+    if BROLL_TOPK:
+        all_clips = heapq.nlargest(BROLL_TOPK, all_clips, key=_relevance_key)
+    else:
+        all_clips.sort(key=_relevance_key, reverse=True)
 
     # Construct output
     result = {
-        "analyzed_at": datetime.utcnow().isoformat() + "Z",
+        "analyzed_at": now_iso(),
         "script_keywords": keywords,
         "source_videos": video_files,
         "clips": all_clips,
-        "total_clips": len(all_clips),
+        "total_clips": total_clips,
         "high_quality_clips": high_quality_clips,
         "avg_relevance": round(avg_relevance, 2)
     }
@@ -245,33 +464,26 @@ def main():
     keywords_str = sys.argv[2]
     output_path = sys.argv[3] if len(sys.argv) > 3 else None
 
-    # Parse keywords
-    keywords = [k.strip() for k in keywords_str.split(',')]
+    # Parse keywords (empty entries, e.g. from "" or "a,,b", are dropped)
+    keywords = [k for k in (k.strip() for k in keywords_str.split(',')) if k]
 
     try:
         # Analyze source videos
         result = analyze_source_videos(source_dir, keywords)
 
-        # Output results
-        json_output = json.dumps(result, indent=2)
+        # Output results (file, or stdout for agent consumption)
+        write_json(result, output_path)
 
         if output_path:
-            # Save to file
-            output_file = Path(output_path)
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            output_file.write_text(json_output)
             print(f"B-roll clips saved to: {output_path}", file=sys.stderr)
             print(f"Total clips: {result['total_clips']}", file=sys.stderr)
             print(f"High-quality clips (score >= 0.7): {result['high_quality_clips']}", file=sys.stderr)
-        else:
-            # Print to stdout for agent consumption
-            print(json_output)
 
         sys.exit(0)
 
     except Exception as e:
         error_output = {
-            "error": str(e),
+            "error": error_message(e),
             "source_dir": source_dir,
             "keywords": keywords
         }
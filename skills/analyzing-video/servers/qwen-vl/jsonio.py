@@ -0,0 +1,194 @@
+"""
+JSON serialization helpers shared by the analyzer CLIs.
+
+Uses orjson (C extension, emits bytes directly) when installed and
+falls back to the stdlib json module otherwise. Output is pretty-printed
+with 2-space indentation either way.
+
+Streaming: TextChunkReader feeds streamed model text to an incremental
+parser (ijson), and JsonObjectWriter writes an object one top-level key
+at a time, so output can be written while the model is still generating.
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Falls back to stdlib json
+
+
+# Longest error message written to stderr (API errors can embed whole responses)
+ERROR_MAX_CHARS = int(os.getenv("QWEN_ERROR_MAX_CHARS", "4096"))
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize obj to indented UTF-8 JSON bytes.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON from str or bytes.
+
+    Raises:
+        ValueError: If data isn't valid JSON
+    """
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def error_message(error: Any) -> str:
+    """
+    Get an error's message, truncated to ERROR_MAX_CHARS.
+
+    Args:
+        error: Exception (or any object)
+
+    Returns:
+        str(error), cut short with a note of how much was dropped
+    """
+    message = str(error)
+    if len(message) <= ERROR_MAX_CHARS:
+        return message
+    return f"{message[:ERROR_MAX_CHARS]}... [{len(message) - ERROR_MAX_CHARS} more chars]"
+
+
+def write_json(obj: Any, output_path: Optional[str] = None) -> None:
+    """
+    Write obj as indented JSON to a file, or to stdout if no path given.
+
+    Args:
+        obj: JSON-serializable object
+        output_path: Optional output file (parent directories are created)
+    """
+    data = dumps(obj)
+
+    if output_path:
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_bytes(data)
+    else:
+        # Print to stdout for agent consumption: bytes straight to the
+        # binary buffer, skipping the text layer's decode/encode pass
+        stdout = getattr(sys.stdout, "buffer", None)
+        if stdout is None:
+            print(data.decode("utf-8"))  # stdout replaced by a text-only stream
+            return
+        sys.stdout.flush()  # Keep ordering with anything already printed
+        stdout.write(data + b"\n")
+        stdout.flush()
+
+
+class TextChunkReader:
+    """
+    Binary file-like view of streamed text chunks, for ijson.
+
+    Text before the first "{" and trailing backticks/whitespace (markdown
+    code fences around the JSON) are dropped. read() returns as soon as
+    any data is available, so the parser sees each chunk as it arrives.
+    """
+
+    # Held back at the end of the data until more text follows it
+    TRAILING = " \t\r\n`"
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+        self._tail = ""
+        self._started = False
+
+    def _fill(self) -> bool:
+        """Pull the next chunk into the buffer. False once exhausted."""
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+
+        if not self._started:
+            start = chunk.find("{")
+            if start < 0:
+                return True
+            chunk = chunk[start:]
+            self._started = True
+
+        text = self._tail + chunk
+        body = text.rstrip(self.TRAILING)
+        self._tail = text[len(body):]
+        self._buffer += body.encode("utf-8")
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._buffer and self._fill():
+            pass
+
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class JsonObjectWriter:
+    """
+    Write a JSON object incrementally, one top-level key at a time.
+
+    Produces the same indented layout as write_json(). Each key is flushed
+    as soon as it is written so readers can follow the file. If the block
+    exits with an exception, the partial output file is removed.
+
+    Usage:
+        with JsonObjectWriter("out.json") as writer:
+            writer.write("key", value)
+    """
+
+    def __init__(self, output_path: Optional[str] = None):
+        """
+        Args:
+            output_path: Optional output file (default: stdout)
+        """
+        self.output_path = output_path
+        self._file = None
+        self._count = 0
+
+    def __enter__(self) -> "JsonObjectWriter":
+        if self.output_path:
+            output_file = Path(self.output_path)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(output_file, "wb")
+        else:
+            sys.stdout.flush()
+            self._file = sys.stdout.buffer
+        self._file.write(b"{")
+        return self
+
+    def write(self, key: str, value: Any) -> None:
+        """Write one key/value pair and flush it."""
+        # Indent the value one level to sit inside the object
+        data = dumps(value).replace(b"\n", b"\n  ")
+        separator = b",\n  " if self._count else b"\n  "
+        self._file.write(separator + dumps(key) + b": " + data)
+        self._file.flush()
+        self._count += 1
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._file is sys.stdout.buffer:
+            self._file.write(b"\n}\n" if self._count else b"}\n")
+            self._file.flush()
+            return
+
+        self._file.write(b"\n}" if self._count else b"}")
+        self._file.close()
+        if exc_type is not None:
+            os.unlink(self.output_path)  # Don't leave truncated JSON behind
@@ -0,0 +1,159 @@
+"""
+Video helpers (ffprobe / ffmpeg).
+
+Metadata: probes a video once with `ffprobe -print_format json
+-show_streams -show_format` and memoizes the parsed result per
+(path, mtime, size), so later lookups of duration, dimensions, fps or
+codec are free and an edited file is re-probed automatically.
+
+Upload proxies: local videos are downscaled to a small 360p / 2 FPS H.264
+proxy before upload. The VL model samples frames and resizes them to a
+fixed token budget anyway, so the extra pixels only cost upload time.
+Analyses that measure cuts and shot lengths (style) ask for keep_fps:
+at 2 FPS short shots and transitions fall between frames.
+Proxies are cached by content hash under $QWEN_PREPROC_DIR
+(default ~/.cache/upgraide/preproc). Set QWEN_PREPROCESS=0 to disable.
+"""
+
+import os
+import sys
+import copy
+import functools
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from jsonio import loads
+
+
+PREPROC_DIR = Path(os.getenv("QWEN_PREPROC_DIR", Path.home() / ".cache" / "upgraide" / "preproc"))
+
+# Proxy encode settings: 2 FPS, at most 360p, fast low-bitrate H.264
+PROXY_FPS = 2
+PROXY_HEIGHT = 360
+PROXY_CRF = 30
+
+
+@functools.lru_cache(maxsize=64)
+def _probe(video_path: str, mtime_ns: Optional[int], size: Optional[int]) -> Dict[str, Any]:
+    """
+    Run ffprobe once and parse its JSON output.
+
+    mtime_ns and size are only part of the cache key.
+
+    Raises:
+        Exception: If ffprobe is missing, times out or fails (not cached)
+    """
+    result = subprocess.run(
+        [
+            'ffprobe',
+            '-v', 'error',
+            '-print_format', 'json',
+            '-show_streams',
+            '-show_format',
+            video_path
+        ],
+        capture_output=True,
+        timeout=10,
+        check=True
+    )
+    return loads(result.stdout)
+
+
+def get_video_metadata(video_path: str) -> Dict[str, Any]:
+    """
+    Get ffprobe metadata (streams + format) for a video.
+
+    Falls back to {} if ffprobe is not found or fails.
+
+    Args:
+        video_path: Path to video file or http/https URL
+
+    Returns:
+        Parsed ffprobe JSON with "streams" and "format" keys
+    """
+    try:
+        if video_path.startswith(('http://', 'https://')):
+            metadata = _probe(video_path, None, None)
+        else:
+            real_path = os.path.realpath(video_path)
+            stat = os.stat(real_path)
+            metadata = _probe(real_path, stat.st_mtime_ns, stat.st_size)
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return {}
+
+    # Callers may modify the result - keep the memoized copy intact
+    return copy.deepcopy(metadata)
+
+
+def get_video_duration(video_path: str) -> float:
+    """
+    Get video duration using ffprobe if available.
+    Falls back to 0.0 if ffprobe not found.
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        Duration in seconds
+    """
+    try:
+        return float(get_video_metadata(video_path)["format"]["duration"])
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def prepare_for_upload(video_path: str, keep_audio: bool = False, keep_fps: bool = False) -> str:
+    """
+    Get a small upload proxy for a local video (cached by content hash).
+
+    URLs, disabled preprocessing and ffmpeg failures return the input
+    unchanged, as does a proxy that turns out larger than the source.
+
+    Args:
+        video_path: Local video path or URL
+        keep_audio: Keep the audio track (only audio-aware models need it)
+        keep_fps: Keep the source frame rate (only downscale), for analyses
+            that time cuts and shots
+
+    Returns:
+        Path of the proxy video, or video_path unchanged
+    """
+    if video_path.startswith(('http://', 'https://')) or os.getenv("QWEN_PREPROCESS", "1") == "0":
+        return video_path
+
+    from mm_cache import mm_hash
+
+    source = Path(video_path)
+    suffix = ('-audio' if keep_audio else '') + ('-fullfps' if keep_fps else '')
+    proxy = PREPROC_DIR / f"{mm_hash(str(source))}{suffix}.mp4"
+    if proxy.exists() and proxy.stat().st_size > 0:
+        return str(proxy)
+
+    PREPROC_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = proxy.with_suffix(f".{os.getpid()}.tmp.mp4")
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-i', str(source),
+        '-vf', ('' if keep_fps else f"fps={PROXY_FPS},") + f"scale=-2:'min({PROXY_HEIGHT},ih)'",
+        '-c:v', 'libx264',
+        '-preset', 'veryfast',
+        '-crf', str(PROXY_CRF),
+        *(['-c:a', 'aac', '-b:a', '64k'] if keep_audio else ['-an']),
+        str(tmp)
+    ]
+
+    print(f"Preparing upload proxy for {source.name}...", file=sys.stderr)
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Warning: proxy encode failed, uploading original ({e})", file=sys.stderr)
+        tmp.unlink(missing_ok=True)
+        return video_path
+
+    if tmp.stat().st_size >= source.stat().st_size:
+        tmp.unlink()
+        return video_path
+
+    os.replace(tmp, proxy)
+    return str(proxy)
@@ -0,0 +1,428 @@
+"""
+On-disk response cache for Qwen video analyses.
+
+Repeated questions about the same video (iterative editing, B-roll
+refinement) skip the upload, the vision encoder and the LLM entirely:
+a hit is a single JSON read.
+
+Cache key: (mm_hash, prompt_hash, model)
+- mm_hash: xxh3_64 of the local file bytes (SHA-256 if xxhash is not
+  installed), or for http/https inputs of the URL plus the server's
+  ETag (Last-Modified/size if no ETag), so a file re-uploaded under the
+  same URL isn't answered from a stale entry. URLs whose version can't
+  be checked (server unreachable) are not cached.
+- prompt_hash: first 16 hex chars of sha256(prompt)
+
+Layout: $QWEN_CACHE_DIR/{mm_hash}/{prompt_hash}-{model}.json
+        (default ~/.cache/upgraide/qwen)
+
+Eviction: least-recently-used entries are removed once the directory
+exceeds $QWEN_CACHE_MAX_MB (default 256). Stores keep a running size
+total, so the directory is only rescanned when that total crosses the
+limit or every EVICT_RESCAN_STORES stores. Set QWEN_CACHE=0 to disable.
+"""
+
+import os
+import sys
+import mmap
+import json
+import inspect
+import queue
+import hashlib
+import functools
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None  # Falls back to SHA-256
+
+
+CACHE_DIR = Path(os.getenv("QWEN_CACHE_DIR", Path.home() / ".cache" / "upgraide" / "qwen"))
+MAX_CACHE_BYTES = int(os.getenv("QWEN_CACHE_MAX_MB", "256")) * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024  # 1MB reads
+READ_DEPTH = 8  # Reads in flight while hashing
+URL_CHECK_TIMEOUT = 5  # seconds, HEAD request for remote video versions
+URL_RETRY_AFTER = 60  # seconds before asking an unreachable server again
+
+EVICT_RESCAN_STORES = 100  # Stores between full size rescans (other processes write too)
+
+_cache_size: Optional[int] = None  # Running total of entry sizes (None until scanned)
+_stores_since_scan = 0
+_size_lock = threading.Lock()
+
+_url_versions: Dict[str, str] = {}  # URL -> version, for servers that answered
+_url_failures: Dict[str, float] = {}  # URL -> monotonic time of last failed check
+
+
+def cache_enabled() -> bool:
+    """Check whether the response cache is enabled (QWEN_CACHE != 0)."""
+    return os.getenv("QWEN_CACHE", "1") != "0"
+
+
+def _sha256_file(path: str) -> str:
+    """
+    SHA-256 of a local file in a single hashlib call over an mmap.
+
+    One update over the whole mapping lets OpenSSL run its SHA-NI /
+    SHA extension code path without per-chunk call overhead.
+
+    Args:
+        path: Local file path
+
+    Returns:
+        SHA-256 hex digest
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()  # Empty files can't be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+def _hash_file(path: str) -> str:
+    """
+    Hash local file bytes with reads overlapped against hashing.
+
+    A reader thread keeps up to READ_DEPTH 1MB reads in flight into a pool
+    of reused buffers while the caller hashes completed ones (file reads
+    and the hasher both release the GIL). The kernel is told the access
+    is sequential so it reads ahead aggressively.
+
+    Args:
+        path: Local file path
+
+    Returns:
+        Hex digest (xxh3_64, or SHA-256 if xxhash is unavailable)
+    """
+    if xxhash is None:
+        return _sha256_file(path)
+
+    hasher = xxhash.xxh3_64()
+
+    with open(path, 'rb', buffering=0) as f:
+        if hasattr(os, 'posix_fadvise'):  # Linux/BSD only
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+        free: queue.Queue = queue.Queue()
+        filled: queue.Queue = queue.Queue()
+        for _ in range(READ_DEPTH):
+            free.put(bytearray(CHUNK_SIZE))
+
+        def reader() -> None:
+            try:
+                while True:
+                    buffer = free.get()
+                    size = f.readinto(buffer)
+                    filled.put((buffer, size))
+                    if not size:
+                        return
+            except OSError as e:
+                filled.put((e, 0))
+
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+
+        while True:
+            buffer, size = filled.get()
+            if isinstance(buffer, OSError):
+                raise buffer
+            if not size:
+                break
+            hasher.update(memoryview(buffer)[:size])
+            free.put(buffer)
+
+        thread.join()
+
+    return hasher.hexdigest()
+
+
+def _local_path(video_path: str) -> str:
+    """Strip a file:// prefix from a local video reference."""
+    if video_path.startswith('file://'):
+        return video_path[len('file://'):]
+    return video_path
+
+
+def mm_hash(video_path: str) -> str:
+    """
+    Hash the multimodal input: URL + version for remote videos, bytes for local files.
+
+    Args:
+        video_path: Local path, file:// URI or http/https URL
+
+    Returns:
+        Hex digest identifying the video content
+    """
+    if video_path.startswith(('http://', 'https://')):
+        version = _url_version(video_path)  # None (unreachable) keys on the URL alone
+        key = f"{video_path}\n{version}" if version else video_path
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    # Memoized per file version: repeat prompts on one video hash it once
+    path = os.path.realpath(_local_path(video_path))
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=128)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """Hash a file; mtime_ns and size are only part of the cache key."""
+    return _hash_file(path)
+
+
+def _url_version(url: str) -> Optional[str]:
+    """
+    Identify the current version of a remote video from its response headers.
+
+    Asks with a HEAD request, then with a one-byte ranged GET for servers
+    that refuse HEAD (e.g. signed CDN URLs). Answers are memoized per
+    process (one request per URL, however many prompts use it); failures
+    are only remembered for URL_RETRY_AFTER seconds, so a flaky server is
+    asked again later instead of being keyed without a version for good.
+
+    Args:
+        url: http/https video URL
+
+    Returns:
+        ETag, or Last-Modified:size if the server sends no ETag, or empty
+        string if it sends neither; None if the server couldn't be reached
+    """
+    if url in _url_versions:
+        return _url_versions[url]
+    if time.monotonic() - _url_failures.get(url, float("-inf")) < URL_RETRY_AFTER:
+        return None
+
+    for method, extra_headers in (("HEAD", {}), ("GET", {"Range": "bytes=0-0"})):
+        request = urllib.request.Request(url, method=method, headers=extra_headers)
+        try:
+            with urllib.request.urlopen(request, timeout=URL_CHECK_TIMEOUT) as response:
+                headers = response.headers
+        except (OSError, ValueError):
+            continue
+
+        # A ranged reply's Content-Length is the range; the full size follows the "/"
+        content_range = headers.get("Content-Range") or ""
+        size = content_range.rpartition("/")[2] if "/" in content_range else headers.get("Content-Length")
+        version = headers.get("ETag") or ":".join(filter(None, (headers.get("Last-Modified"), size)))
+        _url_versions[url] = version
+        return version
+
+    _url_failures[url] = time.monotonic()
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def prompt_hash(prompt: str) -> str:
+    """Short, stable hash of a prompt string (memoized: prompts repeat per video)."""
+    return hashlib.sha256(prompt.encode()).hexdigest()[:16]
+
+
+def cache_path(video_path: str, prompt: str, model: str) -> Path:
+    """
+    Get the cache file for a (video, prompt, model) combination.
+
+    Args:
+        video_path: Local path or URL
+        prompt: Analysis prompt
+        model: Model identifier
+
+    Returns:
+        Path of the cache entry (may not exist)
+    """
+    return CACHE_DIR / mm_hash(video_path) / f"{prompt_hash(prompt)}-{model}.json"
+
+
+def lookup(entry: Path) -> Optional[str]:
+    """
+    Read a cached response and mark it as recently used.
+
+    Args:
+        entry: Cache entry path
+
+    Returns:
+        Cached response text, or None on miss
+    """
+    try:
+        data = json.loads(entry.read_text())
+        os.utime(entry)  # Refresh LRU position
+        return data["response"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def store(entry: Path, response: str) -> None:
+    """
+    Write a response to the cache (atomically) and enforce the size limit.
+
+    Args:
+        entry: Cache entry path
+        response: Model response text
+    """
+    try:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({"response": response}).encode()
+        try:
+            replaced = entry.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        tmp = entry.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, entry)
+        _track_size(len(data) - replaced)
+    except OSError as e:
+        print(f"Warning: could not write cache entry {entry}: {e}", file=sys.stderr)
+
+
+def _track_size(delta: int) -> None:
+    """
+    Add a store's size change to the running cache size; evict when it's over.
+
+    The directory is only scanned for the first store, when the running
+    total crosses MAX_CACHE_BYTES, and every EVICT_RESCAN_STORES stores
+    (to pick up other processes' writes), so a store doesn't stat every
+    entry in the cache.
+    """
+    global _cache_size, _stores_since_scan
+    with _size_lock:
+        if _cache_size is None or _stores_since_scan >= EVICT_RESCAN_STORES:
+            scan = True
+        else:
+            _cache_size += delta
+            _stores_since_scan += 1
+            scan = _cache_size > MAX_CACHE_BYTES
+    if scan:
+        evict()
+
+
+def evict(max_bytes: Optional[int] = None) -> None:
+    """
+    Remove least-recently-used entries until the cache fits in max_bytes.
+
+    Scans the whole cache directory and resets the running size total.
+
+    Args:
+        max_bytes: Maximum total size of cache entries (default: MAX_CACHE_BYTES)
+    """
+    global _cache_size, _stores_since_scan
+    if max_bytes is None:
+        max_bytes = MAX_CACHE_BYTES
+    entries = []
+    total = 0
+    for path in CACHE_DIR.glob("*/*.json"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    if total > max_bytes:
+        total = _evict_oldest(entries, total, max_bytes)
+
+    with _size_lock:
+        _cache_size = total
+        _stores_since_scan = 0
+
+
+def _evict_oldest(entries: List[Tuple[float, int, Path]], total: int, max_bytes: int) -> int:
+    """Remove entries oldest access first until total fits; returns the new total."""
+    # Oldest access first
+    for _, size, path in sorted(entries, key=lambda e: e[0]):
+        try:
+            path.unlink()
+            total -= size
+        except OSError:
+            continue
+        # Drop the now-empty video directory
+        try:
+            path.parent.rmdir()
+        except OSError:
+            pass
+        if total <= max_bytes:
+            break
+    return total
+
+
+def _cacheable(video_path: str) -> bool:
+    """
+    Check the cache is enabled and the video is an existing file or a URL
+    whose version could be checked (an unversioned key would differ from the
+    one a successful check gives, so those requests bypass the cache).
+    """
+    if not cache_enabled():
+        return False
+    if video_path.startswith(('http://', 'https://')):
+        return _url_version(video_path) is not None
+    return Path(_local_path(video_path)).exists()
+
+
+def lookup_response(video_path: str, prompt: str, model: str) -> Optional[str]:
+    """
+    Get the cached response for a (video, prompt, model) combination.
+
+    Args:
+        video_path: Local path or URL
+        prompt: Analysis prompt
+        model: Model identifier
+
+    Returns:
+        Cached response text, or None on miss (or if caching is off)
+    """
+    if not _cacheable(video_path):
+        return None
+    entry = cache_path(video_path, prompt, model)
+    cached = lookup(entry)
+    if cached is not None:
+        print(f"[Cache hit] {entry}", file=sys.stderr)
+    return cached
+
+
+def store_response(video_path: str, prompt: str, model: str, response: str) -> None:
+    """
+    Cache the response for a (video, prompt, model) combination.
+
+    Args:
+        video_path: Local path or URL
+        prompt: Analysis prompt
+        model: Model identifier
+        response: Model response text
+    """
+    if _cacheable(video_path):
+        store(cache_path(video_path, prompt, model), response)
+
+
+def cached_analysis(method: Callable) -> Callable:
+    """
+    Decorate a (self, video_path, prompt, model) -> str method with the disk cache.
+
+    Args:
+        method: Analysis method returning the model response text
+
+    Returns:
+        Wrapped method
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        video_path = bound.arguments["video_path"]
+        prompt = bound.arguments["prompt"]
+        model = bound.arguments["model"]
+
+        cached = lookup_response(video_path, prompt, model)
+        if cached is not None:
+            return cached
+
+        # Missing files are reported by the method itself
+        response = method(*args, **kwargs)
+        store_response(video_path, prompt, model, response)
+        return response
+
+    return wrapper
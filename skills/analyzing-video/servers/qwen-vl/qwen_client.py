@@ -6,27 +6,41 @@ Supports both:
 - qwen3-omni-flash (OpenAI-compatible API with audio support)
 
 Provides a reliable interface with:
-- 5 retries with exponential backoff (1s, 2s, 4s, 8s, 16s)
+- 5 retries with exponential backoff (1s, 2s, 4s, 8s, 16s, +/-25% jitter)
+  on rate limits, server errors and connection failures
 - Video and audio upload handling
 - Response parsing and error handling
+- On-disk response cache keyed by video content + prompt (see mm_cache.py)
+
+Use get_shared_client() rather than QwenClient() so one process reuses a
+single client and its keep-alive connection pool.
 """
 
 import os
 import sys
 import time
+import re
 import json
-from typing import Dict, Any, Optional, List
+import random
+import functools
+import threading
+from typing import Dict, Any, Callable, Iterator, Optional, List, Tuple, TypeVar
 from pathlib import Path
 
+from mm_cache import cached_analysis, lookup_response, store_response
+from jsonio import TextChunkReader, error_message, loads
+
+# The DashScope SDK (and with it requests/aiohttp) is imported when the
+# first client is created - see _load_dashscope() - so importing this
+# module, and every CLI's --help, stays fast
+dashscope = None
+MultiModalConversation = None
+upload_file = None
+
 try:
-    from dashscope import MultiModalConversation
-    import dashscope
+    import ijson
 except ImportError:
-    print(json.dumps({
-        "error": "dashscope package not installed",
-        "message": "Run: pip install dashscope>=1.24.6"
-    }), file=sys.stderr)
-    sys.exit(1)
+    ijson = None  # Streamed responses are parsed once complete
 
 try:
     from dotenv import load_dotenv
@@ -35,6 +49,24 @@ except ImportError:
     pass  # dotenv is optional if env vars are set another way
 
 
+T = TypeVar("T")
+
+# Markdown code fence around a JSON answer (closing fence optional,
+# in case the response was cut off)
+_FENCE_RE = re.compile(r"^\s*```[^\n]*\n(.*?)(?:\n\s*```)?\s*$", re.DOTALL)
+
+# HTTP statuses worth retrying: timeouts, rate limiting and server errors
+RETRYABLE_STATUS = frozenset({408, 429})
+
+
+class QwenAPIError(Exception):
+    """Error response from the API, with its HTTP status."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
 class QwenClient:
     """
     Unified wrapper for Qwen models via DashScope.
@@ -53,14 +85,29 @@ class QwenClient:
     MAX_RETRIES = 5
     BACKOFF_DELAYS = [1, 2, 4, 8, 16]  # seconds
 
-    def __init__(self, api_key: Optional[str] = None):
+    # Max wall time for one call including retries (0 = no limit)
+    RETRY_BUDGET = float(os.getenv("QWEN_RETRY_BUDGET", "0"))  # seconds
+
+    # Max in-flight requests for the async API (respects provider rate limits)
+    MAX_CONCURRENCY = int(os.getenv("QWEN_CONCURRENCY", "8"))
+
+    # Keep-alive connections per host (enough for all concurrent workers)
+    HTTP_POOL_SIZE = max(32, MAX_CONCURRENCY)
+
+    # Batch API status polling interval
+    BATCH_POLL_INTERVAL = 30  # seconds
+
+    def __init__(self, api_key: Optional[str] = None, http_client=None):
         """
         Initialize Qwen client.
 
         Args:
             api_key: DashScope API key (defaults to DASHSCOPE_API_KEY env var)
+            http_client: Optional httpx.Client for the OpenAI-compatible API
+                (defaults to the SDK's own client)
         """
         self.api_key = api_key or os.getenv('DASHSCOPE_API_KEY')
+        self.http_client = http_client
 
         if not self.api_key:
             raise ValueError(
@@ -68,25 +115,60 @@ class QwenClient:
             )
 
         # DashScope native client (always initialized)
+        _load_dashscope()
         dashscope.api_key = self.api_key
         dashscope.base_http_api_url = 'https://dashscope-intl.aliyuncs.com/api/v1'
+        self.dashscope_session = _build_dashscope_session(self.HTTP_POOL_SIZE)
 
-        # OpenAI-compatible client (lazy initialization)
+        # OpenAI-compatible client (lazy initialization, shared by threads)
         self.openai_client = None
+        self._openai_lock = threading.Lock()
+
+        # Uploaded local videos: (path, mtime_ns, size, model) -> oss:// URL
+        self._upload_cache: Dict[Tuple[str, int, int, str], str] = {}
+        self._upload_lock = threading.Lock()
+
+        # Async concurrency limit (created per event loop)
+        self._async_limit = None
+        self._async_loop = None
+
+    def close(self) -> None:
+        """
+        Close this client's HTTP connections.
+
+        Don't close the instance returned by get_shared_client() - it is
+        reused for the rest of the process.
+        """
+        self.dashscope_session.close()
+        if self.openai_client is not None:
+            self.openai_client.close()
+        if self.http_client is not None:
+            self.http_client.close()
+
+    def __enter__(self) -> "QwenClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
 
     def _is_omni_model(self, model: str) -> bool:
         """Check if model uses OpenAI-compatible API."""
         return model.startswith("qwen3-omni") or model.startswith("qwen-omni")
 
     def _init_openai_client(self):
-        """Lazy initialization of OpenAI client."""
-        if self.openai_client is None:
+        """Lazy initialization of OpenAI client (thread-safe)."""
+        if self.openai_client is not None:
+            return
+
+        with self._openai_lock:
+            if self.openai_client is not None:
+                return  # Another thread initialized it while we waited
             try:
                 from openai import OpenAI
                 self.openai_client = OpenAI(
                     api_key=self.api_key,
                     base_url="https://dashscope-intl.aliyuncs.com/compatible-mode/v1",
-                    http_client=None  # Disable default HTTP client config
+                    http_client=self.http_client
                 )
             except ImportError:
                 raise ImportError(
@@ -117,102 +199,134 @@ class QwenClient:
             Parsed response dict
 
         Raises:
-            Exception: After all retries exhausted
+            Exception: On a non-retryable error or after all retries exhausted
         """
-        last_error = None
+        def call():
+            response = MultiModalConversation.call(
+                model=model,
+                messages=messages,
+                session=self.dashscope_session  # Pooled keep-alive connections
+            )
 
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                response = MultiModalConversation.call(
-                    model=model,
-                    messages=messages
+            # Check for API-level errors
+            if response.status_code != 200:
+                raise QwenAPIError(
+                    f"API error: {response.code} - {response.message}",
+                    status_code=response.status_code
                 )
 
-                # Check for API-level errors
-                if response.status_code != 200:
-                    raise Exception(f"API error: {response.code} - {response.message}")
-
-                return response
-
-            except Exception as e:
-                last_error = e
-
-                # If this isn't the last attempt, wait and retry
-                if attempt < self.MAX_RETRIES - 1:
-                    delay = self.BACKOFF_DELAYS[attempt]
-                    print(
-                        f"Attempt {attempt + 1}/{self.MAX_RETRIES} failed: {str(e)}. "
-                        f"Retrying in {delay}s...",
-                        file=sys.stderr
-                    )
-                    time.sleep(delay)
-                else:
-                    # All retries exhausted
-                    print(
-                        f"All {self.MAX_RETRIES} retries exhausted. Last error: {str(e)}",
-                        file=sys.stderr
-                    )
+            return response
 
-        # If we get here, all retries failed
-        raise Exception(f"Fatal error after {self.MAX_RETRIES} retries: {str(last_error)}")
+        return self._retry(call, f"DashScope {model}")
 
     def _make_request_openai(
         self,
         messages: List[Dict[str, Any]],
-        model: str
-    ) -> str:
+        model: str,
+        stream: bool = False,
+        headers: Optional[Dict[str, str]] = None
+    ):
         """
         Make API request using OpenAI-compatible SDK with retry logic.
 
         Args:
             messages: Chat messages in OpenAI format
             model: Model identifier
+            stream: Return the chunk stream instead of the response text
+                (retries cover opening the stream, not reading it)
+            headers: Optional extra HTTP headers
 
         Returns:
-            Response text
+            Response text, or the SDK's chunk stream if stream=True
 
         Raises:
-            Exception: After all retries exhausted
+            Exception: On a non-retryable error or after all retries exhausted
         """
         self._init_openai_client()
+
+        def call():
+            completion = self.openai_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                stream=stream,
+                extra_headers=headers
+            )
+
+            if stream:
+                return completion
+
+            # Extract content from response
+            if completion.choices and len(completion.choices) > 0:
+                return completion.choices[0].message.content
+
+            raise Exception("No choices in OpenAI response")
+
+        return self._retry(call, f"OpenAI {model}")
+
+    def _retry(self, op: Callable[[], T], label: str = "Request") -> T:
+        """
+        Run op(), retrying transient failures with backoff.
+
+        Each delay is BACKOFF_DELAYS[attempt] with +/-25% jitter (so
+        concurrent workers don't retry in lockstep), raised to the
+        server's Retry-After when it sent one. Errors that retrying
+        can't fix (e.g. 400/401/403) are raised immediately. With
+        RETRY_BUDGET set, no wait starts that would end past the budget
+        (counted from the first attempt).
+
+        Args:
+            op: Closure making one attempt
+            label: What op does, for log messages
+
+        Returns:
+            op's return value
+
+        Raises:
+            Exception: On a non-retryable error or once retries/budget run out
+        """
+        deadline = time.monotonic() + self.RETRY_BUDGET if self.RETRY_BUDGET else None
         last_error = None
 
         for attempt in range(self.MAX_RETRIES):
             try:
-                completion = self.openai_client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    stream=False
-                )
-
-                # Extract content from response
-                if completion.choices and len(completion.choices) > 0:
-                    return completion.choices[0].message.content
-
-                raise Exception("No choices in OpenAI response")
+                return op()
 
             except Exception as e:
                 last_error = e
 
-                # If this isn't the last attempt, wait and retry
-                if attempt < self.MAX_RETRIES - 1:
-                    delay = self.BACKOFF_DELAYS[attempt]
+                if not _is_retryable(e):
+                    print(f"{label} failed (not retryable): {error_message(e)}", file=sys.stderr)
+                    raise
+
+                if attempt == self.MAX_RETRIES - 1:
                     print(
-                        f"Attempt {attempt + 1}/{self.MAX_RETRIES} failed: {str(e)}. "
-                        f"Retrying in {delay}s...",
+                        f"{label}: all {self.MAX_RETRIES} retries exhausted. Last error: {error_message(e)}",
                         file=sys.stderr
                     )
-                    time.sleep(delay)
-                else:
-                    # All retries exhausted
+                    break
+
+                delay = self.BACKOFF_DELAYS[attempt] * random.uniform(0.75, 1.25)
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    delay = max(retry_after, delay)
+
+                if deadline is not None and time.monotonic() + delay > deadline:
                     print(
-                        f"All {self.MAX_RETRIES} retries exhausted. Last error: {str(e)}",
+                        f"{label}: retry budget ({self.RETRY_BUDGET:g}s) exhausted. Last error: {error_message(e)}",
                         file=sys.stderr
                     )
+                    break
+
+                print(
+                    f"{label}: attempt {attempt + 1}/{self.MAX_RETRIES} failed: {error_message(e)}. "
+                    f"Retrying in {delay:.1f}s...",
+                    file=sys.stderr
+                )
+                time.sleep(delay)
 
-        # If we get here, all retries failed
-        raise Exception(f"Fatal error after {self.MAX_RETRIES} retries: {str(last_error)}")
+        raise Exception(f"Fatal error after {attempt + 1} attempts: {str(last_error)}")
 
+    @cached_analysis
     def analyze_video(
         self,
         video_path: str,
@@ -262,16 +376,12 @@ class QwenClient:
         Returns:
             Model response text
         """
-        # Convert to file:// URL if local path
-        if not video_path.startswith(('http://', 'https://', 'file://')):
-            video_path = f"file://{Path(video_path).absolute()}"
-
         # Construct messages in DashScope format
         messages = [
             {
                 "role": "user",
                 "content": [
-                    {"video": video_path},
+                    {"video": self._ensure_remote_url(video_path, model)},
                     {"text": prompt}
                 ]
             }
@@ -279,8 +389,76 @@ class QwenClient:
 
         # Make request with retry logic
         response = self._make_request_dashscope(messages, model)
+        return self._dashscope_text(response)
+
+    def _ensure_remote_url(self, video_path: str, model: str) -> str:
+        """
+        Get a URL the API can fetch the video from, uploading local files once.
+
+        Local files go to DashScope's temporary storage (oss:// URLs, valid
+        for 48 hours). The URL is memoized per file version and model, so
+        retries and repeat prompts resend only the request, not the video.
+
+        Args:
+            video_path: Local path, file:// URI or http/https URL
+            model: Model identifier (uploads are scoped to a model)
+
+        Returns:
+            http/https or oss:// URL (file:// URI if the SDK can't upload)
+
+        Raises:
+            ValueError: If an Omni model needs an upload the SDK can't do
+        """
+        if video_path.startswith(('http://', 'https://', 'oss://')):
+            return video_path
+
+        if video_path.startswith('file://'):
+            video_path = video_path[len('file://'):]
+        path = os.path.realpath(video_path)
+        if upload_file is None:
+            if self._is_omni_model(model):
+                raise ValueError(
+                    f"Omni models need an http/https video URL with this dashscope version. Got: {video_path}\n"
+                    "Upgrade dashscope, or upload to a remote URL first (Supabase, S3, etc.)"
+                )
+            return f"file://{path}"  # The SDK uploads it on each call
+
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size, model)
 
-        # Extract text from response
+        with self._upload_lock:
+            url = self._upload_cache.get(key)
+        if url is None:
+            url = self._retry(lambda: self._upload_video(path, model), f"Upload {path}")
+            with self._upload_lock:
+                self._upload_cache[key] = url
+        return url
+
+    def _upload_video(self, path: str, model: str) -> str:
+        """
+        Upload a local video to DashScope's temporary storage.
+
+        Args:
+            path: Local video path
+            model: Model identifier
+
+        Returns:
+            oss:// URL of the uploaded file
+
+        Raises:
+            Exception: If the upload fails
+        """
+        print(f"Uploading {path}...", file=sys.stderr)
+        return upload_file(path, model, self.api_key)
+
+    @staticmethod
+    def _dashscope_text(response) -> str:
+        """
+        Extract the response text from a DashScope response.
+
+        Raises:
+            Exception: If the response has no text content
+        """
         if hasattr(response, 'output') and hasattr(response.output, 'choices'):
             if len(response.output.choices) > 0:
                 content = response.output.choices[0].message.content
@@ -307,37 +485,46 @@ class QwenClient:
         Analyze video using OpenAI-compatible API (Omni models).
 
         Args:
-            video_path: URL to video file (must be http/https)
+            video_path: Path to video file or URL
             prompt: Analysis prompt
             model: Model identifier
 
         Returns:
             Model response text
         """
-        # Validate URL format (Omni API requires remote URLs)
-        if not video_path.startswith(('http://', 'https://')):
-            raise ValueError(
-                f"Omni models require http/https video URL. Got: {video_path}\n"
-                "For local files, upload to remote URL first (Supabase, S3, etc.)"
-            )
+        video_url = self._ensure_remote_url(video_path, model)
+
+        # Make request with retry logic
+        return self._make_request_openai(
+            self._openai_messages(video_url, prompt), model, headers=_resolve_headers(video_url)
+        )
 
+    @staticmethod
+    def _openai_messages(video_url: str, prompt: str) -> List[Dict[str, Any]]:
+        """
+        Build OpenAI-format chat messages for a video + text prompt.
+
+        Args:
+            video_url: http/https video URL
+            prompt: Analysis prompt
+
+        Returns:
+            Chat messages in OpenAI format
+        """
         # Construct content array
         content = [
-            {"type": "video_url", "video_url": {"url": video_path}},
+            {"type": "video_url", "video_url": {"url": video_url}},
             {"type": "text", "text": prompt}
         ]
 
         # Construct messages in OpenAI format
-        messages = [
+        return [
             {
                 "role": "user",
                 "content": content
             }
         ]
 
-        # Make request with retry logic
-        return self._make_request_openai(messages, model)
-
     def analyze_video_structured(
         self,
         video_path: str,
@@ -362,34 +549,681 @@ class QwenClient:
             Exception: If analysis fails or response isn't valid JSON
         """
         response_text = self.analyze_video(video_path, prompt, model)
+        return self.parse_json_response(response_text)
+
+    def stream_analyze_video_structured(
+        self,
+        video_path: str,
+        prompt: str,
+        model: str = "qwen3-vl-235b-a22b-thinking"
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Analyze video and yield each top-level JSON key as soon as it completes.
+
+        Omni models stream the response and ijson parses it as it arrives,
+        so callers can write early sections while later ones are still
+        being generated. Without ijson, and for VL models, the response is
+        parsed once complete. The full response is cached like analyze_video.
+
+        Args:
+            video_path: Path to video file or URL
+            prompt: Analysis prompt (should request a JSON object)
+            model: Model identifier (default: qwen3-vl-235b-a22b-thinking)
+
+        Yields:
+            (key, value) pairs in response order
+
+        Raises:
+            Exception: If analysis fails or response isn't a valid JSON object
+        """
+        cached = lookup_response(video_path, prompt, model)
+        if cached is not None:
+            yield from self.parse_json_response(cached).items()
+            return
+
+        if ijson is None or not self._is_omni_model(model):
+            yield from self.analyze_video_structured(video_path, prompt, model).items()
+            return
+
+        video_url = self._ensure_remote_url(video_path, model)
+        stream = self._make_request_openai(
+            self._openai_messages(video_url, prompt), model,
+            stream=True, headers=_resolve_headers(video_url)
+        )
+
+        chunks: List[str] = []
+
+        def text_chunks() -> Iterator[str]:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunks[-1]
+
+        pieces = text_chunks()
+        try:
+            yield from ijson.kvitems(TextChunkReader(pieces), "", use_float=True)
+        except ijson.JSONError as e:
+            raise Exception(
+                f"Failed to parse streamed response as JSON: {str(e)}\n"
+                f"Response text: {''.join(chunks)}"
+            )
+
+        # Drain anything after the closing brace (e.g. a code fence) before caching
+        for _ in pieces:
+            pass
+        store_response(video_path, prompt, model, ''.join(chunks))
+
+    def submit_batch(
+        self,
+        jobs: List[Tuple[str, str, str]],
+        poll_interval: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run many structured analyses through the Batch API.
+
+        Batch jobs are billed at a discount and have higher rate limits, at
+        the cost of latency (completion window up to 24h). One batch is
+        submitted per model; this call blocks until all of them finish.
+
+        Args:
+            jobs: List of (video_url, prompt, model) tuples (http/https URLs only)
+            poll_interval: Seconds between status checks (default: BATCH_POLL_INTERVAL)
+
+        Returns:
+            Parsed JSON per job, in input order. Failed jobs are
+            {"error": "<message>"} so one bad video doesn't sink the batch.
+
+        Raises:
+            ValueError: If a job references a local file
+            Exception: If a batch fails, expires or is cancelled
+        """
+        for video_url, _, _ in jobs:
+            if not video_url.startswith(('http://', 'https://')):
+                raise ValueError(
+                    f"Batch jobs require http/https video URLs. Got: {video_url}\n"
+                    "For local files, upload to remote URL first (Supabase, S3, etc.)"
+                )
+
+        self._init_openai_client()
+
+        # Batches are single-model: group job indices by model
+        by_model: Dict[str, List[int]] = {}
+        for index, (_, _, model) in enumerate(jobs):
+            by_model.setdefault(model, []).append(index)
+
+        results: List[Dict[str, Any]] = [
+            {"error": "No result returned by batch"} for _ in jobs
+        ]
+        for model, indices in by_model.items():
+            self._run_batch(jobs, indices, model, results, poll_interval or self.BATCH_POLL_INTERVAL)
+
+        return results
+
+    def _run_batch(
+        self,
+        jobs: List[Tuple[str, str, str]],
+        indices: List[int],
+        model: str,
+        results: List[Dict[str, Any]],
+        poll_interval: float
+    ) -> None:
+        """
+        Submit one single-model batch, wait for it and fill in results.
+
+        Args:
+            jobs: All batch jobs
+            indices: Indices of the jobs that use this model
+            model: Model identifier
+            results: Per-job result list to fill in (by job index)
+            poll_interval: Seconds between status checks
+        """
+        # One JSONL line per job
+        lines = [
+            json.dumps({
+                "custom_id": f"job-{index}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "messages": self._openai_messages(jobs[index][0], jobs[index][1])
+                }
+            })
+            for index in indices
+        ]
+
+        input_file = self.openai_client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.openai_client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"Submitted batch {batch.id} ({len(indices)} jobs, {model})", file=sys.stderr)
+
+        # Poll until the batch reaches a terminal state
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = self.openai_client.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            progress = f" ({counts.completed}/{counts.total})" if counts else ""
+            print(f"Batch {batch.id}: {batch.status}{progress}", file=sys.stderr)
+
+        if batch.status != "completed":
+            raise Exception(f"Batch {batch.id} ended with status: {batch.status}")
+
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.openai_client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    self._parse_batch_line(line, results)
+
+    def _parse_batch_line(self, line: str, results: List[Dict[str, Any]]) -> None:
+        """
+        Parse one Batch API output/error line into results.
+
+        Args:
+            line: JSONL record from the batch output or error file
+            results: Per-job result list to fill in (by job index)
+        """
+        record = json.loads(line)
+        index = int(record["custom_id"].split("-", 1)[1])
 
-        # Try to extract JSON from response
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or response.get("body")
+            results[index] = {"error": f"Batch request failed: {error}"}
+            return
+
+        try:
+            text = response["body"]["choices"][0]["message"]["content"]
+            results[index] = self.parse_json_response(text)
+        except Exception as e:
+            results[index] = {"error": str(e)}
+
+    def _get_async_limit(self) -> "asyncio.Semaphore":
+        """Get the concurrency semaphore bound to the running event loop."""
+        import asyncio  # Only the async API needs it (already loaded by the loop)
+
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_limit = asyncio.Semaphore(self.MAX_CONCURRENCY)
+            self._async_loop = loop
+        return self._async_limit
+
+    async def analyze_video_structured_async(
+        self,
+        video_path: str,
+        prompt: str,
+        model: str = "qwen3-vl-235b-a22b-thinking"
+    ) -> Dict[str, Any]:
+        """
+        Async variant of analyze_video_structured for concurrent fan-out.
+
+        Requests run in worker threads (the SDK calls are blocking) and at
+        most MAX_CONCURRENCY (env QWEN_CONCURRENCY) are in flight at once,
+        so asyncio.gather over many calls costs max() instead of sum().
+
+        Args:
+            video_path: Path to video file or URL
+            prompt: Analysis prompt (should request JSON output)
+            model: Model identifier (default: qwen3-vl-235b-a22b-thinking)
+
+        Returns:
+            Parsed JSON response as dict
+        """
+        import asyncio
+
+        async with self._get_async_limit():
+            return await asyncio.to_thread(
+                self.analyze_video_structured, video_path, prompt, model
+            )
+
+    def analyze_video_sections(
+        self,
+        video_path: str,
+        sections: Dict[str, str],
+        model: str = "qwen3-vl-235b-a22b-thinking"
+    ) -> Dict[str, Any]:
+        """
+        Run several JSON analyses of the same video in a single request.
+
+        Each section prompt is embedded under its own header and the model
+        is asked for one JSON object keyed by section name, so the video is
+        uploaded and encoded once instead of once per analysis.
+
+        Args:
+            video_path: Path to video file or URL
+            sections: Mapping of section name -> prompt (each requesting JSON)
+            model: Model identifier (default: qwen3-vl-235b-a22b-thinking)
+
+        Returns:
+            Dict mapping each section name to its parsed JSON object
+            (missing or non-object sections map to an empty dict)
+
+        Raises:
+            Exception: If analysis fails, the response isn't valid JSON or
+                isn't a JSON object
+        """
+        # A single section needs no envelope - keep the prompt untouched
+        single = len(sections) == 1
+        if single:
+            prompt = next(iter(sections.values()))
+        else:
+            prompt = build_sections_prompt(sections)
+        response = self.analyze_video_structured(video_path, prompt, model)
+
+        if not isinstance(response, dict):
+            raise Exception(
+                f"Invalid response: expected a JSON object"
+                f"{'' if single else ' keyed by section'}, got {type(response).__name__}"
+            )
+        if single:
+            response = {next(iter(sections)): response}
+
+        results = {}
+        for name in sections:
+            section = response.get(name)
+            if not isinstance(section, dict):
+                print(
+                    f"Warning: Missing '{name}' section in model response "
+                    f"(got {type(section).__name__}). Using defaults.",
+                    file=sys.stderr
+                )
+                section = {}
+            results[name] = section
+        return results
+
+    def analyze_video_multi_prompt(
+        self,
+        video_path: str,
+        prompts: List[str],
+        model: str = "qwen3-vl-235b-a22b-thinking"
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer several JSON prompts about the same video in a single request.
+
+        Cached prompts are served from the cache; the rest are fused into one
+        multi-section request so the video is encoded once. Prompts the model
+        leaves unanswered (or a failed fused request) are retried on their own.
+        Fused answers are not cached under the individual prompts - only
+        answers to a prompt asked on its own are.
+
+        Args:
+            video_path: Path to video file or URL
+            prompts: Prompts to answer (each requesting a JSON object)
+            model: Model identifier (default: qwen3-vl-235b-a22b-thinking)
+
+        Returns:
+            Parsed JSON answer per prompt, in order
+        """
+        answers: List[Optional[Dict[str, Any]]] = []
+        for prompt in prompts:
+            cached = lookup_response(video_path, prompt, model)
+            answers.append(None if cached is None else self.parse_json_response(cached))
+        pending = [index for index, answer in enumerate(answers) if answer is None]
+
+        if len(pending) > 1:
+            try:
+                combined = self.analyze_video_structured(
+                    video_path,
+                    build_sections_prompt({f"task_{index}": prompts[index] for index in pending}),
+                    model
+                )
+                if not isinstance(combined, dict):
+                    raise ValueError(f"expected a JSON object, got {type(combined).__name__}")
+                for index in pending:
+                    value = combined.get(f"task_{index}")
+                    if isinstance(value, dict) and value:
+                        answers[index] = value
+            except Exception as e:
+                print(f"Multi-prompt request failed ({error_message(e)}), answering prompts separately", file=sys.stderr)
+
+        for index, answer in enumerate(answers):
+            if answer is None:
+                answers[index] = self.analyze_video_structured(video_path, prompts[index], model)
+
+        return answers
+
+    def analyze_videos_batch(
+        self,
+        video_paths: List[str],
+        prompt: str,
+        model: str = "qwen3-vl-235b-a22b-thinking"
+    ) -> List[Dict[str, Any]]:
+        """
+        Ask the same JSON question about several videos in a single request.
+
+        All videos go into one user message and the model answers with
+        {"results": [{"video_index": i, ...}, ...]}, which is split back into
+        one answer per video. Answers are cached per video exactly as if
+        each video had been asked on its own, and cached videos are left
+        out of the request.
+
+        Args:
+            video_paths: Local video paths or URLs
+            prompt: Per-video analysis prompt (should request a JSON object)
+            model: DashScope VL model identifier
+
+        Returns:
+            Parsed JSON answer per video, in input order
+
+        Videos the response has no valid answer for (missing, duplicated or
+        malformed entries, or a response without a "results" list) are
+        asked again one by one; the rest of the batch is kept.
+
+        Raises:
+            ValueError: If model is an Omni model (single video per request)
+            Exception: If a request fails
+        """
+        if self._is_omni_model(model):
+            raise ValueError(f"Batched video analysis requires a DashScope VL model, got: {model}")
+
+        for video_path in video_paths:
+            if not video_path.startswith(('http://', 'https://', 'file://')) and not Path(video_path).exists():
+                raise FileNotFoundError(f"Video file not found: {video_path}")
+
+        answers: List[Optional[Dict[str, Any]]] = []
+        pending = []
+        for index, video_path in enumerate(video_paths):
+            cached = lookup_response(video_path, prompt, model)
+            answers.append(None if cached is None else self.parse_json_response(cached))
+            if cached is None:
+                pending.append(index)
+
+        if len(pending) == 1:
+            index = pending[0]
+            answers[index] = self.analyze_video_structured(video_paths[index], prompt, model)
+        elif pending:
+            content = [{"video": self._ensure_remote_url(video_paths[index], model)} for index in pending]
+            content.append({"text": build_videos_prompt(prompt, len(pending))})
+            response = self._make_request_dashscope([{"role": "user", "content": content}], model)
+
+            by_index = _batch_results(self.parse_json_response(self._dashscope_text(response)), len(pending))
+
+            for batch_index, index in enumerate(pending):
+                if batch_index in by_index:
+                    answers[index] = by_index[batch_index]
+                    store_response(video_paths[index], prompt, model, json.dumps(answers[index]))
+                else:
+                    # Only this video is asked again, on its own
+                    print(
+                        f"Batched response has no valid answer for video_index {batch_index}, "
+                        f"analyzing {video_paths[index]} separately",
+                        file=sys.stderr
+                    )
+                    answers[index] = self.analyze_video_structured(video_paths[index], prompt, model)
+
+        return answers
+
+    @staticmethod
+    def parse_json_response(response_text: str) -> Dict[str, Any]:
+        """
+        Parse a model response as JSON, tolerating markdown code fences.
+
+        Args:
+            response_text: Raw model response
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            Exception: If response isn't valid JSON
+        """
         # Model might wrap JSON in markdown code blocks
-        response_text = response_text.strip()
-
-        # Remove markdown code fences if present
-        if response_text.startswith('```'):
-            lines = response_text.split('\n')
-            # Remove first line (```json or ```)
-            lines = lines[1:]
-            # Remove last line (```)
-            if lines[-1].strip() == '```':
-                lines = lines[:-1]
-            response_text = '\n'.join(lines)
+        match = _FENCE_RE.match(response_text)
+        payload = match.group(1) if match else response_text.strip()
 
         try:
-            return json.loads(response_text)
-        except json.JSONDecodeError as e:
+            return loads(payload)
+        except ValueError as e:
             raise Exception(
                 f"Failed to parse response as JSON: {str(e)}\n"
-                f"Response text: {response_text}"
+                f"Response text: {payload}"
             )
 
 
+def _resolve_headers(video_url: str) -> Optional[Dict[str, str]]:
+    """
+    Headers the OpenAI-compatible API needs to fetch an oss:// upload.
+
+    (The DashScope SDK adds this header itself.)
+    """
+    if video_url.startswith('oss://'):
+        return {"X-DashScope-OssResourceResolve": "enable"}
+    return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Decide whether a failed request is worth retrying.
+
+    Only transient failures are retried: rate limiting (429), request
+    timeouts (408), server errors (5xx), connection errors and timeouts.
+    Everything else (bad request, auth, local errors, bugs) fails
+    immediately.
+
+    Args:
+        error: Exception raised by a request attempt
+
+    Returns:
+        True if the request should be retried
+    """
+    # DashScope (QwenAPIError), OpenAI (APIStatusError) and upload
+    # (UploadError) errors carry the HTTP status
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS or status >= 500
+
+    # Built-in network errors (socket timeouts, resets, refused connections)
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+
+    try:
+        import openai
+        if isinstance(error, (openai.RateLimitError, openai.APIConnectionError,
+                              openai.InternalServerError)):
+            return True  # APIConnectionError includes APITimeoutError
+    except (ImportError, AttributeError):  # openai missing, or pre-1.0
+        pass
+
+    try:
+        import requests  # The DashScope SDK and uploads go through requests
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+    except ImportError:
+        pass
+
+    return False
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """
+    Get the server's Retry-After delay (seconds) from an error, if any.
+
+    Args:
+        error: Exception raised by a request attempt
+
+    Returns:
+        Delay in seconds, or None if the error doesn't carry one
+    """
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        retry_after = headers.get("retry-after") if headers is not None else None
+
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except (TypeError, ValueError):
+        return None  # HTTP-date form; fall back to our own backoff
+
+
+def build_sections_prompt(sections: Dict[str, str]) -> str:
+    """
+    Combine several JSON analysis prompts into one multi-section prompt.
+
+    Args:
+        sections: Mapping of section name -> prompt
+
+    Returns:
+        Prompt requesting a single JSON object keyed by section name
+    """
+    keys = ", ".join(f'"{name}"' for name in sections)
+    parts = [
+        f"Perform the {len(sections)} analyses below on this video.\n\n"
+        f"Return ONE JSON object with exactly these top-level keys: {keys}.\n"
+        "The value of each key must be the complete answer to the section with "
+        "that name: the JSON it requests, or a string if it asks for plain text. "
+        "Return JSON only (no markdown, no explanation)."
+    ]
+    for name, prompt in sections.items():
+        parts.append(f"=== SECTION \"{name}\" ===\n{prompt}")
+    return "\n\n".join(parts)
+
+
+def _batch_results(response: Any, video_count: int) -> Dict[int, Dict[str, Any]]:
+    """
+    Split a multi-video response into answers by video index.
+
+    Entries that aren't objects, lack an in-range integer video_index or
+    repeat an index are dropped, so those videos count as unanswered.
+
+    Args:
+        response: Parsed response, expected {"results": [{"video_index": i, ...}, ...]}
+        video_count: Number of videos in the request
+
+    Returns:
+        Video index -> answer (without video_index), for valid answers only
+    """
+    results = response.get("results") if isinstance(response, dict) else response
+    if not isinstance(results, list) or not isinstance(response, dict):
+        print(
+            f"Warning: Batched response has no \"results\" list (got {type(results).__name__})",
+            file=sys.stderr
+        )
+        return {}
+
+    by_index: Dict[int, Dict[str, Any]] = {}
+    repeated = set()
+    for result in results:
+        index = result.get("video_index") if isinstance(result, dict) else None
+        if isinstance(index, str) and index.strip().isdigit():
+            index = int(index)
+        if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < video_count:
+            continue  # Not an indexed answer object
+        if index in by_index:
+            repeated.add(index)  # Can't tell which answer is right
+        by_index[index] = {key: value for key, value in result.items() if key != "video_index"}
+
+    for index in repeated:
+        del by_index[index]
+    return by_index
+
+
+def build_videos_prompt(prompt: str, video_count: int) -> str:
+    """
+    Wrap a per-video JSON prompt for a request carrying several videos.
+
+    Args:
+        prompt: Prompt to answer for each video
+        video_count: Number of videos in the request
+
+    Returns:
+        Prompt requesting {"results": [...]} with one entry per video
+    """
+    return (
+        f"You are given {video_count} videos, numbered 0 to {video_count - 1} "
+        "in the order they appear. Answer the task below separately for EACH video.\n\n"
+        'Return ONE JSON object: {"results": [{"video_index": <number>, ...}, ...]} '
+        f"with exactly {video_count} entries. Each entry is the JSON object the task "
+        'requests for that video, plus a "video_index" field. Never mix content '
+        "from different videos. Return JSON only (no markdown, no explanation).\n\n"
+        f"=== TASK ===\n{prompt}"
+    )
+
+
 # Backward compatibility alias
 QwenVLClient = QwenClient
 
 
+def _load_dashscope() -> None:
+    """Import the DashScope SDK once, exiting with a JSON error if it's missing."""
+    global dashscope, MultiModalConversation, upload_file
+    if dashscope is not None:
+        return
+
+    try:
+        import dashscope as sdk
+        from dashscope import MultiModalConversation as conversation
+    except ImportError:
+        print(json.dumps({
+            "error": "dashscope package not installed",
+            "message": "Run: pip install dashscope>=1.24.6"
+        }), file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        from upload import upload_file as upload
+    except ImportError:
+        upload = None  # Older SDK: local files are uploaded on every call
+
+    MultiModalConversation, upload_file = conversation, upload
+    dashscope = sdk  # Set last: marks the import as done
+
+
+def _build_dashscope_session(pool_size: int):
+    """
+    Build a pooled requests.Session for the DashScope SDK's HTTP calls.
+
+    Passed to MultiModalConversation.call(session=...), the SDK's public
+    hook for connection reuse: requests' default pool keeps only 10
+    connections per host, so extra worker threads would open and drop
+    connections on every call.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _build_http_client():
+    """
+    Build a pooled HTTP/2 httpx.Client, or None if httpx/h2 are missing.
+
+    Analysis calls can run for minutes, hence the long read timeout.
+    """
+    try:
+        import httpx
+        return httpx.Client(
+            http2=True,
+            timeout=httpx.Timeout(300, connect=10),
+            limits=httpx.Limits(max_keepalive_connections=QwenClient.HTTP_POOL_SIZE)
+        )
+    except ImportError:
+        return None  # httpx or h2 not installed - SDK default client
+
+
+@functools.cache
+def get_shared_client() -> QwenClient:
+    """
+    Get the process-wide QwenClient (created on first use).
+
+    Reusing one client keeps its connections alive between calls instead
+    of paying a fresh TLS handshake per analysis.
+
+    Returns:
+        Shared QwenClient instance
+    """
+    return QwenClient(http_client=_build_http_client())
+
+
 def main():
     """
     CLI interface for testing.
@@ -402,7 +1236,7 @@ def main():
         print("\nExamples:")
         print("  # VL model (default)")
         print("  python qwen_client.py video.mp4 'Analyze this video'")
-        print("\n  # Omni model (requires http/https URL)")
+        print("\n  # Omni model (audio-aware; local files are uploaded first)")
         print("  python qwen_client.py https://url.com/video.mp4 'Analyze audio-visual sync' qwen3-omni-flash")
         sys.exit(1)
 
@@ -411,7 +1245,7 @@ def main():
     model = sys.argv[3] if len(sys.argv) > 3 else "qwen3-vl-235b-a22b-thinking"
 
     try:
-        client = QwenClient()
+        client = get_shared_client()
         response = client.analyze_video(video_path, prompt, model)
         print(response)
     except Exception as e:
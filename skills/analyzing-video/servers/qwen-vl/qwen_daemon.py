@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Long-lived Qwen analysis daemon.
+
+Every CLI invocation otherwise pays interpreter start-up, SDK imports,
+QwenClient construction and a fresh TLS handshake. When an agent fires
+dozens of questions in a row (e.g. during B-roll refinement) that overhead
+dominates. The daemon keeps one QwenClient (and its connection pools)
+alive and serves requests over a UNIX socket; the CLIs become thin clients.
+
+Protocol (one JSON object per line, one request per connection):
+    request:  {"method": "analyze_video", "params": {"video_path": ..., "prompt": ..., "model": ...}}
+    response: {"result": ...}  or  {"error": "<message>"}
+
+Socket: $XDG_RUNTIME_DIR/upgraide-qwen-<uid>/qwen.sock (or under the temp
+dir). The directory is created owner-only (0700); if it exists but isn't
+private to the current user the daemon is not used.
+
+Concurrent analyze_video_structured requests for the same video are
+coalesced into one multi-prompt request (see AsyncBatchQueue). Plain-text
+analyze_video requests are always sent on their own.
+
+The CLIs autostart the daemon when the socket is absent and fall back to
+an in-process client if it can't be reached, doesn't answer a ping within
+PING_TIMEOUT, or doesn't answer an analysis within QWEN_DAEMON_TIMEOUT
+seconds (default 1800). The daemon exits after
+QWEN_DAEMON_IDLE_TIMEOUT seconds (default 900) without requests. It keeps
+the environment it was started with (API key, QWEN_* settings).
+Set QWEN_DAEMON=0 to always run in-process.
+
+Usage:
+    python qwen_daemon.py          # Run in the foreground
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import stat
+import socket
+import getpass
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Any, List, NamedTuple, Optional, Tuple
+
+# asyncio (~30ms to import) is only needed by the server side; thin
+# clients import this module for get_client() and never touch it
+if TYPE_CHECKING:
+    import asyncio
+
+
+_USER = str(os.getuid()) if hasattr(os, "getuid") else getpass.getuser()
+SOCKET_DIR = Path(os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()) / f"upgraide-qwen-{_USER}"
+SOCKET_PATH = SOCKET_DIR / "qwen.sock"
+LOG_PATH = SOCKET_DIR / "qwen.log"
+MAX_REQUEST_BYTES = 16 * 1024 * 1024  # Longest request line (prompts can be long)
+IDLE_TIMEOUT = float(os.getenv("QWEN_DAEMON_IDLE_TIMEOUT", "900"))  # seconds
+STARTUP_TIMEOUT = 10.0  # seconds to wait for an autostarted daemon
+PING_TIMEOUT = 2.0  # seconds for a daemon to accept and answer a ping
+REQUEST_TIMEOUT = float(os.getenv("QWEN_DAEMON_TIMEOUT", "1800"))  # seconds per analysis
+
+DEFAULT_MODEL = "qwen3-vl-235b-a22b-thinking"
+
+# Request coalescing: same-video prompts arriving within MAX_WAIT_TIME
+# are answered by one multi-prompt request
+MAX_BATCH_SIZE = 8
+MAX_WAIT_TIME = 0.05  # seconds
+
+# QwenClient methods the daemon will dispatch to
+METHODS = frozenset({
+    "analyze_video",
+    "analyze_video_structured",
+    "analyze_video_sections"
+})
+
+
+def _private_socket_dir(create: bool = False) -> bool:
+    """
+    Check that SOCKET_DIR is a directory only the current user can access.
+
+    Anyone who can reach the socket can use the daemon's API key, and a
+    directory owned by someone else could hold an impostor's socket.
+
+    Args:
+        create: Create the directory (mode 0700) if it doesn't exist
+
+    Returns:
+        True if the directory exists, is ours and is owner-only
+    """
+    if create:
+        try:
+            SOCKET_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        except OSError:
+            return False
+    try:
+        info = SOCKET_DIR.lstat()
+    except OSError:
+        return False
+
+    owner_ok = not hasattr(os, "getuid") or info.st_uid == os.getuid()
+    return stat.S_ISDIR(info.st_mode) and owner_ok and not info.st_mode & 0o077
+
+
+class DaemonUnavailable(Exception):
+    """The daemon couldn't be reached or didn't answer in time."""
+
+
+class DaemonClient:
+    """
+    Proxy exposing QwenClient's analysis methods over the daemon socket.
+
+    Same call signatures and return values as QwenClient; errors raised in
+    the daemon are re-raised here as Exception with the original message.
+    If the daemon stops responding, calls run on the in-process client.
+    """
+
+    def __init__(self, socket_path: Path = SOCKET_PATH):
+        self.socket_path = socket_path
+
+    def _call(self, method: str, timeout: float, **params) -> Any:
+        """
+        Send one request and wait for its response.
+
+        Raises:
+            DaemonUnavailable: If the socket can't be reached, the daemon
+                doesn't answer within timeout seconds or hangs up
+            Exception: With the daemon's message if the request failed there
+        """
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)  # Connect, send and the whole read
+                sock.connect(str(self.socket_path))
+                sock.sendall(json.dumps({"method": method, "params": params}).encode() + b"\n")
+                with sock.makefile('rb') as reader:
+                    line = reader.readline()
+        except OSError as e:  # Includes socket.timeout
+            raise DaemonUnavailable(f"{type(e).__name__}: {e}") from e
+
+        if not line:
+            raise DaemonUnavailable("Qwen daemon closed the connection without a response")
+
+        reply = json.loads(line)
+        if "error" in reply:
+            raise Exception(reply["error"])
+        return reply["result"]
+
+    @staticmethod
+    def _resolve(video_path: str) -> str:
+        """Make local paths absolute - the daemon has its own working directory."""
+        if video_path.startswith(('http://', 'https://', 'file://')):
+            return video_path
+        return str(Path(video_path).absolute())
+
+    def _analyze(self, method: str, **params) -> Any:
+        """Run an analysis on the daemon, or in-process if it stops responding."""
+        try:
+            return self._call(method, REQUEST_TIMEOUT, **params)
+        except DaemonUnavailable as e:
+            print(f"Qwen daemon unavailable ({e}), running in-process", file=sys.stderr)
+
+        from qwen_client import get_shared_client
+        return getattr(get_shared_client(), method)(**params)
+
+    def ping(self) -> bool:
+        """Check whether the daemon is up and responding (within PING_TIMEOUT)."""
+        try:
+            return self._call("ping", PING_TIMEOUT) == "pong"
+        except Exception:
+            return False
+
+    def analyze_video(self, video_path: str, prompt: str, model: str = DEFAULT_MODEL) -> str:
+        return self._analyze("analyze_video", video_path=self._resolve(video_path), prompt=prompt, model=model)
+
+    def analyze_video_structured(self, video_path: str, prompt: str, model: str = DEFAULT_MODEL) -> Dict[str, Any]:
+        return self._analyze("analyze_video_structured", video_path=self._resolve(video_path), prompt=prompt, model=model)
+
+    def analyze_video_sections(self, video_path: str, sections: Dict[str, str], model: str = DEFAULT_MODEL) -> Dict[str, Any]:
+        return self._analyze("analyze_video_sections", video_path=self._resolve(video_path), sections=sections, model=model)
+
+
+def _autostart() -> bool:
+    """
+    Start the daemon in the background and wait for it to accept requests.
+
+    Returns:
+        True if the daemon is reachable
+    """
+    if not _private_socket_dir(create=True):
+        return False
+
+    try:
+        with open(LOG_PATH, 'ab') as log:
+            process = subprocess.Popen(
+                [sys.executable, str(Path(__file__).absolute())],
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                start_new_session=True  # Outlive the CLI that started it
+            )
+    except OSError:
+        return False
+
+    client = DaemonClient()
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if client.ping():
+            return True
+        if process.poll() is not None:
+            # Exited: another daemon won the race, or startup failed (see LOG_PATH)
+            return client.ping()
+        time.sleep(0.1)
+    return False
+
+
+def get_client():
+    """
+    Get a client for video analysis: the daemon if possible, else in-process.
+
+    Returns:
+        DaemonClient or the shared QwenClient (same analysis interface)
+    """
+    if os.getenv("QWEN_DAEMON", "1") != "0" and _private_socket_dir(create=True):
+        daemon = DaemonClient()
+        if daemon.ping() or _autostart():
+            return daemon
+        print("Qwen daemon unavailable, running in-process", file=sys.stderr)
+
+    # Imported lazily: thin clients never pay for the SDK imports
+    from qwen_client import get_shared_client
+    return get_shared_client()
+
+
+def _asyncio():
+    """Import asyncio on first use by the server side."""
+    import asyncio
+    return asyncio
+
+
+class _BatchItem(NamedTuple):
+    """One queued analyze_video_structured request."""
+    video_path: str
+    prompt: str
+    model: str
+    future: asyncio.Future
+
+
+class AsyncBatchQueue:
+    """
+    Coalesce concurrent structured requests into per-video multi-prompt calls.
+
+    Requests are collected for up to max_wait_time seconds (or until
+    max_batch_size are queued), grouped by (video, model), and each group
+    is sent as a single analyze_video_multi_prompt request, so several
+    questions about one video share one upload and one encoder pass.
+    A lone request waits at most max_wait_time before being sent.
+    """
+
+    def __init__(self, client, max_batch_size: int = MAX_BATCH_SIZE, max_wait_time: float = MAX_WAIT_TIME):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait_time = max_wait_time
+        self.queue: asyncio.Queue = _asyncio().Queue()
+
+    async def submit(self, video_path: str, prompt: str, model: str = DEFAULT_MODEL) -> Dict[str, Any]:
+        """Queue a JSON-requesting prompt and wait for its parsed answer."""
+        future = _asyncio().get_running_loop().create_future()
+        await self.queue.put(_BatchItem(video_path, prompt, model, future))
+        return await future
+
+    async def run(self) -> None:
+        """Collect batches forever and dispatch each video group concurrently."""
+        asyncio = _asyncio()
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait_time
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            groups: Dict[Tuple[str, str], List[_BatchItem]] = {}
+            for item in batch:
+                groups.setdefault((item.video_path, item.model), []).append(item)
+
+            for (video_path, model), items in groups.items():
+                asyncio.create_task(self._run_group(video_path, model, items))
+
+    async def _run_group(self, video_path: str, model: str, items: List[_BatchItem]) -> None:
+        """Answer all prompts for one video with one request."""
+        try:
+            answers = await _asyncio().to_thread(
+                self.client.analyze_video_multi_prompt,
+                video_path, [item.prompt for item in items], model
+            )
+        except Exception as e:
+            for item in items:
+                item.future.set_exception(e)
+            return
+
+        for item, answer in zip(items, answers):
+            item.future.set_result(answer)
+
+
+class QwenDaemon:
+    """Asyncio UNIX-socket server dispatching requests to one shared QwenClient."""
+
+    def __init__(self, socket_path: Path = SOCKET_PATH, idle_timeout: float = IDLE_TIMEOUT):
+        from qwen_client import get_shared_client
+
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.client = get_shared_client()
+        self.batch_queue: Optional[AsyncBatchQueue] = None
+        self.last_activity = time.monotonic()
+        self.active_requests = 0
+
+    async def dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        """Run one QwenClient method, coalescing single-prompt JSON analyses."""
+        if method == "ping":
+            return "pong"
+        if method not in METHODS:
+            raise ValueError(f"Unknown method: {method}")
+        if method == "analyze_video_structured":
+            return await self.batch_queue.submit(**params)
+        return await _asyncio().to_thread(getattr(self.client, method), **params)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve a single request/response connection."""
+        self.active_requests += 1
+        try:
+            try:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # StreamReader's signal for a line over the limit
+                    raise ValueError(f"Request larger than {MAX_REQUEST_BYTES} bytes") from None
+                request = json.loads(line)
+                result = await self.dispatch(request["method"], request.get("params") or {})
+                reply = {"result": result}
+            except Exception as e:
+                reply = {"error": str(e)}
+
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+        finally:
+            self.active_requests -= 1
+            self.last_activity = time.monotonic()
+            writer.close()
+
+    async def serve(self) -> None:
+        """Listen until idle for idle_timeout seconds."""
+        asyncio = _asyncio()
+
+        if self.socket_path == SOCKET_PATH and not _private_socket_dir(create=True):
+            print(f"Refusing to start: {SOCKET_DIR} is not private to this user", file=sys.stderr)
+            return
+
+        # Refuse to start twice; clear a stale socket left by a dead daemon
+        if DaemonClient(self.socket_path).ping():
+            print(f"Qwen daemon already running on {self.socket_path}", file=sys.stderr)
+            return
+        self.socket_path.unlink(missing_ok=True)
+
+        self.batch_queue = AsyncBatchQueue(self.client)
+        batcher = asyncio.create_task(self.batch_queue.run())
+
+        # Owner only from the moment it is bound - the daemon holds their API key
+        old_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(
+                self.handle, path=str(self.socket_path), limit=MAX_REQUEST_BYTES
+            )
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.socket_path, 0o600)
+        print(f"Qwen daemon listening on {self.socket_path}", file=sys.stderr)
+
+        try:
+            while True:
+                await asyncio.sleep(min(self.idle_timeout, 30))
+                idle = time.monotonic() - self.last_activity
+                if self.active_requests == 0 and idle >= self.idle_timeout:
+                    print(f"Idle for {idle:.0f}s, shutting down", file=sys.stderr)
+                    break
+        finally:
+            batcher.cancel()
+            server.close()
+            await server.wait_closed()
+            self.socket_path.unlink(missing_ok=True)
+
+
+def main():
+    """CLI entry point: run the daemon in the foreground."""
+    try:
+        _asyncio().run(QwenDaemon().serve())
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
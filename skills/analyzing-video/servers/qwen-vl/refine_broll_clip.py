@@ -2,13 +2,16 @@
 """
 B-roll Clip Refinement (Tier 2) - Single Clip Processing
 
-Refines a single B-roll clip's timestamps to frame-accurate precision.
-Extracts ±10-20s window around identified timestamp and analyzes at 10 FPS.
+Refines a single B-roll clip's timestamps (or a batch of clips with --batch)
+to frame-accurate precision. Extracts ±10-20s window around identified
+timestamp (stream-copied from the nearest keyframe, or re-encoded at 10 FPS
+with --reencode) and analyzes it.
 
 Can incorporate human feedback about what's wrong with the clip.
 
 Usage:
-    python refine_broll_clip.py <source_video> <start_time> <end_time> <description> [feedback] [window_padding]
+    python refine_broll_clip.py <source_video> <start_time> <end_time> <description> [feedback] [window_padding] [--reencode] [--force]
+    python refine_broll_clip.py --batch <clips.json> [--reencode] [--force]
 
 Arguments:
     source_video: Path to source video file
@@ -17,6 +20,13 @@ Arguments:
     description: What the clip should show (context for analysis)
     feedback: Optional - Human feedback about what's wrong (e.g., "starts in middle, missing beginning")
     window_padding: Optional - Seconds to extract around clip (default: 20)
+    --reencode: Re-encode the window at 10 FPS instead of stream-copying it
+    --force: Re-extract the window even if this clip's window was extracted
+        before (windows are reused across runs by default)
+    --batch: Refine every clip in a JSON list of {"source_video", "start",
+        "end", "description", "feedback"?, "window_padding"?} objects.
+        Windows are extracted while earlier clips are being analyzed and
+        analyses run concurrently; prints a JSON list of results.
 
 Example:
     python refine_broll_clip.py inputs/source.mp4 83 88 "AI tool interface animation"
@@ -26,44 +36,58 @@ Example:
 
     # With custom window
     python refine_broll_clip.py inputs/source.mp4 83 88 "AI tool interface animation" "" 15
+
+    # Several clips at once
+    python refine_broll_clip.py --batch outputs/clips-to-refine.json
 """
 
+import os
 import sys
 import json
+import time
+import hashlib
+import threading
 import subprocess
+from collections import deque
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
-from qwen_client import QwenClient
+from qwen_client import get_shared_client
+from qwen_daemon import get_client
+from jsonio import write_json
+from timeutil import now_iso
+from media import get_video_metadata
+from cli import build_parser
 
 
-def create_refinement_prompt(
-    description: str,
-    approx_start: float,
-    approx_end: float,
-    human_feedback: Optional[str] = None
-) -> str:
-    """
-    Create prompt for precise timestamp refinement with optional human feedback.
+# Source codec -> NVDEC decoder for GPU window extraction
+# (set REFINE_HWACCEL=0 to always use the software path)
+CUVID_DECODERS = {
+    "h264": "h264_cuvid",
+    "hevc": "hevc_cuvid",
+    "vp9": "vp9_cuvid",
+    "av1": "av1_cuvid",
+}
 
-    Args:
-        description: What the B-roll should show
-        approx_start: Approximate start from Tier 1
-        approx_end: Approximate end from Tier 1
-        human_feedback: Optional human feedback about what's wrong
+# ffmpeg errors that mean the GPU can't take this input (reported as the reason)
+NVDEC_ERRORS = ("Hardware is lacking", "Impossible to convert", "Cannot load", "No device")
 
-    Returns:
-        Formatted prompt string
-    """
-    feedback_section = ""
-    if human_feedback:
-        feedback_section = f"""
+# Cleared after the first GPU failure, so later clips skip straight to software
+_hwaccel_available = True
 
-⚠️ HUMAN FEEDBACK: "{human_feedback}"
-Pay special attention to this feedback and adjust your analysis accordingly."""
+# Validation checks a refined clip must pass (keys of the model's "validation")
+CLEAN_CHECKS = ("clean_start", "clean_end", "no_humans", "complete_content", "matches_description")
 
-    return f"""TASK: Find EXACT start and end timestamps for this B-roll clip.
+# Windows extracted at once by refine_clips (env REFINE_EXTRACT_WORKERS,
+# default half the cores - a re-encoding ffmpeg is multithreaded itself)
+EXTRACT_CONCURRENCY = max(int(os.getenv("REFINE_EXTRACT_WORKERS", str((os.cpu_count() or 2) // 2))), 1)
+
+# ffmpeg stderr lines kept for error messages, and seconds between progress lines
+FFMPEG_ERROR_LINES = 40
+FFMPEG_PROGRESS_INTERVAL = 5.0
+
+
+REFINEMENT_PROMPT = """TASK: Find EXACT start and end timestamps for this B-roll clip.
 
 CONTEXT: This clip should show: "{description}"
 
@@ -77,10 +101,10 @@ REQUIREMENTS:
 ✓ Matches description: Content must match what was described
 
 CRITICAL INSTRUCTIONS:
-- This video is a ±{20}s window around the estimated time
+- This video is the window {window_start:.2f}s to {window_end:.2f}s of the source
+- The estimate above falls at {relative_start:.2f}s to {relative_end:.2f}s in this video
 - Give timestamps RELATIVE TO THIS VIDEO (starting from 0:00)
-- Be frame-accurate at 10 FPS analysis
-- If you're uncertain, indicate lower confidence
+{frame_rate_line}- If you're uncertain, indicate lower confidence
 
 Return JSON only (no markdown, no explanation):
 {{
@@ -103,30 +127,182 @@ Return JSON only (no markdown, no explanation):
 If any check fails, set to false and explain in "issues" array.
 Confidence: 0.0 (uncertain) to 1.0 (very certain)."""
 
+REFINEMENT_FEEDBACK = """
+
+⚠️ HUMAN FEEDBACK: "{feedback}"
+Pay special attention to this feedback and adjust your analysis accordingly."""
+
+REFINEMENT_FRAME_RATE = "- Be frame-accurate: this video is {fps:g} FPS\n"
+
+
+def create_refinement_prompt(
+    description: str,
+    approx_start: float,
+    approx_end: float,
+    extraction_result: Dict[str, Any],
+    human_feedback: Optional[str] = None
+) -> str:
+    """
+    Create prompt for precise timestamp refinement with optional human feedback.
+
+    Describes the window as actually extracted: a stream copy starts at the
+    keyframe before the requested start and keeps the source frame rate.
+
+    Args:
+        description: What the B-roll should show
+        approx_start: Approximate start from Tier 1
+        approx_end: Approximate end from Tier 1
+        extraction_result: Output of prepare_clip (window_start, window_end, fps)
+        human_feedback: Optional human feedback about what's wrong
+
+    Returns:
+        Formatted prompt string
+    """
+    feedback_section = REFINEMENT_FEEDBACK.format(feedback=human_feedback) if human_feedback else ""
+    window_start = extraction_result["window_start"]
+    fps = extraction_result.get("fps")
+
+    return REFINEMENT_PROMPT.format(
+        description=description,
+        approx_start=approx_start,
+        approx_end=approx_end,
+        feedback_section=feedback_section,
+        window_start=window_start,
+        window_end=extraction_result["window_end"],
+        relative_start=max(approx_start - window_start, 0),
+        relative_end=max(approx_end - window_start, 0),
+        frame_rate_line=REFINEMENT_FRAME_RATE.format(fps=fps) if fps else ""
+    )
+
+
+def window_path(
+    workspace_dir: str,
+    source_video: str,
+    center_time: float,
+    padding: int,
+    reencode: bool = False
+) -> str:
+    """
+    Get the cache path for a window: the same source version, center,
+    padding and mode always map to the same file.
+
+    Args:
+        workspace_dir: Directory for intermediate files
+        source_video: Path to source video
+        center_time: Center timestamp in seconds
+        padding: Seconds extracted before/after
+        reencode: Whether the window is re-encoded
+
+    Returns:
+        Window clip path
+    """
+    return f"{workspace_dir}/win_{_window_key(source_video, center_time, padding, reencode)[:16]}.mp4"
+
+
+def _window_key(source_video: str, center_time: float, padding: int, reencode: bool) -> str:
+    """Hash of everything a window's content depends on."""
+    real_path = os.path.realpath(source_video)
+    stat = os.stat(real_path)
+    key = f"{real_path}:{stat.st_mtime_ns}:{stat.st_size}:{center_time:.3f}:{padding}:{int(reencode)}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
 
 def extract_video_window(
     source_video: str,
     center_time: float,
     padding: int,
-    output_path: str
+    output_path: str,
+    reencode: bool = False,
+    force: bool = False
 ) -> Dict[str, Any]:
     """
-    Extract ±padding window around center time using ffmpeg at 10 FPS.
+    Extract ±padding window around center time using ffmpeg.
+
+    By default the window is stream-copied (no decode/encode) from the
+    nearest keyframe at or before the window start, so it may begin up
+    to one GOP early; window_start reports where it really starts. The
+    model samples frames itself. If no keyframe is found or the copy
+    fails, or with reencode=True, the window is re-encoded at 10 FPS.
+
+    The extraction metadata is saved next to the clip (same name,
+    .json), and a later call for the same window and output path reuses
+    the clip instead of running ffmpeg again.
 
     Args:
         source_video: Path to source video
         center_time: Center timestamp in seconds
         padding: Seconds to extract before/after
         output_path: Where to save extracted clip
+        reencode: Always re-encode at 10 FPS (exact window start)
+        force: Extract even if a matching window already exists
 
     Returns:
         Dict with extraction metadata
     """
+    output_file = Path(output_path)
+    metadata_file = output_file.with_suffix(".json")
+    key = _window_key(source_video, center_time, padding, reencode)
+
+    if not force:
+        cached = _cached_window(output_file, metadata_file, key)
+        if cached is not None:
+            print(f"Reusing extracted window: {output_path}", file=sys.stderr)
+            return cached
+
+    # Ensure output directory exists
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    # Extract under a temporary name so an interrupted or concurrent run
+    # never leaves a partial clip at output_path
+    temp_file = output_file.with_name(
+        f"{output_file.stem}.{os.getpid()}-{threading.get_ident()}.tmp{output_file.suffix}"
+    )
+    try:
+        result = _extract_window(source_video, center_time, padding, str(temp_file), reencode)
+        os.replace(temp_file, output_file)
+    finally:
+        temp_file.unlink(missing_ok=True)
+
+    result["extracted_clip"] = output_path
+    try:
+        metadata_file.write_text(json.dumps({"key": key, "result": result}))
+    except OSError as e:
+        print(f"Warning: could not save window metadata {metadata_file}: {e}", file=sys.stderr)
+    return result
+
+
+def _cached_window(output_file: Path, metadata_file: Path, key: str) -> Optional[Dict[str, Any]]:
+    """Get the metadata of a previously extracted window, if still valid."""
+    try:
+        if output_file.stat().st_size == 0:
+            return None
+        cached = json.loads(metadata_file.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(cached, dict) or cached.get("key") != key:
+        return None  # Different window (or source changed) at the same path
+    return cached.get("result")
+
+
+def _extract_window(
+    source_video: str,
+    center_time: float,
+    padding: int,
+    output_path: str,
+    reencode: bool
+) -> Dict[str, Any]:
+    """Run the extraction for extract_video_window (no caching)."""
     start_time = max(0, center_time - padding)
     duration = padding * 2
 
-    # Ensure output directory exists
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    if not reencode:
+        keyframe = _keyframe_at_or_before(source_video, start_time)
+        if keyframe is not None:
+            try:
+                return _copy_window(source_video, keyframe, start_time + duration, output_path)
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"Stream copy failed, re-encoding instead ({getattr(e, 'stderr', None) or e})", file=sys.stderr)
 
     # ffmpeg command: extract window at 10 FPS for precise VL analysis
     cmd = [
@@ -145,7 +321,15 @@ def extract_video_window(
     print(f"Extracting window: {start_time:.1f}s - {start_time + duration:.1f}s @ 10 FPS", file=sys.stderr)
 
     try:
-        subprocess.run(cmd, capture_output=True, text=True, check=True)
+        hw_cmd = _nvdec_command(source_video, start_time, duration, output_path)
+        if hw_cmd is not None:
+            try:
+                _run_ffmpeg(hw_cmd)
+            except (OSError, subprocess.CalledProcessError) as e:
+                _disable_hwaccel(getattr(e, "stderr", None) or str(e))
+                hw_cmd = None
+        if hw_cmd is None:
+            _run_ffmpeg(cmd)
 
         return {
             "extracted_clip": output_path,
@@ -160,17 +344,213 @@ def extract_video_window(
         raise Exception(f"ffmpeg extraction failed: {e.stderr}")
 
 
-def refine_clip(
+def _run_ffmpeg(cmd: List[str]) -> None:
+    """
+    Run ffmpeg, streaming its stderr instead of buffering all of it.
+
+    Progress lines ("frame=...") are echoed to stderr every few seconds
+    and only the last FFMPEG_ERROR_LINES lines are kept for the error.
+
+    Args:
+        cmd: ffmpeg command
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg exits non-zero (stderr
+            holds the tail of its output)
+    """
+    tail = deque(maxlen=FFMPEG_ERROR_LINES)
+    last_progress = time.monotonic()
+
+    # Text mode splits on ffmpeg's "\r"-terminated progress updates too
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace"
+    ) as proc:
+        for line in proc.stderr:
+            line = line.rstrip()
+            if not line:
+                continue
+            tail.append(line)
+            if line.startswith("frame=") and time.monotonic() - last_progress >= FFMPEG_PROGRESS_INTERVAL:
+                last_progress = time.monotonic()
+                print(f"  {line}", file=sys.stderr)
+
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr="\n".join(tail))
+
+
+def _keyframe_at_or_before(source_video: str, time: float) -> Optional[float]:
+    """
+    Find the last video keyframe at or before time.
+
+    ffprobe seeks to time (which lands on the preceding keyframe) and
+    decodes keyframes only, so this is cheap even for long GOPs.
+
+    Args:
+        source_video: Path to source video
+        time: Timestamp in seconds
+
+    Returns:
+        Keyframe timestamp in seconds, or None if none was found
+    """
+    cmd = [
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', 'v:0',
+        '-skip_frame', 'nokey',
+        '-show_entries', 'frame=pts_time',
+        '-of', 'csv=p=0',
+        '-read_intervals', f"{time}%+1",
+        source_video
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30, check=True)
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        try:
+            keyframes.append(float(line.strip().rstrip(',')))
+        except ValueError:
+            continue  # N/A or empty
+
+    candidates = [t for t in keyframes if t <= time + 1e-3]
+    return max(candidates) if candidates else None
+
+
+def _copy_window(
+    source_video: str,
+    keyframe: float,
+    end_time: float,
+    output_path: str
+) -> Dict[str, Any]:
+    """
+    Cut [keyframe, end_time] out of the source by remuxing (no re-encode).
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails
+    """
+    duration = end_time - keyframe
+    cmd = [
+        'ffmpeg',
+        '-y',
+        '-ss', str(keyframe),
+        '-i', source_video,
+        '-t', str(duration),
+        '-c', 'copy',
+        '-avoid_negative_ts', 'make_zero',
+        '-movflags', '+faststart',
+        output_path
+    ]
+
+    print(f"Extracting window: {keyframe:.2f}s - {end_time:.1f}s (stream copy from keyframe)", file=sys.stderr)
+    _run_ffmpeg(cmd)
+
+    return {
+        "extracted_clip": output_path,
+        "window_start": keyframe,
+        "window_end": end_time,
+        "duration": duration,
+        "fps": _native_fps(source_video),
+        "success": True
+    }
+
+
+def _native_fps(source_video: str) -> Optional[float]:
+    """Get the source's video frame rate from (memoized) ffprobe metadata."""
+    for stream in get_video_metadata(source_video).get("streams", []):
+        if stream.get("codec_type") != "video":
+            continue
+        try:
+            num, _, den = stream.get("r_frame_rate", "").partition("/")
+            return round(float(num) / float(den or 1), 3)
+        except (ValueError, ZeroDivisionError):
+            return None
+    return None
+
+
+def _nvdec_command(
+    source_video: str,
+    start_time: float,
+    duration: float,
+    output_path: str
+) -> Optional[List[str]]:
+    """
+    Build the GPU (NVDEC decode -> fps filter -> NVENC encode) extraction command.
+
+    Frames stay in GPU memory end to end. -ss stays before -i so seeking
+    is done by the demuxer.
+
+    Args:
+        source_video: Path to source video
+        start_time: Window start in seconds
+        duration: Window length in seconds
+        output_path: Where to save extracted clip
+
+    Returns:
+        ffmpeg command, or None if hardware decoding is disabled, known
+        unavailable, or has no decoder for the source codec
+    """
+    if not _hwaccel_available or os.getenv("REFINE_HWACCEL", "1") == "0":
+        return None
+
+    streams = get_video_metadata(source_video).get("streams", [])
+    codec = next((s.get("codec_name") for s in streams if s.get("codec_type") == "video"), None)
+    decoder = CUVID_DECODERS.get(codec)
+    if decoder is None:
+        return None
+
+    return [
+        'ffmpeg',
+        '-y',
+        '-hwaccel', 'cuda',
+        '-hwaccel_output_format', 'cuda',
+        '-c:v', decoder,
+        '-ss', str(start_time),
+        '-i', source_video,
+        '-t', str(duration),
+        '-vf', 'fps=10',
+        '-c:v', 'h264_nvenc',
+        '-preset', 'p4',
+        '-tune', 'll',
+        '-rc', 'vbr',  # Constant-quality VBR: -cq only applies with an explicit VBR mode
+        '-cq', '28',
+        '-b:v', '0',  # No bitrate target, so quality alone drives rate control
+        output_path
+    ]
+
+
+def _disable_hwaccel(error: str) -> None:
+    """Fall back to software encoding for the rest of the process."""
+    global _hwaccel_available
+    _hwaccel_available = False
+
+    # Name the known GPU limitation if ffmpeg reported one, else its last error line
+    lines = [line.strip() for line in error.splitlines() if line.strip()] or ["unknown error"]
+    reason = next((line for line in lines if any(m in line for m in NVDEC_ERRORS)), lines[-1])
+    print(f"GPU extraction unavailable ({reason}), using software encoding", file=sys.stderr)
+
+
+def prepare_clip(
     source_video: str,
     approx_start: float,
     approx_end: float,
     description: str,
     human_feedback: Optional[str] = None,
     window_padding: int = 20,
-    workspace_dir: str = "outputs/broll-refinement"
+    workspace_dir: str = "outputs/broll-refinement",
+    reencode: bool = False,
+    force: bool = False
 ) -> Dict[str, Any]:
     """
-    Refine a single B-roll clip's timestamps with optional human feedback.
+    Extract the analysis window for a clip (refinement step 1).
+
+    Windows are named by what they contain (see window_path), so
+    re-refining the same clip reuses the window already extracted.
 
     Args:
         source_video: Path to source video
@@ -180,9 +560,11 @@ def refine_clip(
         human_feedback: Optional feedback about what's wrong
         window_padding: Seconds to extract around clip (default: 20)
         workspace_dir: Directory for intermediate files
+        reencode: Re-encode the window at 10 FPS instead of stream-copying it
+        force: Re-extract the window even if it already exists
 
     Returns:
-        Refined clip data with validation
+        Extraction metadata (see extract_video_window)
     """
     center_time = (approx_start + approx_end) / 2
 
@@ -199,145 +581,339 @@ def refine_clip(
     # Create workspace
     Path(workspace_dir).mkdir(parents=True, exist_ok=True)
 
-    # Generate unique filename for this refinement
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    clip_id = f"refine_{timestamp}"
-    window_output = f"{workspace_dir}/{clip_id}_window.mp4"
+    window_output = window_path(workspace_dir, source_video, center_time, window_padding, reencode)
 
     # Step 1: Extract ±padding window
     print("Step 1: Extracting video window...", file=sys.stderr)
-    extraction_result = extract_video_window(
+    return extract_video_window(
         source_video=source_video,
         center_time=center_time,
         padding=window_padding,
-        output_path=window_output
+        output_path=window_output,
+        reencode=reencode,
+        force=force
     )
 
-    # Step 2: Analyze window with Qwen VL at 10 FPS
-    print("Step 2: Analyzing at 10 FPS for precision...", file=sys.stderr)
 
-    client = QwenClient()
+def finalize_clip(
+    response: Dict[str, Any],
+    extraction_result: Dict[str, Any],
+    source_video: str,
+    approx_start: float,
+    approx_end: float,
+    human_feedback: Optional[str] = None,
+    window_padding: int = 20
+) -> Dict[str, Any]:
+    """
+    Turn the model's answer for a window into the refinement result (steps 3-5).
+
+    Args:
+        response: Parsed model response for the window
+        extraction_result: Output of prepare_clip
+        source_video: Path to source video
+        approx_start: Approximate start time (seconds)
+        approx_end: Approximate end time (seconds)
+        human_feedback: Optional feedback about what's wrong
+        window_padding: Seconds extracted around clip
+
+    Returns:
+        Refined clip data with validation
+
+    Raises:
+        KeyError: If the response is missing timestamp or validation
+    """
+    # Step 3: Convert timestamps from window-relative to original video absolute,
+    # snapped to the window's frame grid when its frame rate is known
+    window_start = extraction_result["window_start"]
+    fps = extraction_result.get("fps")
+
+    def to_source_time(seconds: float) -> float:
+        if fps:
+            seconds = round(seconds * fps) / fps
+        return seconds + window_start
+
+    refined_start = to_source_time(response["timestamp"]["start_seconds"])
+    refined_end = to_source_time(response["timestamp"]["end_seconds"])
+    refined_duration = refined_end - refined_start
+
+    # Step 4: Validate results
+    validation = response["validation"]
+    checks = {name: validation.get(name, False) for name in CLEAN_CHECKS}
+    all_checks_pass = all(checks.values())
+
+    confidence = validation.get("confidence", 0.5)
+
+    print(f"\n{'='*60}", file=sys.stderr)
+    print(f"REFINEMENT COMPLETE", file=sys.stderr)
+    print(f"{'='*60}", file=sys.stderr)
+    print(f"Refined timestamp: {refined_start:.2f}s - {refined_end:.2f}s ({refined_duration:.2f}s)", file=sys.stderr)
+    print(f"Confidence: {confidence:.2f}", file=sys.stderr)
+    print(f"All checks pass: {all_checks_pass}", file=sys.stderr)
+
+    if validation.get("issues"):
+        print(f"Issues: {', '.join(validation['issues'])}", file=sys.stderr)
+
+    print(f"{'='*60}\n", file=sys.stderr)
+
+    # Step 5: Build result
+    return {
+        "source_video": source_video,
+        "tier1_estimate": {
+            "start": approx_start,
+            "end": approx_end
+        },
+        "tier2_refined": {
+            "start": refined_start,
+            "end": refined_end,
+            "duration": refined_duration
+        },
+        "extraction_window": {
+            "clip_path": extraction_result["extracted_clip"],
+            "window_start": window_start,
+            "window_end": extraction_result["window_end"],
+            "padding_used": window_padding,
+            "fps": extraction_result["fps"]
+        },
+        "validation": {
+            "all_checks_pass": all_checks_pass,
+            "confidence": confidence,
+            "issues": validation.get("issues", []),
+            "checks": checks
+        },
+        "model_description": response.get("description", ""),
+        "human_feedback": human_feedback,
+        "analyzed_at": now_iso()
+    }
+
+
+def _failed_clip(
+    error: Exception,
+    extraction_result: Optional[Dict[str, Any]],
+    source_video: str,
+    approx_start: float,
+    approx_end: float
+) -> Dict[str, Any]:
+    """Report a failed refinement and build its result."""
+    import traceback
+    print(f"\n✗ ERROR: {str(error)}", file=sys.stderr)
+    traceback.print_exception(error, file=sys.stderr)
+
+    return {
+        "source_video": source_video,
+        "tier1_estimate": {
+            "start": approx_start,
+            "end": approx_end
+        },
+        "tier2_refined": None,
+        "error": str(error),
+        "extraction_window": extraction_result if extraction_result else {},
+        "validation": {
+            "all_checks_pass": False,
+            "confidence": 0.0,
+            "issues": [f"Analysis failed: {str(error)}"]
+        },
+        "analyzed_at": now_iso()
+    }
+
+
+def refine_clip(
+    source_video: str,
+    approx_start: float,
+    approx_end: float,
+    description: str,
+    human_feedback: Optional[str] = None,
+    window_padding: int = 20,
+    workspace_dir: str = "outputs/broll-refinement",
+    reencode: bool = False,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Refine a single B-roll clip's timestamps with optional human feedback.
+
+    Args:
+        source_video: Path to source video
+        approx_start: Approximate start time (seconds)
+        approx_end: Approximate end time (seconds)
+        description: What the clip should show
+        human_feedback: Optional feedback about what's wrong
+        window_padding: Seconds to extract around clip (default: 20)
+        workspace_dir: Directory for intermediate files
+        reencode: Re-encode the window at 10 FPS instead of stream-copying it
+        force: Re-extract the window even if it already exists
+
+    Returns:
+        Refined clip data with validation
+    """
+    extraction_result = prepare_clip(
+        source_video=source_video,
+        approx_start=approx_start,
+        approx_end=approx_end,
+        description=description,
+        human_feedback=human_feedback,
+        window_padding=window_padding,
+        workspace_dir=workspace_dir,
+        reencode=reencode,
+        force=force
+    )
+
+    # Step 2: Analyze window with Qwen VL
+    print("Step 2: Analyzing window for precise timestamps...", file=sys.stderr)
+
+    # Daemon if available: successive refine runs share one warm client
+    client = get_client()
     prompt = create_refinement_prompt(
         description=description,
         approx_start=approx_start,
         approx_end=approx_end,
+        extraction_result=extraction_result,
         human_feedback=human_feedback
     )
 
     try:
         response = client.analyze_video_structured(
-            video_path=window_output,
+            video_path=extraction_result["extracted_clip"],
             prompt=prompt
         )
+        return finalize_clip(
+            response, extraction_result, source_video,
+            approx_start, approx_end, human_feedback, window_padding
+        )
 
-        # Step 3: Convert timestamps from window-relative to original video absolute
-        window_start = extraction_result["window_start"]
-
-        refined_start = response["timestamp"]["start_seconds"] + window_start
-        refined_end = response["timestamp"]["end_seconds"] + window_start
-        refined_duration = refined_end - refined_start
+    except Exception as e:
+        return _failed_clip(e, extraction_result, source_video, approx_start, approx_end)
 
-        # Step 4: Validate results
-        validation = response["validation"]
-        all_checks_pass = all([
-            validation.get("clean_start", False),
-            validation.get("clean_end", False),
-            validation.get("no_humans", False),
-            validation.get("complete_content", False),
-            validation.get("matches_description", False)
-        ])
 
-        confidence = validation.get("confidence", 0.5)
+def refine_clips(
+    clips: List[Dict[str, Any]],
+    workspace_dir: str = "outputs/broll-refinement",
+    reencode: bool = False,
+    force: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Refine several clips, overlapping window extraction with analysis.
 
-        print(f"\n{'='*60}", file=sys.stderr)
-        print(f"REFINEMENT COMPLETE", file=sys.stderr)
-        print(f"{'='*60}", file=sys.stderr)
-        print(f"Refined timestamp: {refined_start:.2f}s - {refined_end:.2f}s ({refined_duration:.2f}s)", file=sys.stderr)
-        print(f"Confidence: {confidence:.2f}", file=sys.stderr)
-        print(f"All checks pass: {all_checks_pass}", file=sys.stderr)
+    Each clip is extracted in a worker thread (at most EXTRACT_CONCURRENCY
+    ffmpeg processes at once; the threads only wait on ffmpeg, so they run
+    fully in parallel) and sent to the model as soon as its window is
+    ready; analyses run concurrently up to the client's limit (env
+    QWEN_CONCURRENCY). A failed clip gets an error result instead of
+    failing the batch.
 
-        if validation.get("issues"):
-            print(f"Issues: {', '.join(validation['issues'])}", file=sys.stderr)
+    Args:
+        clips: Clip specs with source_video, start, end, description and
+            optional feedback and window_padding (same meaning as the CLI args)
+        workspace_dir: Directory for intermediate files
+        reencode: Re-encode windows at 10 FPS instead of stream-copying them
+        force: Re-extract windows even if they already exist
 
-        print(f"{'='*60}\n", file=sys.stderr)
+    Returns:
+        Refinement result per clip (as refine_clip), in input order
+    """
+    import asyncio
+
+    return asyncio.run(_refine_clips_async(clips, workspace_dir, reencode, force))
+
+
+async def _refine_clips_async(
+    clips: List[Dict[str, Any]],
+    workspace_dir: str,
+    reencode: bool,
+    force: bool
+) -> List[Dict[str, Any]]:
+    """Async body of refine_clips."""
+    import asyncio
+
+    client = get_shared_client()
+    extract_limit = asyncio.Semaphore(EXTRACT_CONCURRENCY)
+
+    async def refine_one(clip: Dict[str, Any]) -> Dict[str, Any]:
+        source_video = clip["source_video"]
+        approx_start = float(clip["start"])
+        approx_end = float(clip["end"])
+        human_feedback = clip.get("feedback") or None
+        window_padding = int(clip.get("window_padding", 20))
+
+        extraction_result = None
+        try:
+            async with extract_limit:
+                extraction_result = await asyncio.to_thread(
+                    prepare_clip,
+                    source_video, approx_start, approx_end, clip["description"],
+                    human_feedback, window_padding, workspace_dir, reencode, force
+                )
+
+            prompt = create_refinement_prompt(
+                description=clip["description"],
+                approx_start=approx_start,
+                approx_end=approx_end,
+                extraction_result=extraction_result,
+                human_feedback=human_feedback
+            )
+            response = await client.analyze_video_structured_async(
+                extraction_result["extracted_clip"], prompt
+            )
+            return finalize_clip(
+                response, extraction_result, source_video,
+                approx_start, approx_end, human_feedback, window_padding
+            )
+
+        except Exception as e:
+            return _failed_clip(e, extraction_result, source_video, approx_start, approx_end)
+
+    return list(await asyncio.gather(*(refine_one(clip) for clip in clips)))
+
+
+def main_batch(clips_file: str, reencode: bool = False, force: bool = False) -> None:
+    """CLI entry point for --batch: refine every clip listed in a JSON file."""
+    try:
+        clips = json.loads(Path(clips_file).read_text())
+        if not isinstance(clips, list):
+            raise ValueError(f"{clips_file} must contain a JSON list of clips")
 
-        # Step 5: Build result
-        result = {
-            "source_video": source_video,
-            "tier1_estimate": {
-                "start": approx_start,
-                "end": approx_end
-            },
-            "tier2_refined": {
-                "start": refined_start,
-                "end": refined_end,
-                "duration": refined_duration
-            },
-            "extraction_window": {
-                "clip_path": window_output,
-                "window_start": window_start,
-                "window_end": extraction_result["window_end"],
-                "padding_used": window_padding,
-                "fps": 10
-            },
-            "validation": {
-                "all_checks_pass": all_checks_pass,
-                "confidence": confidence,
-                "issues": validation.get("issues", []),
-                "checks": {
-                    "clean_start": validation.get("clean_start", False),
-                    "clean_end": validation.get("clean_end", False),
-                    "no_humans": validation.get("no_humans", False),
-                    "complete_content": validation.get("complete_content", False),
-                    "matches_description": validation.get("matches_description", False)
-                }
-            },
-            "model_description": response.get("description", ""),
-            "human_feedback": human_feedback,
-            "analyzed_at": datetime.utcnow().isoformat() + "Z"
-        }
+        for clip in clips:
+            missing = [key for key in ("source_video", "start", "end", "description") if key not in clip]
+            if missing:
+                raise ValueError(f"Clip is missing {', '.join(missing)}: {json.dumps(clip)}")
+            if not Path(clip["source_video"]).exists():
+                raise FileNotFoundError(f"Source video not found: {clip['source_video']}")
 
-        return result
+        results = refine_clips(clips, reencode=reencode, force=force)
 
     except Exception as e:
         import traceback
-        print(f"\n✗ ERROR: {str(e)}", file=sys.stderr)
+        print(json.dumps({"error": str(e), "clips_file": clips_file}), file=sys.stderr)
         traceback.print_exc(file=sys.stderr)
+        sys.exit(1)
 
-        return {
-            "source_video": source_video,
-            "tier1_estimate": {
-                "start": approx_start,
-                "end": approx_end
-            },
-            "tier2_refined": None,
-            "error": str(e),
-            "extraction_window": extraction_result if extraction_result else {},
-            "validation": {
-                "all_checks_pass": False,
-                "confidence": 0.0,
-                "issues": [f"Analysis failed: {str(e)}"]
-            },
-            "analyzed_at": datetime.utcnow().isoformat() + "Z"
-        }
+    # Output JSON to stdout for agent consumption
+    write_json(results)
+
+    # Exit code 2 = at least one clip needs more refinement
+    done = all(r.get("tier2_refined") and r["validation"]["confidence"] >= 0.7 for r in results)
+    sys.exit(0 if done else 2)
 
 
 def main():
     """CLI entry point."""
-    if len(sys.argv) < 5:
-        print("Usage: python refine_broll_clip.py <source_video> <start_time> <end_time> <description> [feedback] [window_padding]", file=sys.stderr)
-        print("\nExamples:", file=sys.stderr)
-        print('  python refine_broll_clip.py inputs/source.mp4 83 88 "AI tool interface"', file=sys.stderr)
-        print('  python refine_broll_clip.py inputs/source.mp4 83 88 "AI tool interface" "starts too late"', file=sys.stderr)
-        print('  python refine_broll_clip.py inputs/source.mp4 83 88 "AI tool interface" "" 15', file=sys.stderr)
-        sys.exit(1)
-
-    source_video = sys.argv[1]
-    approx_start = float(sys.argv[2])
-    approx_end = float(sys.argv[3])
-    description = sys.argv[4]
-    human_feedback = sys.argv[5] if len(sys.argv) > 5 and sys.argv[5] else None
-    window_padding = int(sys.argv[6]) if len(sys.argv) > 6 else 20
+    parser = build_parser("refine_broll_clip")
+    args = parser.parse_args()
+
+    if args.batch:
+        if args.source_video is not None:
+            parser.error("--batch takes no positional arguments")
+        return main_batch(args.batch, args.reencode, args.force)
+
+    if args.description is None:
+        parser.error("source_video, start_time, end_time and description are required (or use --batch)")
+
+    source_video = args.source_video
+    approx_start = args.start_time
+    approx_end = args.end_time
+    description = args.description
+    human_feedback = args.feedback or None
+    window_padding = args.window_padding
+    reencode = args.reencode
+    force = args.force
 
     # Validate source video exists
     if not Path(source_video).exists():
@@ -352,11 +928,13 @@ def main():
             approx_end=approx_end,
             description=description,
             human_feedback=human_feedback,
-            window_padding=window_padding
+            window_padding=window_padding,
+            reencode=reencode,
+            force=force
         )
 
         # Output JSON to stdout for agent consumption
-        print(json.dumps(result, indent=2))
+        write_json(result)
 
         # Exit with success if refinement worked
         if result.get("tier2_refined") and result["validation"]["confidence"] >= 0.7:
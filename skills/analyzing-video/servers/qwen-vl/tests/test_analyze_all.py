@@ -0,0 +1,132 @@
+"""Tests for the combined sections request and the analyzers built on it."""
+
+import json
+
+import pytest
+
+import analyze_all
+import mm_cache
+from analyze_audio_visual import analyze_audio_visual_style
+from analyze_narrative import REQUIRED_NARRATIVE_KEYS, analyze_narrative
+from analyze_style import REQUIRED_STYLE_KEYS, analyze_style
+from qwen_client import QwenClient, build_sections_prompt
+
+NARRATIVE = {key: {"note": key} for key in REQUIRED_NARRATIVE_KEYS}
+STYLE = {key: {"note": key} for key in REQUIRED_STYLE_KEYS}
+AUDIO_VISUAL = {"speech_sync": {}, "music_sync": {}, "audio_visual_correlation": {}, "pacing": {}}
+
+
+class CannedClient(QwenClient):
+    """QwenClient whose model calls return a canned response text."""
+
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    @mm_cache.cached_analysis
+    def analyze_video(self, video_path, prompt, model="qwen3-vl-235b-a22b-thinking"):
+        self.requests.append((video_path, prompt, model))
+        return self.response if isinstance(self.response, str) else json.dumps(self.response)
+
+
+@pytest.fixture
+def video(tmp_path, monkeypatch):
+    monkeypatch.setattr(mm_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setenv("QWEN_CACHE", "1")
+    monkeypatch.setenv("QWEN_PREPROCESS", "0")
+    path = tmp_path / "reference.mp4"
+    path.write_bytes(b"frames" * 100)
+    return path
+
+
+@pytest.fixture
+def use_client(monkeypatch):
+    def install(client):
+        monkeypatch.setattr(analyze_all, "get_client", lambda: client)
+        return client
+    return install
+
+
+def test_sections_from_one_request():
+    client = CannedClient({"narrative": NARRATIVE, "style": STYLE})
+    sections = client.analyze_video_sections(
+        "https://cdn.example.com/v.mp4", {"narrative": "N?", "style": "S?"}
+    )
+
+    assert sections == {"narrative": NARRATIVE, "style": STYLE}
+    assert len(client.requests) == 1
+    assert client.requests[0][1] == build_sections_prompt({"narrative": "N?", "style": "S?"})
+
+
+def test_single_section_keeps_prompt():
+    client = CannedClient(NARRATIVE)
+    assert client.analyze_video_sections("v.mp4", {"narrative": "N?"}) == {"narrative": NARRATIVE}
+    assert client.requests[0][1] == "N?"
+
+
+def test_sections_parse_fenced_response():
+    client = CannedClient("```json\n" + json.dumps({"narrative": NARRATIVE, "style": STYLE}) + "\n```")
+    assert client.analyze_video_sections("v.mp4", {"narrative": "N?", "style": "S?"})["style"] == STYLE
+
+
+@pytest.mark.parametrize("response", [[NARRATIVE, STYLE], "just text", 42])
+def test_non_object_response_is_invalid(response):
+    client = CannedClient(json.dumps(response))
+    with pytest.raises(Exception, match="Invalid response"):
+        client.analyze_video_sections("v.mp4", {"narrative": "N?", "style": "S?"})
+
+
+def test_missing_or_non_object_sections_default_to_empty(capsys):
+    client = CannedClient({"narrative": ["not", "an", "object"]})
+    sections = client.analyze_video_sections("v.mp4", {"narrative": "N?", "style": "S?"})
+
+    assert sections == {"narrative": {}, "style": {}}
+    assert "Missing 'narrative' section" in capsys.readouterr().err
+
+
+def test_analyze_all_builds_every_section(video, use_client):
+    use_client(CannedClient({"narrative": NARRATIVE, "style": STYLE}))
+    analysis = analyze_all.analyze_all(str(video))
+
+    assert analysis["video_path"] == str(video.absolute())
+    assert {key: analysis["narrative"][key] for key in NARRATIVE} == NARRATIVE
+    assert {key: analysis["style"][key] for key in STYLE} == STYLE
+    assert "duration" in analysis["style"]
+    assert "audio_visual" not in analysis
+
+
+def test_build_helpers_fill_missing_keys(video, use_client):
+    use_client(CannedClient({"narrative": {}, "style": {"pacing": {"cuts": 3}}}))
+    analysis = analyze_all.analyze_all(str(video))
+
+    assert all(analysis["narrative"][key] == {} for key in REQUIRED_NARRATIVE_KEYS)
+    assert analysis["style"]["pacing"] == {"cuts": 3}
+    assert all(key in analysis["style"] for key in REQUIRED_STYLE_KEYS)
+
+
+def test_single_analyzers_share_the_combined_request(video, use_client):
+    client = use_client(CannedClient({"narrative": NARRATIVE, "style": STYLE}))
+
+    narrative = analyze_narrative(str(video))
+    style = analyze_style(str(video))
+    analysis = analyze_all.analyze_all(str(video))
+
+    assert len(client.requests) == 1
+    assert {key: narrative[key] for key in NARRATIVE} == NARRATIVE
+    assert {key: style[key] for key in STYLE} == STYLE
+    assert {key: analysis["narrative"][key] for key in NARRATIVE} == NARRATIVE
+
+
+def test_audio_visual_uses_combined_request_for_urls(video, use_client, monkeypatch):
+    url = "https://cdn.example.com/reference.mp4"
+    client = use_client(CannedClient({"narrative": NARRATIVE, "style": STYLE, "audio_visual": AUDIO_VISUAL}))
+    monkeypatch.setitem(mm_cache._url_versions, url, '"v1"')  # No HEAD request
+
+    blueprint = analyze_audio_visual_style(url)
+    analysis = analyze_all.analyze_all(url)
+
+    assert len(client.requests) == 1
+    assert client.requests[0][2] == analyze_all.OMNI_MODEL
+    assert {key: blueprint[key] for key in AUDIO_VISUAL} == AUDIO_VISUAL
+    assert blueprint["model_used"] == analyze_all.OMNI_MODEL
+    assert set(analysis) >= {"narrative", "style", "audio_visual"}
@@ -0,0 +1,62 @@
+"""Tests for the shared CLI argument parsing."""
+
+import pytest
+
+from cli import COMMANDS, VL_MODEL, build_parser
+
+
+@pytest.mark.parametrize("cmd", sorted(COMMANDS))
+def test_every_command_builds(cmd):
+    parser = build_parser(cmd)
+    assert parser.prog == f"python {cmd}.py"
+    assert "example:" in parser.format_help()
+
+
+def test_unknown_command():
+    with pytest.raises(KeyError):
+        build_parser("nope")
+
+
+def test_ask():
+    args = build_parser("ask").parse_args(["video.mp4", "What happens?"])
+    assert (args.video_path, args.question, args.model) == ("video.mp4", "What happens?", VL_MODEL)
+
+    args = build_parser("ask").parse_args(["video.mp4", "Music?", "--model", "qwen3-omni-flash"])
+    assert args.model == "qwen3-omni-flash"
+
+
+def test_optional_output_path():
+    assert build_parser("analyze_style").parse_args(["in.mp4"]).output_path is None
+    assert build_parser("analyze_style").parse_args(["in.mp4", "out.json"]).output_path == "out.json"
+
+
+def test_human_refine_converts_numbers():
+    args = build_parser("human_refine_broll").parse_args(["w.mp4", "63", "5.2", "10.7", "logo"])
+    assert (args.window_start, args.model_start, args.model_end) == (63.0, 5.2, 10.7)
+
+
+def test_refine_broll_clip():
+    parser = build_parser("refine_broll_clip")
+
+    args = parser.parse_args(["in.mp4", "83", "88", "AI tool"])
+    assert (args.start_time, args.end_time, args.feedback, args.window_padding) == (83.0, 88.0, None, 20)
+    assert not args.batch and not args.reencode and not args.force
+
+    args = parser.parse_args(["in.mp4", "83", "88", "AI tool", "too late", "15", "--reencode", "--force"])
+    assert (args.feedback, args.window_padding, args.reencode, args.force) == ("too late", 15, True, True)
+
+    args = parser.parse_args(["--force", "--batch", "clips.json"])
+    assert (args.batch, args.force, args.source_video) == ("clips.json", True, None)
+
+
+@pytest.mark.parametrize("cmd, argv", [
+    ("ask", ["video.mp4"]),
+    ("analyze_style", []),
+    ("human_refine_broll", ["w.mp4", "start", "5.2", "10.7", "logo"]),
+    ("refine_broll_clip", ["in.mp4", "soon", "88", "AI tool"]),
+])
+def test_invalid_arguments_exit_2(cmd, argv, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        build_parser(cmd).parse_args(argv)
+    assert exit_info.value.code == 2
+    assert "usage:" in capsys.readouterr().err
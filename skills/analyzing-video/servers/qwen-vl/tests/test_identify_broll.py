@@ -0,0 +1,68 @@
+"""Tests for keyword normalization and matching in identify_broll."""
+
+import pytest
+
+import identify_broll
+from identify_broll import KeywordMatcher, normalize_keywords
+
+
+@pytest.fixture(params=["automaton", "substring"])
+def make_matcher(request, monkeypatch):
+    if request.param == "automaton":
+        pytest.importorskip("ahocorasick")
+    else:
+        monkeypatch.setattr(identify_broll, "ahocorasick", None)
+    return KeywordMatcher
+
+
+def test_normalize_keywords():
+    keywords = ["  AI Tools ", ["Robot", " CODE "], 42, []]
+    assert normalize_keywords(keywords) == ["ai tools", "robot", "code", "42"]
+
+
+def test_normalize_keywords_keeps_duplicates_in_order():
+    assert normalize_keywords(["b", ["a", "B"]]) == ["b", "a", "b"]
+
+
+def test_find_substrings(make_matcher):
+    matcher = make_matcher(["robot", "code", "ai", "drone"])
+    assert matcher.find("a robot writing code with ai") == {"robot", "code", "ai"}
+    assert matcher.find("nothing relevant") == set()
+
+
+def test_find_overlapping_keywords(make_matcher):
+    matcher = make_matcher(["screen", "screenshot", "shot"])
+    assert matcher.find("a screenshot") == {"screen", "screenshot", "shot"}
+
+
+def test_empty_keyword_matches_everything(make_matcher):
+    matcher = make_matcher(["", "robot"])
+    assert matcher.find("anything") == {""}
+    assert matcher.find_any([]) == set()
+    assert matcher.find_any(["robot arm"]) == {"", "robot"}
+
+
+def test_find_any_matches_across_texts(make_matcher):
+    matcher = make_matcher(["robot", "code", "terminal"])
+    assert matcher.find_any(["robot", "vs code editor"]) == {"robot", "code"}
+
+
+def test_count_includes_duplicates():
+    matcher = KeywordMatcher(["robot", "code", "robot"])
+    assert matcher.count({"robot"}) == 2
+    assert matcher.inv_count == pytest.approx(1 / 3)
+
+
+def test_no_keywords():
+    matcher = KeywordMatcher([])
+    assert matcher.find("robot") == set()
+    assert matcher.inv_count == 1.0
+
+
+def test_matches_naive_scan(make_matcher):
+    keywords = normalize_keywords(["AI", ["data", "Dashboard"], "chart", "a"])
+    texts = ["sales dashboard with a bar chart", "ai generated art", "", "xyz"]
+    matcher = make_matcher(keywords)
+    for text in texts:
+        assert matcher.find(text) == {kw for kw in keywords if kw in text}
+    assert matcher.find_any(texts) == {kw for kw in keywords if any(kw in t for t in texts)}
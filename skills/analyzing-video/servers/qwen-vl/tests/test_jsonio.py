@@ -0,0 +1,82 @@
+"""Tests for the streaming JSON helpers."""
+
+import json
+
+import pytest
+
+from jsonio import JsonObjectWriter, TextChunkReader, dumps
+
+
+def read_all(reader):
+    data = b""
+    while True:
+        chunk = reader.read(4)
+        if not chunk:
+            return data
+        data += chunk
+
+
+def test_reader_strips_prose_and_code_fences():
+    chunks = ["Here you go:\n```json\n", '{"a": ', "1, ", '"b": "`x`"}', "\n`", "``\n"]
+    assert json.loads(read_all(TextChunkReader(chunks))) == {"a": 1, "b": "`x`"}
+
+
+def test_reader_returns_each_chunk_as_it_arrives():
+    chunks = iter(['{"a": 1', ', "b": 2}'])
+    reader = TextChunkReader(chunks)
+
+    assert reader.read() == b'{"a": 1'
+    assert reader.read() == b', "b": 2}'
+    assert reader.read() == b""
+
+
+def test_reader_holds_back_trailing_whitespace_until_more_text():
+    reader = TextChunkReader(['{"a": "x ', ' y"}  '])
+    assert reader.read() == b'{"a": "x'
+    assert reader.read() == b'  y"}'
+
+
+def test_reader_without_json():
+    assert TextChunkReader(["no json here", "at all"]).read() == b""
+
+
+def test_reader_with_ijson():
+    ijson = pytest.importorskip("ijson")
+    chunks = ["```json\n{", '"narrative": {"hook": "open"}, ', '"style": {"cuts": 12}}', "\n```"]
+    pairs = list(ijson.kvitems(TextChunkReader(chunks), ""))
+    assert pairs == [("narrative", {"hook": "open"}), ("style", {"cuts": 12})]
+
+
+def test_writer_matches_dumps_layout(tmp_path):
+    value = {"narrative": {"hook": "open", "beats": [1, 2]}, "style": {"cuts": 12}}
+    output = tmp_path / "out" / "analysis.json"
+
+    with JsonObjectWriter(str(output)) as writer:
+        for key, section in value.items():
+            writer.write(key, section)
+
+    assert output.read_bytes() == dumps(value)
+
+
+def test_writer_empty_object(tmp_path):
+    output = tmp_path / "empty.json"
+    with JsonObjectWriter(str(output)):
+        pass
+    assert json.loads(output.read_text()) == {}
+
+
+def test_writer_removes_partial_file_on_error(tmp_path):
+    output = tmp_path / "analysis.json"
+
+    with pytest.raises(RuntimeError):
+        with JsonObjectWriter(str(output)) as writer:
+            writer.write("narrative", {"hook": "open"})
+            raise RuntimeError("stream failed")
+
+    assert not output.exists()
+
+
+def test_writer_to_stdout(capsysbinary):
+    with JsonObjectWriter() as writer:
+        writer.write("a", 1)
+    assert json.loads(capsysbinary.readouterr().out) == {"a": 1}
@@ -0,0 +1,156 @@
+"""Tests for the on-disk response cache."""
+
+import os
+
+import pytest
+
+import mm_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(mm_cache, "CACHE_DIR", directory)
+    monkeypatch.setattr(mm_cache, "_cache_size", None)  # Not scanned yet
+    monkeypatch.setenv("QWEN_CACHE", "1")
+    return directory
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"frames" * 1000)
+    return path
+
+
+def test_key_depends_on_content_prompt_and_model(cache_dir, video, tmp_path):
+    entry = mm_cache.cache_path(str(video), "describe", "model-a")
+
+    assert entry == mm_cache.cache_path(str(video), "describe", "model-a")
+    assert entry == mm_cache.cache_path(f"file://{video}", "describe", "model-a")
+    assert entry != mm_cache.cache_path(str(video), "describe it", "model-a")
+    assert entry != mm_cache.cache_path(str(video), "describe", "model-b")
+
+    # Same bytes under another name share the entry; other bytes don't
+    copy = tmp_path / "copy.mp4"
+    copy.write_bytes(video.read_bytes())
+    assert mm_cache.cache_path(str(copy), "describe", "model-a") == entry
+
+    other = tmp_path / "other.mp4"
+    other.write_bytes(b"other" * 1000)
+    assert mm_cache.cache_path(str(other), "describe", "model-a") != entry
+
+
+def test_key_follows_file_edits(cache_dir, video):
+    before = mm_cache.mm_hash(str(video))
+    video.write_bytes(b"edited frames" * 1000)
+    assert mm_cache.mm_hash(str(video)) != before
+
+
+def test_url_key_includes_version(cache_dir, monkeypatch):
+    url = "https://cdn.example.com/video.mp4"
+    versions = iter(['"v1"', '"v2"'])
+    monkeypatch.setattr(mm_cache, "_url_version", lambda _: next(versions))
+
+    assert mm_cache.mm_hash(url) != mm_cache.mm_hash(url)
+
+
+def test_unversioned_url_is_not_cached(cache_dir, monkeypatch):
+    url = "https://cdn.example.com/video.mp4"
+    monkeypatch.setattr(mm_cache, "_url_version", lambda _: None)
+
+    mm_cache.store_response(url, "describe", "model", "answer")
+    assert mm_cache.lookup_response(url, "describe", "model") is None
+    assert not cache_dir.exists()
+
+
+def test_store_and_lookup(cache_dir, video):
+    assert mm_cache.lookup_response(str(video), "describe", "model") is None
+    mm_cache.store_response(str(video), "describe", "model", "answer")
+    assert mm_cache.lookup_response(str(video), "describe", "model") == "answer"
+
+
+def test_disabled_cache(cache_dir, video, monkeypatch):
+    monkeypatch.setenv("QWEN_CACHE", "0")
+    mm_cache.store_response(str(video), "describe", "model", "answer")
+    assert mm_cache.lookup_response(str(video), "describe", "model") is None
+
+
+def test_evict_removes_least_recently_used(cache_dir):
+    entries = []
+    for i in range(4):
+        entry = cache_dir / f"video{i}" / "prompt-model.json"
+        entry.parent.mkdir(parents=True)
+        entry.write_text("x" * 100)
+        os.utime(entry, (1000 + i, 1000 + i))
+        entries.append(entry)
+
+    # Reading the oldest entry makes it the most recently used
+    os.utime(entries[0], (2000, 2000))
+
+    mm_cache.evict(max_bytes=250)
+
+    assert [entry.exists() for entry in entries] == [True, False, False, True]
+    assert not entries[1].parent.exists()  # Emptied directories go too
+
+
+def test_evict_keeps_cache_under_limit(cache_dir):
+    entry = cache_dir / "video" / "prompt-model.json"
+    entry.parent.mkdir(parents=True)
+    entry.write_text("x" * 100)
+
+    mm_cache.evict(max_bytes=1000)
+
+    assert entry.exists()
+
+
+def test_cached_analysis(cache_dir, video):
+    calls = []
+
+    class Client:
+        @mm_cache.cached_analysis
+        def analyze(self, video_path, prompt, model="model-a"):
+            calls.append((video_path, prompt, model))
+            return f"answer {len(calls)}"
+
+    client = Client()
+    assert client.analyze(str(video), "describe") == "answer 1"
+    assert client.analyze(video_path=str(video), prompt="describe") == "answer 1"
+    assert client.analyze(str(video), "describe", "model-b") == "answer 2"
+    assert len(calls) == 2
+
+
+def test_cached_analysis_skips_missing_files(cache_dir, tmp_path):
+    class Client:
+        @mm_cache.cached_analysis
+        def analyze(self, video_path, prompt, model="model-a"):
+            raise FileNotFoundError(video_path)
+
+    with pytest.raises(FileNotFoundError):
+        Client().analyze(str(tmp_path / "missing.mp4"), "describe")
+
+
+def test_store_scans_only_when_over_limit(cache_dir, video, monkeypatch):
+    scans = []
+    evict = mm_cache.evict
+    monkeypatch.setattr(mm_cache, "evict", lambda: scans.append(1) or evict())
+    monkeypatch.setattr(mm_cache, "MAX_CACHE_BYTES", 10_000)
+
+    for i in range(20):
+        mm_cache.store_response(str(video), f"prompt {i}", "model", "x" * 100)
+    assert len(scans) == 1  # First store only
+
+    mm_cache.store_response(str(video), "big", "model", "x" * 10_000)
+    assert len(scans) == 2
+    assert sum(path.stat().st_size for path in cache_dir.glob("*/*.json")) <= 10_000
+
+
+def test_store_rescans_periodically(cache_dir, video, monkeypatch):
+    scans = []
+    evict = mm_cache.evict
+    monkeypatch.setattr(mm_cache, "evict", lambda: scans.append(1) or evict())
+    monkeypatch.setattr(mm_cache, "EVICT_RESCAN_STORES", 5)
+
+    for i in range(12):
+        mm_cache.store_response(str(video), f"prompt {i}", "model", "answer")
+    assert len(scans) == 2  # Store 1, then store 7 after 5 tracked stores
@@ -0,0 +1,46 @@
+"""Tests for which request failures qwen_client retries."""
+
+import pytest
+
+from qwen_client import QwenAPIError, _is_retryable
+
+
+@pytest.mark.parametrize("status", [408, 429, 500, 502, 503, 504])
+def test_transient_status_is_retried(status):
+    assert _is_retryable(QwenAPIError("busy", status_code=status))
+
+    error = OSError("upload failed")
+    error.status_code = status  # As carried by upload.UploadError
+    assert _is_retryable(error)
+
+
+@pytest.mark.parametrize("status", [400, 401, 403, 404, 413, 422])
+def test_client_error_status_is_not_retried(status):
+    assert not _is_retryable(QwenAPIError("rejected", status_code=status))
+
+
+@pytest.mark.parametrize("error", [
+    TimeoutError("timed out"),
+    ConnectionResetError("reset by peer"),
+    ConnectionRefusedError("refused"),
+])
+def test_network_errors_are_retried(error):
+    assert _is_retryable(error)
+
+
+@pytest.mark.parametrize("error", [
+    KeyError("output"),
+    ValueError("bad JSON"),
+    TypeError("bug"),
+    FileNotFoundError("video.mp4"),
+    QwenAPIError("no status"),
+])
+def test_other_errors_are_not_retried(error):
+    assert not _is_retryable(error)
+
+
+def test_requests_errors():
+    requests = pytest.importorskip("requests")
+    assert _is_retryable(requests.ConnectionError("down"))
+    assert _is_retryable(requests.ReadTimeout("slow"))
+    assert not _is_retryable(requests.TooManyRedirects("loop"))
@@ -0,0 +1,95 @@
+"""Tests for multi-video requests (QwenClient.analyze_videos_batch)."""
+
+import json
+
+import pytest
+
+import mm_cache
+from qwen_client import QwenClient
+
+
+class BatchClient(QwenClient):
+    """QwenClient with canned multi-video and single-video answers."""
+
+    def __init__(self, batch_response):
+        self.batch_response = batch_response
+        self.batches = []
+        self.singles = []
+
+    def _ensure_remote_url(self, video_path, model):
+        return video_path
+
+    def _make_request_dashscope(self, messages, model):
+        self.batches.append([item["video"] for item in messages[0]["content"] if "video" in item])
+        return self.batch_response
+
+    @staticmethod
+    def _dashscope_text(response):
+        return response if isinstance(response, str) else json.dumps(response)
+
+    @mm_cache.cached_analysis
+    def analyze_video(self, video_path, prompt, model="qwen3-vl-235b-a22b-thinking"):
+        self.singles.append(video_path)
+        return json.dumps({"clips": [{"single": video_path}]})
+
+
+@pytest.fixture
+def videos(tmp_path, monkeypatch):
+    monkeypatch.setattr(mm_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setenv("QWEN_CACHE", "1")
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"video{i}.mp4"
+        path.write_bytes(f"video {i}".encode() * 100)
+        paths.append(str(path))
+    return paths
+
+
+def test_answers_split_by_index(videos):
+    client = BatchClient({"results": [
+        {"video_index": 2, "clips": ["c"]},
+        {"video_index": 0, "clips": ["a"]},
+        {"video_index": 1, "clips": ["b"]},
+    ]})
+
+    assert client.analyze_videos_batch(videos, "P?") == [{"clips": ["a"]}, {"clips": ["b"]}, {"clips": ["c"]}]
+    assert client.batches == [videos] and client.singles == []
+
+    # Each answer is cached as if the video had been asked on its own
+    assert client.analyze_videos_batch(videos, "P?") == [{"clips": ["a"]}, {"clips": ["b"]}, {"clips": ["c"]}]
+    assert len(client.batches) == 1
+
+
+def test_only_unanswered_videos_are_asked_again(videos):
+    client = BatchClient({"results": [
+        {"video_index": 0, "clips": ["a"]},
+        "not an object",
+        {"video_index": 7, "clips": ["out of range"]},
+        {"video_index": 2, "clips": ["c1"]},
+        {"video_index": 2, "clips": ["c2"]},
+    ]})
+
+    answers = client.analyze_videos_batch(videos, "P?")
+
+    assert answers[0] == {"clips": ["a"]}
+    assert client.singles == [videos[1], videos[2]]  # Missing and duplicated
+    assert answers[1] == {"clips": [{"single": videos[1]}]}
+
+
+@pytest.mark.parametrize("response", [[{"video_index": 0}], {"results": "none"}, {"clips": []}])
+def test_malformed_response_falls_back_per_video(videos, response):
+    client = BatchClient(response)
+    answers = client.analyze_videos_batch(videos, "P?")
+
+    assert client.singles == videos
+    assert answers == [{"clips": [{"single": video}]} for video in videos]
+
+
+def test_cached_videos_are_left_out(videos):
+    mm_cache.store_response(videos[1], "P?", "qwen3-vl-235b-a22b-thinking", json.dumps({"clips": ["cached"]}))
+    client = BatchClient({"results": [{"video_index": 0, "clips": ["a"]}, {"video_index": 1, "clips": ["c"]}]})
+
+    answers = client.analyze_videos_batch(videos, "P?")
+
+    assert client.batches == [[videos[0], videos[2]]]
+    assert answers == [{"clips": ["a"]}, {"clips": ["cached"]}, {"clips": ["c"]}]
@@ -0,0 +1,46 @@
+"""
+Timestamp helpers for analysis output.
+
+now_iso() returns the current UTC time as ISO 8601 with a "Z" suffix
+(second precision). Inside request_scope() it returns the timestamp taken
+when the scope was entered, so every section of one combined analysis
+carries the same time and the clock is read once per request.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+
+_request_time: ContextVar[Optional[str]] = ContextVar("request_time", default=None)
+
+
+def now_iso() -> str:
+    """
+    Get the current (or current request's) UTC time.
+
+    Returns:
+        Timestamp like "2025-01-31T12:00:00Z"
+    """
+    scoped = _request_time.get()
+    if scoped is not None:
+        return scoped
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+@contextmanager
+def request_scope() -> Iterator[str]:
+    """
+    Pin now_iso() to one timestamp for the duration of a request.
+
+    Nested scopes keep the outer timestamp.
+
+    Yields:
+        The pinned timestamp
+    """
+    token = _request_time.set(now_iso())
+    try:
+        yield _request_time.get()
+    finally:
+        _request_time.reset(token)
@@ -0,0 +1,160 @@
+"""
+Upload local videos to DashScope temporary storage.
+
+Same protocol as the SDK's OssUtils.upload (fetch an upload policy, then
+POST the file to OSS as a form), but the request body is streamed from an
+mmap of the file. The SDK builds the whole multipart body in memory, so a
+500MB video costs over 1GB of RAM to upload; here memory stays flat.
+
+Uploaded files get an oss:// URL that model calls can reference for 48h
+(the request needs the X-DashScope-OssResourceResolve: enable header,
+which the DashScope SDK adds itself).
+"""
+
+import os
+import mmap
+import uuid
+import mimetypes
+from http import HTTPStatus
+from typing import Dict, List, Optional
+
+import requests
+from dashscope.utils.oss_utils import OssUtils
+
+
+UPLOAD_TIMEOUT = 3600  # seconds, large files on slow links
+
+
+class UploadError(Exception):
+    """Failed upload, with the HTTP status when there was a response."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class MultipartBody:
+    """
+    File-like multipart/form-data body: form fields, then one file.
+
+    Reads are served from memoryviews over the encoded fields and the
+    file mapping, so the file is never copied into memory as a whole.
+    len() gives the exact size, which requests sends as Content-Length.
+    """
+
+    def __init__(self, fields: Dict[str, str], file_field: str, path: str):
+        """
+        Args:
+            fields: Form fields sent before the file
+            file_field: Form field name for the file
+            path: Local file path
+        """
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+
+        head = b"".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            for name, value in fields.items()
+        )
+        mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        head += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+            f'filename="{os.path.basename(path)}"\r\nContent-Type: {mime}\r\n\r\n'
+        ).encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+
+        self._file = open(path, 'rb')
+        self._mapped = None
+        if os.fstat(self._file.fileno()).st_size:  # Empty files can't be mapped
+            self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        parts = [head, self._mapped, tail] if self._mapped is not None else [head, tail]
+        self._parts: List[memoryview] = [memoryview(part) for part in parts]
+        self._length = sum(len(part) for part in self._parts)
+        self._index = 0  # Read position: part index, offset within it
+        self._offset = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes (all remaining if size < 0)."""
+        chunks = []
+        while self._index < len(self._parts) and size != 0:
+            part = self._parts[self._index]
+            end = len(part) if size < 0 else min(self._offset + size, len(part))
+            chunks.append(part[self._offset:end].tobytes())
+            if size > 0:
+                size -= end - self._offset
+            if end == len(part):
+                self._index += 1
+                self._offset = 0
+            else:
+                self._offset = end
+        return b"".join(chunks)
+
+    def close(self) -> None:
+        """Release the file mapping."""
+        for part in self._parts:
+            part.release()
+        self._parts = []
+        if self._mapped is not None:
+            self._mapped.close()
+        self._file.close()
+
+    def __enter__(self) -> "MultipartBody":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def upload_file(path: str, model: str, api_key: str) -> str:
+    """
+    Upload a local file to DashScope temporary storage.
+
+    Args:
+        path: Local file path
+        model: Model the file will be used with (uploads are scoped to it)
+        api_key: DashScope API key
+
+    Returns:
+        oss:// URL of the uploaded file
+
+    Raises:
+        UploadError: If the policy request or the upload fails
+    """
+    policy = OssUtils.get_upload_certificate(model=model, api_key=api_key)
+    if policy.status_code != HTTPStatus.OK:
+        raise UploadError(
+            f"Get upload policy failed: {policy.code} - {policy.message}",
+            status_code=policy.status_code
+        )
+    policy = policy.output
+
+    key = f"{policy['upload_dir']}/{os.path.basename(path)}"
+    fields = {
+        "OSSAccessKeyId": policy["oss_access_key_id"],
+        "Signature": policy["signature"],
+        "policy": policy["policy"],
+        "key": key,
+        "x-oss-object-acl": policy["x_oss_object_acl"],
+        "x-oss-forbid-overwrite": policy["x_oss_forbid_overwrite"],
+        "success_action_status": "200",
+        "x-oss-content-type": mimetypes.guess_type(path)[0] or "application/octet-stream",
+    }
+
+    with MultipartBody(fields, "file", path) as body:
+        response = requests.post(
+            policy["upload_host"],
+            data=body,
+            headers={"Content-Type": body.content_type, "Accept": "application/json"},
+            timeout=UPLOAD_TIMEOUT
+        )
+
+    if response.status_code != HTTPStatus.OK:
+        raise UploadError(
+            f"Upload of {path} failed: HTTP {response.status_code} {response.text[:200]}",
+            status_code=response.status_code
+        )
+    return f"oss://{key}"
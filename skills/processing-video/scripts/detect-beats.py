@@ -10,30 +10,179 @@ Usage:
 """
 
 import argparse
+import hashlib
 import json
+import os
 import sys
 from pathlib import Path
 
 import librosa
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Falls back to stdlib json
+
+
+# Decoded-audio features and beat analyses, keyed by (path, mtime, size);
+# DETECT_BEATS_CACHE=0 disables
+CACHE_DIR = Path(os.getenv("DETECT_BEATS_CACHE_DIR", Path.home() / ".cache" / "detect-beats"))
+
+# Decoding parameters (mono float32 at 22050Hz; files already at this rate
+# skip the resampler). Lower soxr qualities barely save time at these
+# rates but visibly change the onset envelope, so keep soxr_hq.
+SAMPLE_RATE = 22050
+RESAMPLE_TYPE = "soxr_hq"
+
+# Bump when detect_beats output changes so cached analyses are recomputed
+BEATS_CACHE_VERSION = 1
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to indented UTF-8 JSON (orjson when installed)."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+def _loads(data: bytes):
+    """Parse JSON (orjson when installed)."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _cache_enabled() -> bool:
+    return os.getenv("DETECT_BEATS_CACHE", "1") != "0"
+
+
+def _cache_path(audio_path: str, suffix: str = ".npz") -> Path:
+    """Cache file for the current version of an audio file."""
+    real_path = os.path.realpath(audio_path)
+    stat = os.stat(real_path)
+    key = hashlib.blake2b(
+        f"{real_path}:{stat.st_mtime_ns}:{stat.st_size}:{SAMPLE_RATE}:{RESAMPLE_TYPE}".encode(),
+        digest_size=8
+    )
+    return CACHE_DIR / f"{key.hexdigest()}{suffix}"
+
+
+def _write_cache(cache_file: Path, write) -> None:
+    """Atomically (re)write a cache file; write(f) fills the open file."""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, cache_file)
+    except OSError as e:
+        print(f"Warning: could not write cache {cache_file}: {e}", file=sys.stderr)
+
+
+def load_features(audio_path: str) -> dict:
+    """
+    Decode audio and compute the onset envelopes the analysis needs.
+
+    Decoding, resampling and the spectrogram dominate runtime, so the
+    results (not the samples) are cached: sample rate, duration and both
+    onset envelopes, the mean-aggregated one used for onsets and
+    strengths and the median-aggregated one beat_track uses. A hit skips
+    decoding entirely and gives exactly the same analysis.
+
+    Returns:
+        dict with sr, duration, onset_env and beat_env
+    """
+    cache_file = _cache_path(audio_path) if _cache_enabled() else None
+
+    if cache_file is not None and cache_file.exists():
+        try:
+            with np.load(cache_file) as cached:
+                print(f"[Cache hit] {cache_file}")
+                return {
+                    "sr": int(cached["sr"]),
+                    "duration": float(cached["duration"]),
+                    "onset_env": cached["onset_env"],
+                    "beat_env": cached["beat_env"]
+                }
+        except (OSError, ValueError, KeyError):
+            pass  # Unreadable entry - recompute and overwrite
+
+    print(f"[Loading] {audio_path}...")
+    y, sr = librosa.load(audio_path, sr=SAMPLE_RATE, mono=True, res_type=RESAMPLE_TYPE, dtype=np.float32)
+
+    # The log-mel spectrogram is the expensive part of an onset envelope;
+    # compute it once and aggregate it both ways
+    S = librosa.power_to_db(librosa.feature.melspectrogram(y=y, sr=sr))
+    features = {
+        "sr": sr,
+        "duration": len(y) / sr,
+        "onset_env": librosa.onset.onset_strength(S=S, sr=sr),
+        # beat_track's own envelope when given raw audio
+        "beat_env": librosa.onset.onset_strength(S=S, sr=sr, aggregate=np.median)
+    }
+
+    if cache_file is not None:
+        _write_cache(cache_file, lambda f: np.savez(f, **features))
+
+    return features
+
+
+def _beat_dicts(times: np.ndarray, frames: np.ndarray, strengths: np.ndarray, is_strong: np.ndarray) -> list:
+    """Build the JSON beat objects from the beat columns in one pass."""
+    return [
+        {
+            "index": i,
+            "time": round(time, 3),
+            "frame": frame,
+            "strength": round(strength, 3),
+            "is_strong": strong
+        }
+        for i, (time, frame, strength, strong) in enumerate(
+            zip(times.tolist(), frames.tolist(), strengths.tolist(), is_strong.tolist())
+        )
+    ]
+
 
 def detect_beats(audio_path: str, fps: int = 30) -> dict:
     """
     Analyze audio file and extract beat information.
 
+    The result is cached per audio version and fps, so re-running only
+    to try different --scenes/--intro values skips the analysis (and
+    loading librosa's analysis modules) entirely.
+
     Returns:
         dict with tempo, beats, and recommended cut points
     """
-    print(f"[Loading] {audio_path}...")
-    y, sr = librosa.load(audio_path)
-    duration = librosa.get_duration(y=y, sr=sr)
+    cache_file = _cache_path(audio_path, f".{fps}fps.v{BEATS_CACHE_VERSION}.json") if _cache_enabled() else None
+
+    if cache_file is not None and cache_file.exists():
+        try:
+            result = _loads(cache_file.read_bytes())
+            print(f"[Cache hit] {cache_file}")
+            result["audio_file"] = str(audio_path)  # As given this time
+            return result
+        except (OSError, ValueError):
+            pass  # Unreadable entry - recompute and overwrite
+
+    result = _analyze_beats(audio_path, fps)
+    if cache_file is not None:
+        data = _dumps(result)
+        _write_cache(cache_file, lambda f: f.write(data))
+    return result
+
+
+def _analyze_beats(audio_path: str, fps: int) -> dict:
+    """Run the beat analysis for detect_beats (no result caching)."""
+    features = load_features(audio_path)
+    sr = features["sr"]
+    duration = features["duration"]
+    onset_env = features["onset_env"]
 
     print(f"[Analyzing] Duration: {duration:.2f}s, Sample rate: {sr}Hz")
 
     # Detect tempo and beats
     print("[Detecting] Tempo and beats...")
-    tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
+    tempo, beat_frames = librosa.beat.beat_track(onset_envelope=features["beat_env"], sr=sr)
     beat_times = librosa.frames_to_time(beat_frames, sr=sr)
 
     # Handle tempo as array (newer librosa versions)
@@ -44,53 +193,50 @@ def detect_beats(audio_path: str, fps: int = 30) -> dict:
 
     # Detect onsets (more precise than beats - catches transients)
     print("[Detecting] Onsets/transients...")
-    onset_frames = librosa.onset.onset_detect(y=y, sr=sr)
+    onset_frames = librosa.onset.onset_detect(onset_envelope=onset_env, sr=sr)
     onset_times = librosa.frames_to_time(onset_frames, sr=sr)
 
     # Detect strong beats (downbeats) using beat strength
     print("[Analyzing] Beat strength...")
-    onset_env = librosa.onset.onset_strength(y=y, sr=sr)
 
-    # Get beat strengths
-    beat_strengths = []
-    for frame in beat_frames:
-        if frame < len(onset_env):
-            beat_strengths.append(float(onset_env[frame]))
-        else:
-            beat_strengths.append(0.0)
+    # Get beat strengths (beats past the envelope's end count as 0)
+    beat_frames = np.asarray(beat_frames, dtype=int)
+    in_range = beat_frames < len(onset_env)
+    beat_strengths = np.zeros(len(beat_frames))
+    beat_strengths[in_range] = onset_env[beat_frames[in_range]]
 
     # Normalize strengths
-    if beat_strengths:
-        max_strength = max(beat_strengths)
-        if max_strength > 0:
-            beat_strengths = [s / max_strength for s in beat_strengths]
-
-    # Create beat objects with frame numbers
-    beats = []
-    for i, (time, strength) in enumerate(zip(beat_times, beat_strengths)):
-        beats.append({
-            "index": i,
-            "time": round(float(time), 3),
-            "frame": int(round(float(time) * fps)),
-            "strength": round(strength, 3),
-            "is_strong": strength > 0.7  # Mark strong beats
-        })
+    max_strength = beat_strengths.max() if beat_strengths.size else 0.0
+    if max_strength > 0:
+        beat_strengths /= max_strength
+
+    # Beat columns; per-beat dicts are only built for the output
+    beat_video_frames = np.rint(beat_times * fps).astype(int)
+    is_strong = beat_strengths > 0.7  # Mark strong beats
+    beats = _beat_dicts(beat_times, beat_video_frames, beat_strengths, is_strong)
 
     # Find recommended cut points (strong beats, evenly spaced)
-    strong_beats = [b for b in beats if b["is_strong"]]
+    strong_beats = [beats[i] for i in np.flatnonzero(is_strong).tolist()]
 
     # Also calculate measures (assuming 4/4 time)
     beats_per_measure = 4
-    measures = []
-    for i in range(0, len(beats), beats_per_measure):
-        measure_beats = beats[i:i + beats_per_measure]
-        if measure_beats:
-            measures.append({
-                "measure": i // beats_per_measure + 1,
-                "start_time": measure_beats[0]["time"],
-                "start_frame": measure_beats[0]["frame"],
-                "beats": measure_beats
-            })
+    measures = [
+        {
+            "measure": i // beats_per_measure + 1,
+            "start_time": beats[i]["time"],
+            "start_frame": beats[i]["frame"],
+            "beats": beats[i:i + beats_per_measure]
+        }
+        for i in range(0, len(beats), beats_per_measure)
+    ]
+
+    # First 50 onsets
+    onset_times = onset_times[:50]
+    onset_video_frames = np.rint(onset_times * fps).astype(int)
+    onsets = [
+        {"time": round(time, 3), "frame": frame}
+        for time, frame in zip(onset_times.tolist(), onset_video_frames.tolist())
+    ]
 
     result = {
         "audio_file": str(audio_path),
@@ -101,11 +247,11 @@ def detect_beats(audio_path: str, fps: int = 30) -> dict:
         "beat_interval_seconds": round(60.0 / tempo, 3),
         "beat_interval_frames": int(round((60.0 / tempo) * fps)),
         "total_beats": len(beats),
-        "total_strong_beats": len(strong_beats),
+        "total_strong_beats": int(is_strong.sum()),
         "beats": beats,
         "strong_beats": strong_beats,
         "measures": measures,
-        "onsets": [{"time": round(float(t), 3), "frame": int(round(float(t) * fps))} for t in onset_times[:50]]  # First 50 onsets
+        "onsets": onsets
     }
 
     return result
@@ -129,12 +275,13 @@ def suggest_cuts(beat_data: dict, num_scenes: int, intro_duration: float = 2.0)
     if not beats:
         return []
 
-    # Find the beat closest to intro_duration for first cut
-    intro_beat_idx = 0
-    for i, beat in enumerate(beats):
-        if beat["time"] >= intro_duration:
-            intro_beat_idx = i
-            break
+    times = np.array([b["time"] for b in beats])
+    strong_mask = np.array([b["is_strong"] for b in beats])
+
+    # Find the first beat at or after intro_duration for first cut
+    intro_beat_idx = int(np.searchsorted(times, intro_duration))
+    if intro_beat_idx == len(beats):
+        intro_beat_idx = 0
 
     # Remaining beats after intro
     remaining_beats = beats[intro_beat_idx:]
@@ -165,14 +312,12 @@ def suggest_cuts(beat_data: dict, num_scenes: int, intro_duration: float = 2.0)
     for scene_num in range(2, num_scenes + 1):
         start_beat = beats[current_beat_idx]
 
-        # Find end beat
-        next_beat_idx = min(current_beat_idx + beats_per_scene, len(beats) - 1)
-
-        # Prefer strong beats for cuts if available
-        for i in range(current_beat_idx + 1, min(current_beat_idx + beats_per_scene + 2, len(beats))):
-            if beats[i]["is_strong"]:
-                next_beat_idx = i
-                break
+        # Find end beat, preferring strong beats for cuts if available
+        hits = np.flatnonzero(strong_mask[current_beat_idx + 1:current_beat_idx + beats_per_scene + 2])
+        if hits.size:
+            next_beat_idx = current_beat_idx + 1 + int(hits[0])
+        else:
+            next_beat_idx = min(current_beat_idx + beats_per_scene, len(beats) - 1)
 
         if scene_num == num_scenes:
             # Last scene goes to end
@@ -220,11 +365,9 @@ def main():
         beat_data["suggested_cuts"] = suggest_cuts(beat_data, args.scenes, args.intro)
 
     # Output
-    output_json = json.dumps(beat_data, indent=2)
-
     if args.output:
-        with open(args.output, "w") as f:
-            f.write(output_json)
+        with open(args.output, "wb") as f:
+            f.write(_dumps(beat_data))
         print(f"\n[Saved] {args.output}")
     else:
         print("\n" + "=" * 60)
@@ -0,0 +1,118 @@
+"""Tests for detect-beats.py cut suggestions."""
+
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("librosa")
+
+_spec = importlib.util.spec_from_file_location(
+    "detect_beats", Path(__file__).resolve().parent.parent / "detect-beats.py"
+)
+detect_beats = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(detect_beats)
+
+
+def suggest_cuts_loop(beat_data: dict, num_scenes: int, intro_duration: float = 2.0) -> list:
+    """The original pure-Python suggest_cuts, kept as the reference."""
+    beats = beat_data["beats"]
+
+    if not beats:
+        return []
+
+    intro_beat_idx = 0
+    for i, beat in enumerate(beats):
+        if beat["time"] >= intro_duration:
+            intro_beat_idx = i
+            break
+
+    remaining_beats = beats[intro_beat_idx:]
+    remaining_scenes = num_scenes - 1
+
+    if remaining_scenes <= 0 or not remaining_beats:
+        return [{"scene": 1, "start_time": 0, "start_frame": 0, "end_time": beat_data["duration_seconds"], "end_frame": beat_data["duration_frames"]}]
+
+    beats_per_scene = max(1, len(remaining_beats) // remaining_scenes)
+
+    cuts = [{
+        "scene": 1,
+        "label": "intro",
+        "start_time": 0,
+        "start_frame": 0,
+        "end_time": beats[intro_beat_idx]["time"],
+        "end_frame": beats[intro_beat_idx]["frame"],
+        "duration_seconds": beats[intro_beat_idx]["time"],
+        "duration_frames": beats[intro_beat_idx]["frame"]
+    }]
+
+    current_beat_idx = intro_beat_idx
+    for scene_num in range(2, num_scenes + 1):
+        start_beat = beats[current_beat_idx]
+
+        next_beat_idx = min(current_beat_idx + beats_per_scene, len(beats) - 1)
+        for i in range(current_beat_idx + 1, min(current_beat_idx + beats_per_scene + 2, len(beats))):
+            if beats[i]["is_strong"]:
+                next_beat_idx = i
+                break
+
+        if scene_num == num_scenes:
+            end_time = beat_data["duration_seconds"]
+            end_frame = beat_data["duration_frames"]
+        else:
+            end_time = beats[next_beat_idx]["time"]
+            end_frame = beats[next_beat_idx]["frame"]
+
+        cuts.append({
+            "scene": scene_num,
+            "label": f"scene_{scene_num}",
+            "start_time": start_beat["time"],
+            "start_frame": start_beat["frame"],
+            "end_time": end_time,
+            "end_frame": end_frame,
+            "duration_seconds": round(end_time - start_beat["time"], 3),
+            "duration_frames": end_frame - start_beat["frame"]
+        })
+
+        current_beat_idx = next_beat_idx
+
+    return cuts
+
+
+def make_beat_data(seed: int, count: int, strong_ratio: float, fps: int = 30) -> dict:
+    rng = random.Random(seed)
+    beats = []
+    time = rng.uniform(0, 1)
+    for _ in range(count):
+        beats.append({
+            "time": round(time, 3),
+            "frame": round(time * fps),
+            "strength": rng.random(),
+            "is_strong": rng.random() < strong_ratio
+        })
+        time += rng.uniform(0.3, 0.7)
+    duration = round(time + 1, 3)
+    return {
+        "fps": fps,
+        "beats": beats,
+        "duration_seconds": duration,
+        "duration_frames": round(duration * fps)
+    }
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("num_scenes", [1, 2, 5, 12, 60])
+def test_suggest_cuts_matches_loop(seed, num_scenes):
+    count = [0, 1, 3, 40, 200][seed % 5]
+    beat_data = make_beat_data(seed, count, strong_ratio=[0.0, 0.3, 1.0][seed % 3])
+    for intro_duration in (0.0, 2.0, 7.5, 1000.0):
+        assert detect_beats.suggest_cuts(beat_data, num_scenes, intro_duration) == \
+            suggest_cuts_loop(beat_data, num_scenes, intro_duration)
+
+
+def test_suggest_cuts_exact_intro_boundary():
+    beat_data = make_beat_data(0, 30, strong_ratio=0.5)
+    intro = beat_data["beats"][4]["time"]
+    assert detect_beats.suggest_cuts(beat_data, 6, intro) == suggest_cuts_loop(beat_data, 6, intro)
+    assert detect_beats.suggest_cuts(beat_data, 6, intro)[0]["end_time"] == intro